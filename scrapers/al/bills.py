@@ -1,16 +1,29 @@
+import os
 import pytz
 import json
 import lxml
 import re
 import datetime
+import collections
 import dateutil.parser
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from openstates.scrape import Scraper, Bill, VoteEvent
+from openstates.scrape.base import ScrapeError
 from utils.media import get_media_type
+from utils.actions import CategorizerCacheMixin
 from .actions import Categorizer
 
 
-class ALBillScraper(Scraper):
+# instrument overviews are requested this many rows a page
+PAGE_SIZE = int(os.environ.get("AL_PAGE_SIZE", 1000))
+# GraphQL requests in flight at once
+GQL_WORKERS = int(os.environ.get("AL_GQL_WORKERS", 4))
+# bills (or roll calls) whose details are requested in one aliased query
+BATCH_SIZE = int(os.environ.get("AL_BATCH_SIZE", 25))
+
+
+class ALBillScraper(CategorizerCacheMixin, Scraper):
     categorizer = Categorizer()
     chamber_map = {"Senate": "upper", "House": "lower"}
     bill_types = {"B": "bill", "R": "resolution"}
@@ -37,95 +50,186 @@ class ALBillScraper(Scraper):
         self.session_year = scraper_ids["session_year"]
         self.session_type = scraper_ids["session_type"]
 
-        for bill_type in ["B", "R"]:
-            yield from self.scrape_bill_type(session, bill_type)
+        self.executor = ThreadPoolExecutor(GQL_WORKERS)
+        try:
+            for bill_type in ["B", "R"]:
+                yield from self.scrape_bill_type(session, bill_type)
+        finally:
+            self.executor.shutdown(cancel_futures=True)
 
-    def scrape_bill_type(self, session, bill_type):
+    def gql(self, query):
+        json_data = {
+            "query": query,
+            "operationName": "",
+            "variables": [],
+        }
+        page = self.post(self.gql_url, headers=self.gql_headers, json=json_data)
+        page = json.loads(page.content)
+        if page.get("errors"):
+            raise ScrapeError(f"ALISON GraphQL errors: {page['errors']}")
+        return page["data"]
+
+    def gql_fields(self, fields):
+        """
+        Send {alias: field} as one aliased GraphQL query and return
+        {alias: result}.
+        """
+        if not fields:
+            return {}
+        return self.gql(
+            "{" + " ".join(f"{alias}:{field}" for alias, field in fields.items()) + "}"
+        )
 
+    def scrape_overviews(self, bill_type):
+        """
+        Yield the overview rows of every bill_type instrument, PAGE_SIZE rows
+        a page, with up to GQL_WORKERS pages in flight at once.
+        """
         offset = 0
-        limit = 10000
-        # max of 10 pages in case something goes way wrong
-        while offset < 100000:
-            json_data = {
-                "query": f'{{allInstrumentOverviews(instrumentType:"{bill_type}", instrumentNbr:"", body:"", sessionYear:"{self.session_year}", sessionType:"{self.session_type}", assignedCommittee:"", status:"", currentStatus:"", subject:"", instrumentSponsor:"", companionInstrumentNbr:"", effectiveDateCertain:"", effectiveDateOther:"", firstReadSecondBody:"", secondReadSecondBody:"", direction:"ASC"orderBy:"InstrumentNbr"limit:{limit} offset:{offset}  search:"" customFilters: {{}}companionReport:"", ){{ ID,SessionYear,InstrumentNbr,InstrumentUrl, InstrumentSponsor,SessionType,Body,Subject,ShortTitle,AssignedCommittee,PrefiledDate,FirstRead,CurrentStatus,LastAction,ActSummary,ViewEnacted,CompanionInstrumentNbr,EffectiveDateCertain,EffectiveDateOther,InstrumentType,IntroducedUrl,EngrossedUrl,EnrolledUrl }}}}',
-                "operationName": "",
-                "variables": [],
-            }
-
-            page = self.post(self.gql_url, headers=self.gql_headers, json=json_data)
-            page = json.loads(page.content)
-            if len(page["data"]["allInstrumentOverviews"]) < 1 and offset == 0:
-                # TODO: this fails if one chamber is empty and the other isn't
-                # raise EmptyScrape
-                return
-
-            for row in page["data"]["allInstrumentOverviews"]:
-                chamber = self.chamber_map[row["Body"]]
-                title = row["ShortTitle"].strip()
-
-                # some recently filed bills have no title, but a good subject which is close
-                if title == "":
-                    title = row["Subject"]
-
-                # prevent duplicates
-                bill_id = row["InstrumentNbr"]
-                if bill_id in self.bill_ids:
-                    continue
-                else:
-                    self.bill_ids.add(bill_id)
-
-                bill = Bill(
-                    identifier=bill_id,
-                    legislative_session=session,
-                    title=title,
-                    chamber=chamber,
-                    classification=self.bill_types[row["InstrumentType"]],
-                )
-                sponsor = row["InstrumentSponsor"]
-                if sponsor == "":
-                    self.warning("No sponsors")
-                    continue
-
-                bill.add_sponsorship(
-                    name=sponsor,
-                    entity_type="person",
-                    classification="primary",
-                    primary=True,
-                )
+        pending = collections.deque()
+        try:
+            while True:
+                # max of 100000 rows in case something goes way wrong
+                while offset < 100000 and len(pending) < GQL_WORKERS:
+                    query = f'{{allInstrumentOverviews(instrumentType:"{bill_type}", instrumentNbr:"", body:"", sessionYear:"{self.session_year}", sessionType:"{self.session_type}", assignedCommittee:"", status:"", currentStatus:"", subject:"", instrumentSponsor:"", companionInstrumentNbr:"", effectiveDateCertain:"", effectiveDateOther:"", firstReadSecondBody:"", secondReadSecondBody:"", direction:"ASC"orderBy:"InstrumentNbr"limit:{PAGE_SIZE} offset:{offset}  search:"" customFilters: {{}}companionReport:"", ){{ ID,SessionYear,InstrumentNbr,InstrumentUrl, InstrumentSponsor,SessionType,Body,Subject,ShortTitle,AssignedCommittee,PrefiledDate,FirstRead,CurrentStatus,LastAction,ActSummary,ViewEnacted,CompanionInstrumentNbr,EffectiveDateCertain,EffectiveDateOther,InstrumentType,IntroducedUrl,EngrossedUrl,EnrolledUrl }}}}'
+                    pending.append(self.executor.submit(self.gql, query))
+                    offset += PAGE_SIZE
+                if not pending:
+                    return
+
+                rows = pending.popleft().result()["allInstrumentOverviews"]
+                yield from rows
+
+                # the pages after a short one are empty
+                if len(rows) < PAGE_SIZE:
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def scrape_bill_type(self, session, bill_type):
+        rows = []
+        for row in self.scrape_overviews(bill_type):
+            # prevent duplicates
+            bill_id = row["InstrumentNbr"]
+            if bill_id in self.bill_ids:
+                continue
+            else:
+                self.bill_ids.add(bill_id)
+
+            if row["InstrumentSponsor"] == "":
+                self.warning("No sponsors")
+                continue
+
+            rows.append(row)
 
-                self.scrape_versions(bill, row)
-                self.scrape_fiscal_notes(bill)
-                yield from self.scrape_actions(bill, row)
+        # TODO: this fails if one chamber is empty and the other isn't
+        # if not rows: raise EmptyScrape
 
-                bill.add_source("https://alison.legislature.state.al.us/bill-search")
-                if row["InstrumentUrl"]:
-                    bill.add_source(row["InstrumentUrl"])
+        batches = [rows[i : i + BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE)]
+        for bills, votes in self.scrape_batches(batches):
+            for row, history, fiscal_notes in bills:
+                yield from self.scrape_bill(session, row, history, fiscal_notes, votes)
+
+    def scrape_batches(self, batches):
+        """
+        Yield scrape_details() of each batch in order, with up to GQL_WORKERS
+        batches in flight at once.
+        """
+        pending = collections.deque()
+        try:
+            for batch in batches:
+                pending.append(self.executor.submit(self.scrape_details, batch))
+                if len(pending) >= GQL_WORKERS:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def scrape_details(self, rows):
+        """
+        Fetch the histories and fiscal notes of a batch of bills in one query,
+        then the roll calls of their votes, BATCH_SIZE to a query.
+
+        Returns ([(row, history, fiscal_notes)], {vote_id: roll_call}).
+        """
+        fields = {}
+        for i, row in enumerate(rows):
+            fields[f"h{i}"] = self.history_field(row)
+            fields[f"f{i}"] = self.fiscal_notes_field(row)
+        data = self.gql_fields(fields)
+
+        roll_calls = {}
+        for i in range(len(rows)):
+            for action_row in data[f"h{i}"]:
+                if self.has_vote(action_row):
+                    roll_calls[f"v{len(roll_calls)}"] = action_row
+
+        votes = {}
+        aliases = list(roll_calls)
+        for start in range(0, len(aliases), BATCH_SIZE):
+            chunk = aliases[start : start + BATCH_SIZE]
+            vote_data = self.gql_fields(
+                {alias: self.roll_call_field(roll_calls[alias]) for alias in chunk}
+            )
+            for alias in chunk:
+                votes[self.vote_id(roll_calls[alias])] = vote_data[alias]
+
+        bills = [(row, data[f"h{i}"], data[f"f{i}"]) for i, row in enumerate(rows)]
+        return bills, votes
+
+    def scrape_bill(self, session, row, history, fiscal_notes, votes):
+        chamber = self.chamber_map[row["Body"]]
+        title = row["ShortTitle"].strip()
+
+        # some recently filed bills have no title, but a good subject which is close
+        if title == "":
+            title = row["Subject"]
+
+        bill = Bill(
+            identifier=row["InstrumentNbr"],
+            legislative_session=session,
+            title=title,
+            chamber=chamber,
+            classification=self.bill_types[row["InstrumentType"]],
+        )
+
+        bill.add_sponsorship(
+            name=row["InstrumentSponsor"],
+            entity_type="person",
+            classification="primary",
+            primary=True,
+        )
 
-                # some subjects are super long & more like abstracts, but it looks like whatever is before a comma or
-                # semicolon is a clear enough subject. Adds the full given Subject as an Abstract & splits to add that
-                # first real subject as one
-                if row["Subject"]:
-                    full_subject = row["Subject"].strip()
-                    bill.add_abstract(full_subject, note="full subject")
-                    first_sub = re.split(",|;", full_subject)
-                    bill.add_subject(first_sub[0])
+        self.scrape_versions(bill, row)
+        self.scrape_fiscal_notes(bill, fiscal_notes)
+        yield from self.scrape_actions(bill, row, history, votes)
 
-                if row["CompanionInstrumentNbr"] != "":
-                    self.warning("AL Companion found. Code it up.")
+        bill.add_source("https://alison.legislature.state.al.us/bill-search")
+        if row["InstrumentUrl"]:
+            bill.add_source(row["InstrumentUrl"])
 
-                # TODO: EffectiveDateCertain, EffectiveDateOther
+        # some subjects are super long & more like abstracts, but it looks like whatever is before a comma or
+        # semicolon is a clear enough subject. Adds the full given Subject as an Abstract & splits to add that
+        # first real subject as one
+        if row["Subject"]:
+            full_subject = row["Subject"].strip()
+            bill.add_abstract(full_subject, note="full subject")
+            first_sub = re.split(",|;", full_subject)
+            bill.add_subject(first_sub[0])
 
-                # TODO: Fiscal notes, BUDGET ISOLATION RESOLUTION
+        if row["CompanionInstrumentNbr"] != "":
+            self.warning("AL Companion found. Code it up.")
 
-                bill.extras["AL_BILL_ID"] = row["ID"]
+        # TODO: EffectiveDateCertain, EffectiveDateOther
 
-                yield bill
+        # TODO: Fiscal notes, BUDGET ISOLATION RESOLUTION
 
-            # no need to paginate again if we max the last page
-            if len(page["data"]["allInstrumentOverviews"]) < limit:
-                return
+        bill.extras["AL_BILL_ID"] = row["ID"]
 
-            offset += limit
+        yield bill
 
     def scrape_versions(self, bill, row):
         if row["IntroducedUrl"]:
@@ -197,7 +301,7 @@ class ALBillScraper(Scraper):
             "Alabama Chapter Law", act_number, "chapter", url=act_text_url
         )
 
-    def scrape_actions(self, bill, bill_row):
+    def scrape_actions(self, bill, bill_row, history, votes):
         if bill_row["PrefiledDate"]:
             action_date = datetime.datetime.strptime(
                 bill_row["PrefiledDate"], "%m/%d/%Y"
@@ -210,17 +314,7 @@ class ALBillScraper(Scraper):
                 classification="filing",
             )
 
-        # Can this be ANDED together with the other graphql query?
-        json_data = {
-            "query": f'{{instrumentHistoryBySessionYearInstNbr(sessionType:"{self.session_type}", sessionYear:"{self.session_year}", instrumentNbr:"{bill_row["InstrumentNbr"]}", ){{ InstrumentNbr,SessionYear,SessionType,CalendarDate,Body,AmdSubUrl,Matter,Committee,Nay,Yea,Vote,VoteNbr }}}}',
-            "operationName": "",
-            "variables": [],
-        }
-
-        page = self.post(self.gql_url, headers=self.gql_headers, json=json_data)
-        page = json.loads(page.content)
-
-        for row in page["data"]["instrumentHistoryBySessionYearInstNbr"]:
+        for row in history:
             action_text = row["Matter"]
 
             if action_text == "":
@@ -261,27 +355,44 @@ class ALBillScraper(Scraper):
                     media_type=get_media_type(amd_url),
                 )
 
-            if int(row["VoteNbr"]) > 0:
-                yield from self.scrape_vote(bill, row)
+            if self.has_vote(row):
+                yield from self.scrape_vote(bill, row, votes[self.vote_id(row)])
 
         if bill_row["ViewEnacted"]:
             self.scrape_act(bill, bill_row["ViewEnacted"])
 
-    def scrape_fiscal_notes(self, bill):
-        bill_id = bill.identifier.replace(" ", "")
+    def history_field(self, bill_row):
+        return f'instrumentHistoryBySessionYearInstNbr(sessionType:"{self.session_type}", sessionYear:"{self.session_year}", instrumentNbr:"{bill_row["InstrumentNbr"]}", ){{ InstrumentNbr,SessionYear,SessionType,CalendarDate,Body,AmdSubUrl,Matter,Committee,Nay,Yea,Vote,VoteNbr }}'
+
+    def fiscal_notes_field(self, bill_row):
+        bill_id = bill_row["InstrumentNbr"].replace(" ", "")
         bill_type = "B" if "B" in bill_id else "R"
 
-        # {fiscalNotesBySessionYearInstrumentNbr(sessionType:\"2023 Regular Session\", sessionYear:\"2023\", instrumentNbr:\"HB246\", instrumentType:\"B\", ){ FiscalNoteDescription, FiscalNoteUrl, OidFiscalNote, SortOrder }}
-        json_data = {
-            "query": f'{{fiscalNotesBySessionYearInstrumentNbr(instrumentType:"{bill_type}", instrumentNbr:"{bill_id}", sessionYear:"{self.session_year}", sessionType:"{self.session_type}"){{ FiscalNoteDescription, FiscalNoteUrl, OidFiscalNote, SortOrder }}}}',
-            "operationName": "",
-            "variables": [],
-        }
+        # fiscalNotesBySessionYearInstrumentNbr(sessionType:\"2023 Regular Session\", sessionYear:\"2023\", instrumentNbr:\"HB246\", instrumentType:\"B\", ){ FiscalNoteDescription, FiscalNoteUrl, OidFiscalNote, SortOrder }
+        return f'fiscalNotesBySessionYearInstrumentNbr(instrumentType:"{bill_type}", instrumentNbr:"{bill_id}", sessionYear:"{self.session_year}", sessionType:"{self.session_type}"){{ FiscalNoteDescription, FiscalNoteUrl, OidFiscalNote, SortOrder }}'
 
-        page = self.post(self.gql_url, headers=self.gql_headers, json=json_data)
-        page = json.loads(page.content)
+    def roll_call_field(self, action_row):
+        cal_date = self.transform_date(action_row["CalendarDate"])
+        return f'rollCallVotesByRollNbr( instrumentNbr:"{action_row["InstrumentNbr"]}", sessionYear:"{self.session_year}", sessionType:"{self.session_type}", calendarDate:"{cal_date}", rollNumber:"{action_row["VoteNbr"]}"){{ FullName,Vote,Yeas,Nays,Abstains,Pass }}'
+
+    # scrape_actions skips blank actions and ones with no chamber,
+    # so their roll calls aren't requested
+    def has_vote(self, action_row):
+        return (
+            action_row["Matter"] != ""
+            and action_row["Body"] != ""
+            and int(action_row["VoteNbr"]) > 0
+        )
+
+    def vote_id(self, action_row):
+        return (
+            action_row["InstrumentNbr"],
+            action_row["CalendarDate"],
+            action_row["VoteNbr"],
+        )
 
-        for row in page["data"]["fiscalNotesBySessionYearInstrumentNbr"]:
+    def scrape_fiscal_notes(self, bill, fiscal_notes):
+        for row in fiscal_notes:
             bill.add_document_link(
                 f"Fiscal Note: {row['FiscalNoteDescription']}",
                 row["FiscalNoteUrl"],
@@ -289,22 +400,15 @@ class ALBillScraper(Scraper):
                 on_duplicate="ignore",
             )
 
-    def scrape_vote(self, bill, action_row):
+    def scrape_vote(self, bill, action_row, roll_call):
         cal_date = self.transform_date(action_row["CalendarDate"])
-        json_data = {
-            "query": f'{{rollCallVotesByRollNbr( instrumentNbr:"{action_row["InstrumentNbr"]}", sessionYear:"{self.session_year}", sessionType:"{self.session_type}", calendarDate:"{cal_date}", rollNumber:"{action_row["VoteNbr"]}"){{ FullName,Vote,Yeas,Nays,Abstains,Pass }}}}',
-            "operationName": "",
-            "variables": [],
-        }
-        page = self.post(self.gql_url, headers=self.gql_headers, json=json_data)
-        page = json.loads(page.content)
 
         # occasionally there's a vote number, but no data for it.
         # ie 2023s1 SR5, vote number 4
-        if len(page["data"]["rollCallVotesByRollNbr"]) < 1:
+        if len(roll_call) < 1:
             return
 
-        first_vote = page["data"]["rollCallVotesByRollNbr"][0]
+        first_vote = roll_call[0]
         passed = first_vote["Yeas"] > (first_vote["Nays"] + first_vote["Abstains"])
 
         vote_chamber = self.chamber_map_short[action_row["Body"]]
@@ -340,7 +444,7 @@ class ALBillScraper(Scraper):
 
         vote.add_source("https://alison.legislature.state.al.us/bill-search")
 
-        for row in page["data"]["rollCallVotesByRollNbr"]:
+        for row in roll_call:
             vote.vote(self.vote_types[row["Vote"]], row["FullName"])
 
         yield vote
@@ -5,7 +5,6 @@ import pytz
 import os
 import ssl
 import ftplib
-import tempfile
 
 
 from openstates.scrape import Scraper, Bill, VoteEvent
@@ -17,6 +16,9 @@ from .common import get_slug_for_session, get_biennium_year
 
 TIMEZONE = pytz.timezone("US/Central")
 
+# copies of the session files downloaded from the FTP server
+AR_DATA_DIR = os.environ.get("AR_DATA_DIR", os.path.join("_cache", "ar"))
+
 
 # Needed because they're using a port python doesn't expect
 # https://stackoverflow.com/questions/12164470/python-ftp-implicit-tls-connection-issue
@@ -63,10 +65,15 @@ class ARBillScraper(Scraper):
 
         leg_chambers = [chamber] if chamber else ["upper", "lower"]
 
-        for leg_chamber in leg_chambers:
-            self.scrape_bill(leg_chamber, session)
+        self._ftp_files = {}
+        try:
+            for leg_chamber in leg_chambers:
+                self.scrape_bill(leg_chamber, session)
 
-        self.scrape_actions()
+            self.scrape_actions()
+        finally:
+            self.close_ftp()
+            self._ftp_files = {}
 
         if not self.bills:
             raise EmptyScrape
@@ -462,18 +469,78 @@ class ARBillScraper(Scraper):
         data = data.replace("\x00", "")
         return data
 
+    def ftp_client(self):
+        """The FTPS session for this run, connected on first use."""
+        if getattr(self, "_ftp_client", None) is None:
+            ftp_client = ImplicitFTP_TLS()
+            ftp_client.connect(host="secureftp.arkleg.state.ar.us", port=990)
+            ftp_client.login(user=self.ftp_user, passwd=self.ftp_pass)
+            ftp_client.prot_p()
+            ftp_client.cwd("SessionInformation")
+            self._ftp_client = ftp_client
+        return self._ftp_client
+
+    def close_ftp(self):
+        if getattr(self, "_ftp_client", None) is not None:
+            try:
+                self._ftp_client.quit()
+            except ftplib.all_errors:
+                self._ftp_client.close()
+            self._ftp_client = None
+
+    def ftp_command(self, command):
+        """Run a command on the session, reconnecting once if it has dropped
+        since it was last used."""
+        try:
+            return command(self.ftp_client())
+        except (EOFError, OSError, ftplib.error_temp):
+            self.info("FTP session dropped, reconnecting")
+            self._ftp_client = None
+            return command(self.ftp_client())
+
     def get_utf_16_ftp_content(self, filename):
-        self.info(f"GET from ftp: {filename}")
-        ftp_client = ImplicitFTP_TLS()
-        ftp_client.connect(host="secureftp.arkleg.state.ar.us", port=990)
-        ftp_client.login(user=self.ftp_user, passwd=self.ftp_pass)
-        ftp_client.prot_p()
-        ftp_client.cwd("SessionInformation")
-        raw = tempfile.NamedTemporaryFile()
-
-        with open(raw.name, "wb") as f:
-            ftp_client.retrbinary("RETR " + filename, raw.write)
-
-        with open(raw.name, "rb") as f:
+        """
+        Each file is downloaded at most once per run, and only if its MDTM
+        changed since the copy kept in AR_DATA_DIR was downloaded. Files the
+        server won't give an MDTM for are always downloaded.
+        """
+        if filename in self._ftp_files:
+            return self._ftp_files[filename]
+
+        path = os.path.join(AR_DATA_DIR, filename)
+        try:
+            mdtm = self.ftp_command(lambda ftp: ftp.sendcmd("MDTM " + filename))
+        except (ftplib.error_perm, ftplib.error_reply):
+            mdtm = None
+        if mdtm is not None and not re.match(r"213 \d{14}", mdtm):
+            mdtm = None
+        if mdtm is None:
+            self.info(f"no MDTM for {filename}, not caching it")
+
+        cached_mdtm = None
+        if os.path.exists(path) and os.path.exists(path + ".mdtm"):
+            with open(path + ".mdtm") as f:
+                cached_mdtm = f.read()
+
+        if mdtm is not None and mdtm == cached_mdtm:
+            self.info(f"{filename} unchanged, using {path}")
+        else:
+            self.info(f"GET from ftp: {filename}")
+            os.makedirs(AR_DATA_DIR, exist_ok=True)
+
+            def retrieve(ftp):
+                with open(path + ".part", "wb") as f:
+                    ftp.retrbinary("RETR " + filename, f.write)
+
+            self.ftp_command(retrieve)
+            os.replace(path + ".part", path)
+            if mdtm is not None:
+                with open(path + ".mdtm", "w") as f:
+                    f.write(mdtm)
+            elif os.path.exists(path + ".mdtm"):
+                os.remove(path + ".mdtm")
+
+        with open(path, "rb") as f:
             text = self.decode_ar_utf16(f.read())
-            return text
+        self._ftp_files[filename] = text
+        return text
@@ -89,3 +89,4 @@ _categorizer_rules = (
 
 class CACategorizer(BaseCategorizer):
     rules = _categorizer_rules
+    compiled = True
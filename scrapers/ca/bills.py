@@ -4,12 +4,13 @@ import pytz
 import operator
 import itertools
 import datetime
-from lxml import etree, html
+from lxml import html
 from utils import LXMLMixin
+from utils.actions import CategorizerCacheMixin
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 from openstates.scrape import Scraper, Bill, VoteEvent
-from .models import CABill
+from .models import CABill, bill_loader_options
 from .actions import CACategorizer
 
 SPONSOR_TYPES = {
@@ -22,6 +23,10 @@ MYSQL_HOST = os.environ.get("MYSQL_HOST", "localhost")
 MYSQL_USER = os.environ.get("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.environ.get("MYSQL_PASSWORD", "")
 
+# bills fetched per round of eager loading queries; 0 loads each bill's
+# relations lazily as they're accessed
+BILL_CHUNK_SIZE = 200
+
 
 def clean_title(s):
     # replace smart quote characters
@@ -196,7 +201,7 @@ def get_committee_name_regex():
     return _committee_abbr_regex
 
 
-class CABillScraper(Scraper, LXMLMixin):
+class CABillScraper(CategorizerCacheMixin, Scraper, LXMLMixin):
     categorizer = CACategorizer()
 
     _tz = pytz.timezone("US/Pacific")
@@ -244,7 +249,7 @@ class CABillScraper(Scraper, LXMLMixin):
                 raise KeyError
             return committee_abbr_to_name[other_chamber][slugify(abbr)]
 
-    def scrape(self, chamber=None, session=None):
+    def scrape(self, chamber=None, session=None, chunk_size=None):
         if session is None:
             session = self.jurisdiction.legislative_sessions[-1]["identifier"]
             self.info("no session specified, using %s", session)
@@ -267,9 +272,47 @@ class CABillScraper(Scraper, LXMLMixin):
             },
         }
 
+        chunk_size = BILL_CHUNK_SIZE if chunk_size is None else int(chunk_size)
+
         for chamber in chambers:
             for abbr, type_ in bill_types[chamber].items():
-                yield from self.scrape_bill_type(chamber, session, type_, abbr)
+                yield from self.scrape_bill_type(
+                    chamber, session, type_, abbr, chunk_size=chunk_size
+                )
+
+    def query_bills(self, session, type_abbr, chunk_size):
+        """
+        Query the bills of a measure type. With a chunk_size, bills are
+        fetched in pages of that many by bill_id, with all the relations the
+        scrape touches eagerly loaded, so each page costs a fixed number of
+        queries instead of several per bill.
+
+        Each page is read in full before its relations are loaded: MySQL
+        connections can't run the eager loading queries while a streaming
+        (yield_per) cursor is still open.
+        """
+        bills = (
+            self.session.query(CABill)
+            .filter_by(session_year=session)
+            .filter_by(measure_type=type_abbr)
+        )
+        if not chunk_size:
+            yield from bills
+            return
+
+        bills = bills.options(*bill_loader_options()).order_by(CABill.bill_id)
+        last_bill_id = None
+        while True:
+            page = bills
+            if last_bill_id is not None:
+                page = page.filter(CABill.bill_id > last_bill_id)
+            page = page.limit(chunk_size).all()
+            if not page:
+                return
+            last_bill_id = page[-1].bill_id
+            yield from page
+            if len(page) < chunk_size:
+                return
 
     def scrape_bill_type(
         self,
@@ -278,12 +321,9 @@ class CABillScraper(Scraper, LXMLMixin):
         bill_type,
         type_abbr,
         committee_abbr_regex=get_committee_name_regex(),
+        chunk_size=BILL_CHUNK_SIZE,
     ):
-        bills = (
-            self.session.query(CABill)
-            .filter_by(session_year=session)
-            .filter_by(measure_type=type_abbr)
-        )
+        bills = self.query_bills(session, type_abbr, chunk_size)
 
         archive_year = int(session[0:4])
         not_archive_year = archive_year >= 2009
@@ -321,17 +361,7 @@ class CABillScraper(Scraper, LXMLMixin):
 
             # Get digest test (aka "summary") from latest version.
             if bill.versions and not_archive_year:
-                version = bill.versions[-1]
-                nsmap = version.xml.nsmap
-                xpath = "//caml:DigestText/xhtml:p"
-                els = version.xml.xpath(xpath, namespaces=nsmap)
-                chunks = []
-                for el in els:
-                    t = etree_text_content(el)
-                    t = re.sub(r"\s+", " ", t)
-                    t = re.sub(r"\)(\S)", lambda m: ") %s" % m.group(1), t)
-                    chunks.append(t)
-                summary = "\n\n".join(chunks)
+                summary = bill.versions[-1].digest
 
             for version in bill.versions:
                 if not version.bill_xml:
@@ -752,8 +782,8 @@ class CABillScraper(Scraper, LXMLMixin):
                 )
 
             yield fsbill
-            self.session.expire_all()
-
-
-def etree_text_content(el):
-    return html.fromstring(etree.tostring(el)).text_content()
+            # expiring would throw away the relations eagerly loaded for
+            # the rest of the page; unreferenced bills are dropped from
+            # the session's weak identity map as the pages go by
+            if not chunk_size:
+                self.session.expire_all()
@@ -5,10 +5,20 @@ The workflow is:
  - Drop & recreate the local capublic database.
  - Inspect the site with regex and determine which files have been updated, if any.
  - For each such file, unzip it & call import.
+
+With --incremental the database is kept between runs instead. The full
+pubinfo_{year}.zip is only loaded when the database has never been built,
+when --rebuild is passed, or when check_consistency() fails; otherwise only
+the pubinfo_daily_*.zip files that haven't been applied yet are loaded, oldest
+first, and merged into the existing tables by their TRANS_UPDATE columns.
+Tables without a primary key are merged by NATURAL_KEYS; a daily file for any
+other such table triggers a full rebuild rather than appending duplicates.
 """
 import os
 import re
 import glob
+import time
+import threading
 import os.path
 import subprocess
 import logging
@@ -18,6 +28,7 @@ from datetime import datetime
 from os.path import join, split
 from functools import partial
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 import requests
 import MySQLdb
@@ -29,6 +40,55 @@ MYSQL_PASSWORD = os.environ.get("MYSQL_PASSWORD", "")
 
 BASE_URL = "https://downloads.leginfo.legislature.ca.gov/"
 
+# bookkeeping table recording which zip files have been loaded into capublic
+APPLIED_TABLE = "capublic.os_applied_files"
+
+# bill_version_tbl rows are sent in batches capped by row count and size,
+# well under the max_allowed_packet the server is started with
+BILL_VERSION_BATCH_SIZE = int(os.environ.get("CA_BILL_VERSION_BATCH_SIZE", 500))
+BILL_VERSION_BATCH_BYTES = 64 * 1024 * 1024
+
+# number of connections tables are loaded on concurrently
+LOAD_WORKERS = int(os.environ.get("CA_LOAD_WORKERS", 4))
+
+# tables loaded in python rather than by a LOAD DATA script
+PYTHON_TABLES = {"bill_version_tbl"}
+
+# tables that may only be loaded once the listed tables have finished; the
+# pubinfo tables have no foreign keys between them, so none are needed today
+TABLE_DEPENDENCIES = {}
+
+# tables that must never be empty after a load
+REQUIRED_TABLES = ("bill_tbl", "bill_version_tbl", "bill_history_tbl")
+
+# natural keys of the tables that have no primary key in capublic: a staged
+# row replaces every existing row with the same natural key. Daily rows for
+# any other table without a primary key force a full rebuild
+NATURAL_KEYS = {
+    "bill_version_authors_tbl": ("BILL_VERSION_ID",),
+    "bill_summary_vote_tbl": (
+        "BILL_ID",
+        "MOTION_ID",
+        "VOTE_DATE_TIME",
+        "VOTE_DATE_SEQ",
+    ),
+    "bill_detail_vote_tbl": (
+        "BILL_ID",
+        "MOTION_ID",
+        "VOTE_DATE_TIME",
+        "VOTE_DATE_SEQ",
+        "LEGISLATOR_NAME",
+    ),
+    "committee_hearing_tbl": (
+        "BILL_ID",
+        "COMMITTEE_TYPE",
+        "COMMITTEE_NR",
+        "HEARING_DATE",
+    ),
+    "legislator_tbl": ("DISTRICT", "SESSION_YEAR", "LEGISLATOR_NAME", "HOUSE_TYPE"),
+    "location_code_tbl": ("SESSION_YEAR", "LOCATION_CODE", "LOCATION_TYPE"),
+}
+
 
 # ----------------------------------------------------------------------------
 # Logging config
@@ -75,6 +135,22 @@ def db_drop():
     logger.info("...done.")
 
 
+def db_connect(**kwargs):
+    return MySQLdb.connect(
+        host=MYSQL_HOST, user=MYSQL_USER, passwd=MYSQL_PASSWORD, **kwargs
+    )
+
+
+def db_exists():
+    """Whether a capublic database is already present."""
+    try:
+        connection = db_connect(db="capublic")
+    except MySQLdb._exceptions.OperationalError:
+        return False
+    connection.close()
+    return True
+
+
 # ---------------------------------------------------------------------------
 # Functions for updating the data.
 DatRow = namedtuple(
@@ -122,16 +198,47 @@ def encode_or_none(value):
     return value.encode() if value else None
 
 
-def load_bill_versions(connection):
+def iter_bill_versions(filename="BILL_VERSION_TBL.dat"):
+    """
+    Lazily yield encoded bill_version_tbl rows, reading each row's bill
+    XML file only when the row is reached.
+    """
+    with open(filename) as dat:
+        for line in dat:
+            # The files are supposedly already in utf-8, but with
+            # copious bogus characters.
+            row = dat_row_2_tuple(clean_text(line))
+            with open(row.bill_xml) as xml:
+                row = row._replace(bill_xml=clean_text(xml.read()))
+            yield [encode_or_none(column) for column in row]
+
+
+def _row_size(row):
+    return sum(len(column) for column in row if column)
+
+
+def load_bill_versions(
+    connection,
+    table="capublic.bill_version_tbl",
+    batch_size=None,
+    max_batch_bytes=BILL_VERSION_BATCH_BYTES,
+):
     """
-    Given a data folder, read its BILL_VERSION_TBL.dat file in python,
-    construct individual REPLACE statements and execute them one at
-    a time. This method is slower that letting mysql do the import,
-    but doesn't fail mysteriously.
+    Given a data folder, read its BILL_VERSION_TBL.dat file in python
+    and REPLACE its rows in batches. This method is slower that letting
+    mysql do the import, but doesn't fail mysteriously.
+
+    Rows are streamed from disk and sent as multi-row executemany()
+    statements of at most `batch_size` rows or `max_batch_bytes` bytes,
+    each committed in its own transaction, so only one batch of bill XML
+    is ever held in memory. batch_size=1 reproduces the old row at a time
+    behaviour for comparison.
+
+    `table` lets incremental loads target a staging table instead.
     """
 
     sql = """
-        REPLACE INTO capublic.bill_version_tbl (
+        REPLACE INTO {table} (
             BILL_VERSION_ID,
             BILL_ID,
             VERSION_NUM,
@@ -153,31 +260,138 @@ def load_bill_versions(connection):
 
         VALUES (%s)
         """
-    sql = sql % ", ".join(["%s"] * 18)
+    sql = sql.format(table=table) % ", ".join(["%s"] * 18)
+    batch_size = batch_size or BILL_VERSION_BATCH_SIZE
 
+    connection.autocommit(False)
     cursor = connection.cursor()
-    with open("BILL_VERSION_TBL.dat") as f:
-        for row in f:
-            # The files are supposedly already in utf-8, but with
-            # copious bogus characters.
-            row = clean_text(row)
-            row = dat_row_2_tuple(row)
-            with open(row.bill_xml) as f:
-                text = f.read()
-                text = clean_text(text)
-                row = row._replace(bill_xml=text)
-                cursor.execute(sql, [encode_or_none(column) for column in row])
+    start = time.monotonic()
+    total_rows = total_bytes = 0
+    batch, batch_bytes = [], 0
+    rows = iter_bill_versions()
 
-    cursor.close()
+    try:
+        while True:
+            row = next(rows, None)
+            if row is not None:
+                batch.append(row)
+                batch_bytes += _row_size(row)
+            if batch and (
+                row is None
+                or len(batch) >= batch_size
+                or batch_bytes >= max_batch_bytes
+            ):
+                cursor.executemany(sql, batch)
+                connection.commit()
+                total_rows += len(batch)
+                total_bytes += batch_bytes
+                batch, batch_bytes = [], 0
+            if row is None:
+                break
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        connection.autocommit(True)
+
+    elapsed = max(time.monotonic() - start, 1e-6)
+    logger.info(
+        "inserted %d bill versions (%.1f MB) in %.1fs: %.0f rows/s, %.2f MB/s"
+        % (
+            total_rows,
+            total_bytes / 1e6,
+            elapsed,
+            total_rows / elapsed,
+            total_bytes / 1e6 / elapsed,
+        )
+    )
+
+
+def load_table(connection, table, script, incremental=False):
+    """Load a single table's .dat file and log how long it took."""
+    start = time.monotonic()
+    if incremental:
+        stage = create_stage(connection, table)
+        if table in PYTHON_TABLES:
+            load_bill_versions(connection, table=stage)
+        else:
+            cursor = connection.cursor()
+            cursor.execute(_retarget_script(script, stage))
+            cursor.close()
+        merge_staged(connection, table, stage)
+    elif table in PYTHON_TABLES:
+        logger.info("inserting xml files")
+        load_bill_versions(connection)
+    else:
+        cursor = connection.cursor()
+        cursor.execute(script)
+        cursor.close()
+    logger.info("loaded %s in %.1fs" % (table, time.monotonic() - start))
 
 
-def load(folder, sql_name=partial(re.compile(r"\.dat$").sub, ".sql")):
+def run_scheduled(tasks, dependencies, workers):
+    """
+    Run `tasks`, a mapping of table name to a callable taking a MySQLdb
+    connection, on a pool of `workers` threads that each hold their own
+    connection. A table is only started once every table it depends on
+    has finished; tables in PYTHON_TABLES get a worker of their own so
+    they don't hold up the LOAD DATA scripts.
+    """
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+
+    def run(task):
+        if not hasattr(local, "connection"):
+            local.connection = db_connect(db="capublic", local_infile=1)
+            local.connection.autocommit(True)
+            with lock:
+                connections.append(local.connection)
+        task(local.connection)
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    python_pool = ThreadPoolExecutor(max_workers=1)
+    pending = dict(tasks)
+    running = {}
+    done = set()
+    try:
+        while pending or running:
+            for name in list(pending):
+                if set(dependencies.get(name, ())) & set(tasks) <= done:
+                    executor = python_pool if name in PYTHON_TABLES else pool
+                    running[executor.submit(run, pending.pop(name))] = name
+            if not running:
+                raise ValueError("circular table dependencies: %s" % sorted(pending))
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                # re-raises any error from the worker
+                future.result()
+                done.add(name)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        python_pool.shutdown(cancel_futures=True)
+        for connection in connections:
+            connection.close()
+
+
+def load(
+    folder,
+    sql_name=partial(re.compile(r"\.dat$").sub, ".sql"),
+    incremental=False,
+    workers=None,
+):
     """
     Import into mysql any .dat files located in `folder`.
 
     First get a list of filenames like *.dat, then for each, execute
     the corresponding .sql file after swapping out windows paths for
-    `folder`.
+    `folder`. Tables are loaded concurrently on `workers` connections
+    (CA_LOAD_WORKERS by default), honouring TABLE_DEPENDENCIES.
+
+    When `incremental` is set, each table is loaded into a staging copy
+    and merged into the existing table with merge_staged() instead.
 
     This function doesn't bother to delete the imported data files
     afterwards; they'll be overwritten within a week, and leaving them
@@ -185,18 +399,11 @@ def load(folder, sql_name=partial(re.compile(r"\.dat$").sub, ".sql")):
     """
 
     logger.info("Loading data from %s..." % folder)
+    start = time.monotonic()
     os.chdir(folder)
 
-    connection = MySQLdb.connect(
-        host=MYSQL_HOST,
-        user=MYSQL_USER,
-        passwd=MYSQL_PASSWORD,
-        db="capublic",
-        local_infile=1,
-    )
-    connection.autocommit(True)
-
     filenames = glob.glob("*.dat")
+    tasks = {}
 
     for filename in filenames:
 
@@ -209,18 +416,242 @@ def load(folder, sql_name=partial(re.compile(r"\.dat$").sub, ".sql")):
             script = f.read().replace(r"c:\\pubinfo\\", folder)
 
         _, sql_filename = split(sql_filename)
-        logger.info("loading " + sql_filename)
-        if sql_filename == "bill_version_tbl.sql":
-            logger.info("inserting xml files (slow)")
-            load_bill_versions(connection)
-        else:
-            cursor = connection.cursor()
-            cursor.execute(script)
+        table = sql_filename.replace(".sql", "")
+        tasks[table] = partial(
+            load_table, table=table, script=script, incremental=incremental
+        )
+
+    try:
+        run_scheduled(tasks, TABLE_DEPENDENCIES, workers or LOAD_WORKERS)
+    finally:
+        os.chdir("..")
+    logging.info(
+        "...Done loading from %s in %.1fs" % (folder, time.monotonic() - start)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Incremental updates.
+
+
+def _retarget_script(script, table):
+    """Point a LOAD DATA script at a different table."""
+    return re.sub(r"(INTO\s+TABLE\s+)\S+", r"\g<1>" + table, script, flags=re.I)
+
+
+def _table_columns(cursor, table):
+    cursor.execute(
+        "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = 'capublic' AND TABLE_NAME = %s "
+        "ORDER BY ORDINAL_POSITION",
+        [table],
+    )
+    return [row[0].upper() for row in cursor.fetchall()]
+
+
+def _primary_key(cursor, table):
+    cursor.execute(
+        "SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE TABLE_SCHEMA = 'capublic' AND TABLE_NAME = %s "
+        "AND CONSTRAINT_NAME = 'PRIMARY' ORDER BY ORDINAL_POSITION",
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def create_stage(connection, table):
+    """Create an empty temporary copy of `table` to load a daily file into."""
+    stage = "capublic.stage_" + table
+    cursor = connection.cursor()
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {stage}")
+    cursor.execute(f"CREATE TEMPORARY TABLE {stage} LIKE capublic.{table}")
+    cursor.close()
+    return stage
+
+
+class NeedsRebuild(Exception):
+    """Raised when a daily file can't be merged into the existing tables."""
+
+
+def merge_staged(connection, table, stage):
+    """
+    Merge the rows of a staging table into `table`.
+
+    A staged row replaces the existing row with the same primary key only
+    if its TRANS_UPDATE is at least as recent, so re-applying or
+    overlapping daily files never rolls a row back. Tables without a
+    primary key are merged by their NATURAL_KEYS, or raise NeedsRebuild.
+    """
+    cursor = connection.cursor()
+    keys = _primary_key(cursor, table)
+    columns = _table_columns(cursor, table)
+    if not keys:
+        natural_keys = NATURAL_KEYS.get(table.lower())
+        if not natural_keys or not set(natural_keys) <= set(columns):
+            cursor.execute(f"DROP TEMPORARY TABLE {stage}")
             cursor.close()
+            raise NeedsRebuild(f"{table} has no key to merge daily rows by")
+        join_on = " AND ".join(f"t.{key} <=> s.{key}" for key in natural_keys)
+        cursor.execute(f"DELETE t FROM capublic.{table} t JOIN {stage} s ON {join_on}")
+        logger.info("replacing %s rows of %s" % (cursor.rowcount, table))
+        cursor.execute(f"INSERT INTO capublic.{table} SELECT * FROM {stage}")
+    elif "TRANS_UPDATE" in columns:
+        join_on = " AND ".join(f"t.{key} = s.{key}" for key in keys)
+        cursor.execute(
+            f"REPLACE INTO capublic.{table} "
+            f"SELECT s.* FROM {stage} s LEFT JOIN capublic.{table} t ON {join_on} "
+            f"WHERE t.{keys[0]} IS NULL OR t.TRANS_UPDATE IS NULL "
+            "OR s.TRANS_UPDATE >= t.TRANS_UPDATE"
+        )
+    else:
+        cursor.execute(f"REPLACE INTO capublic.{table} SELECT * FROM {stage}")
+    logger.info("merged %s rows into %s" % (cursor.rowcount, table))
+    cursor.execute(f"DROP TEMPORARY TABLE {stage}")
+    cursor.close()
+
+
+def ensure_applied_table(connection):
+    cursor = connection.cursor()
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {APPLIED_TABLE} (
+            FILENAME VARCHAR(100) NOT NULL,
+            FILE_DATE DATETIME NOT NULL,
+            KIND VARCHAR(5) NOT NULL,
+            APPLIED_AT DATETIME NOT NULL,
+            PRIMARY KEY (FILENAME, FILE_DATE)
+        )
+        """
+    )
+    cursor.close()
 
+
+def get_applied(connection):
+    """Return a list of (filename, file_date, kind) already loaded, oldest first."""
+    cursor = connection.cursor()
+    cursor.execute(
+        f"SELECT FILENAME, FILE_DATE, KIND FROM {APPLIED_TABLE} ORDER BY FILE_DATE"
+    )
+    applied = list(cursor.fetchall())
+    cursor.close()
+    return applied
+
+
+def record_applied(connection, filename, date, kind):
+    cursor = connection.cursor()
+    cursor.execute(
+        f"REPLACE INTO {APPLIED_TABLE} VALUES (%s, %s, %s, %s)",
+        [filename, date, kind, datetime.now()],
+    )
+    cursor.close()
+
+
+def is_daily(filename):
+    return filename.startswith("pubinfo_daily")
+
+
+def latest_full(contents):
+    """Name of the newest pubinfo_{year}.zip listed on the site."""
+    fulls = [f for f in contents if re.match(r"pubinfo_\d{4}\.zip$", f)]
+    return max(fulls) if fulls else None
+
+
+def pending_dailies(contents, applied):
+    """
+    Daily files listed on the site that haven't been applied yet and are
+    newer than the last full load, as (filename, date) pairs oldest first.
+
+    Daily files are named after the weekday, so the same filename comes
+    back every week; (filename, date) pairs are what identifies a file.
+    """
+    done = {(filename, date) for filename, date, _ in applied}
+    fulls = [date for _, date, kind in applied if kind == "full"]
+    since = max(fulls) if fulls else datetime.min
+    return sorted(
+        (
+            (filename, date)
+            for filename, date in contents.items()
+            if is_daily(filename) and date > since and (filename, date) not in done
+        ),
+        key=lambda pair: pair[1],
+    )
+
+
+def check_consistency(connection, contents):
+    """
+    Return a list of reasons the local database can't be brought up to
+    date incrementally. An empty list means it is safe to apply dailies.
+    """
+    problems = []
+    applied = get_applied(connection)
+    if not any(kind == "full" for _, _, kind in applied):
+        problems.append("no full load recorded")
+        return problems
+
+    cursor = connection.cursor()
+    for table in REQUIRED_TABLES:
+        cursor.execute(f"SELECT COUNT(*) FROM capublic.{table}")
+        if not cursor.fetchone()[0]:
+            problems.append(f"{table} is empty")
+    cursor.close()
+
+    # The site only keeps the last week of dailies; if the oldest one
+    # listed is newer than anything we've applied, some were missed.
+    last_applied = applied[-1][1]
+    dailies = [date for filename, date in contents.items() if is_daily(filename)]
+    if dailies and min(dailies) > last_applied:
+        problems.append(f"missing dailies between {last_applied} and {min(dailies)}")
+    return problems
+
+
+def apply_dailies(connection, contents):
+    for filename, date in pending_dailies(contents, get_applied(connection)):
+        logger.info("applying %s (%s)" % (filename, date))
+        dirname = get_zip(filename)
+        load(dirname, incremental=True)
+        record_applied(connection, filename, date, "daily")
+
+
+def full_load(contents, year=None):
+    """Drop & recreate capublic and load a full pubinfo zip into it."""
+    filename = f"pubinfo_{year}.zip" if year else latest_full(contents)
+    db_drop()
+    db_create()
+    dirname = get_zip(filename)
+    load(dirname)
+
+    connection = db_connect(db="capublic")
+    connection.autocommit(True)
+    ensure_applied_table(connection)
+    record_applied(connection, filename, contents.get(filename, datetime.now()), "full")
+    return connection
+
+
+def update(contents, year=None, rebuild=False):
+    """
+    Bring capublic up to date, applying only new daily files when the
+    existing database allows it and falling back to a full rebuild.
+    """
+    if not rebuild and db_exists():
+        connection = db_connect(db="capublic", local_infile=1)
+        connection.autocommit(True)
+        ensure_applied_table(connection)
+        problems = check_consistency(connection, contents)
+        if not problems:
+            try:
+                apply_dailies(connection, contents)
+            except NeedsRebuild as e:
+                problems = [str(e)]
+            else:
+                problems = check_consistency(connection, contents)
+        connection.close()
+        if not problems:
+            return
+        logger.warning("rebuilding capublic: %s" % "; ".join(problems))
+
+    connection = full_load(contents, year)
+    apply_dailies(connection, contents)
     connection.close()
-    os.chdir("..")
-    logging.info("...Done loading from %s" % folder)
 
 
 def db_create():
@@ -312,10 +743,39 @@ def get_data(contents, year):
 if __name__ == "__main__":
     my_parser = argparse.ArgumentParser()
     my_parser.add_argument("--year", action="store", type=int)
+    my_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="keep capublic and only apply daily files not yet loaded",
+    )
+    my_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="with --incremental, force a full rebuild first",
+    )
+    my_parser.add_argument(
+        "--batch-size",
+        action="store",
+        type=int,
+        help="bill_version_tbl rows per REPLACE batch (1 = row at a time)",
+    )
+    my_parser.add_argument(
+        "--workers",
+        action="store",
+        type=int,
+        help="number of tables to load concurrently",
+    )
     args = my_parser.parse_args()
     year = args.year
+    if args.workers:
+        LOAD_WORKERS = args.workers
+    if args.batch_size:
+        BILL_VERSION_BATCH_SIZE = args.batch_size
 
-    db_drop()
-    db_create()
-    contents = get_contents()
-    get_data(contents, year)
+    if args.incremental:
+        update(get_contents(), year, rebuild=args.rebuild)
+    else:
+        db_drop()
+        db_create()
+        contents = get_contents()
+        get_data(contents, year)
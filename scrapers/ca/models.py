@@ -9,14 +9,54 @@ from sqlalchemy import (
 )
 from sqlalchemy.dialects import mysql
 from sqlalchemy.sql import and_
-from sqlalchemy.orm import backref, relation, foreign
+from sqlalchemy.orm import (
+    backref,
+    relation,
+    foreign,
+    configure_mappers,
+    selectinload,
+)
 from sqlalchemy.ext.declarative import declarative_base
 
+import re
+from io import BytesIO
 from lxml import etree
 
 Base = declarative_base()
 
 
+def extract_digest(bill_xml):
+    """
+    Return the normalized text of the caml:DigestText paragraphs of a bill
+    version's XML, joined by blank lines.
+
+    The document is read with iterparse and parsing stops as soon as the
+    digest has been read, which is near the top of the document.
+    """
+    chunks = []
+    depth = None
+    events = etree.iterparse(
+        BytesIO(bill_xml.encode("utf-8")), events=("start", "end"), recover=True
+    )
+    for event, el in events:
+        if depth is None:
+            if event == "start" and etree.QName(el).localname == "DigestText":
+                depth = 0
+            continue
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth < 0:
+            break
+        if depth == 0 and etree.QName(el).localname == "p":
+            text = re.sub(r"\s+", " ", "".join(el.itertext()))
+            text = re.sub(r"\)(\S)", lambda m: ") %s" % m.group(1), text)
+            chunks.append(text)
+            el.clear()
+    return "\n\n".join(chunks)
+
+
 class CABill(Base):
     __tablename__ = "bill_tbl"
 
@@ -97,6 +137,13 @@ class CABillVersion(Base):
             )
         return self._xml
 
+    @property
+    def digest(self):
+        # kept on the instance like xml, so it goes away with the version
+        if "_digest" not in self.__dict__:
+            self._digest = extract_digest(self.bill_xml) if self.bill_xml else ""
+        return self._digest
+
     @property
     def title(self):
         text = self.xml.xpath("string(//*[local-name() = 'Title'])") or ""
@@ -325,3 +372,22 @@ class CACommitteeHearing(Base):
     trans_update_date = Column(DateTime, primary_key=True)
 
     bill = relation(CABill, backref=backref("committee_hearings"))
+
+
+def bill_loader_options():
+    """
+    Loader options that fetch every relation CABillScraper walks for a
+    bill (versions and their authors, actions, votes with their details,
+    location and motion, analyses) with a fixed number of queries per
+    batch of bills instead of lazily per bill.
+    """
+    # backrefs like CAVoteSummary.votes only exist once mappers are configured
+    configure_mappers()
+    return [
+        selectinload(CABill.versions).selectinload(CABillVersion.authors),
+        selectinload(CABill.actions),
+        selectinload(CABill.votes).selectinload(CAVoteSummary.votes),
+        selectinload(CABill.votes).joinedload(CAVoteSummary.location),
+        selectinload(CABill.votes).joinedload(CAVoteSummary.motion),
+        selectinload(CABill.analyses).defer(CABillAnalysis.source_doc),
+    ]
@@ -8,6 +8,7 @@ import pytz
 from openstates.scrape import Scraper, Bill, VoteEvent
 
 from utils import LXMLMixin
+from utils.actions import CategorizerCacheMixin
 
 from .actions import Categorizer
 
@@ -36,7 +37,7 @@ BAD_URLS = [
 ]
 
 
-class COBillScraper(Scraper, LXMLMixin):
+class COBillScraper(CategorizerCacheMixin, Scraper, LXMLMixin):
     _tz = pytz.timezone("US/Mountain")
     categorizer = Categorizer()
 
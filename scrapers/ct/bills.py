@@ -9,6 +9,7 @@ from operator import itemgetter
 import lxml.html
 
 from openstates.scrape import Scraper, Bill
+from utils.actions import CategorizerCacheMixin
 from .utils import parse_directory_listing, open_csv
 from .actions import Categorizer
 
@@ -19,7 +20,7 @@ class SkipBill(Exception):
     pass
 
 
-class CTBillScraper(Scraper):
+class CTBillScraper(CategorizerCacheMixin, Scraper):
     latest_only = True
     categorizer = Categorizer()
 
@@ -8,11 +8,12 @@ from openstates.scrape import Scraper, Bill, VoteEvent
 from .actions import Bill_Categorizer, Vote_Categorizer
 
 from utils.media import get_media_type
+from utils.actions import CategorizerCacheMixin
 
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
 
-class DCBillScraper(Scraper):
+class DCBillScraper(CategorizerCacheMixin, Scraper):
     _TZ = pytz.timezone("US/Eastern")
     bill_categorizer = Bill_Categorizer()
     vote_categorizer = Vote_Categorizer()
@@ -3,10 +3,11 @@ import json
 import requests
 from openstates.scrape import Scraper, Bill, VoteEvent
 from utils import LXMLMixin
+from utils.actions import CategorizerCacheMixin
 from .actions import Categorizer
 
 
-class DEBillScraper(Scraper, LXMLMixin):
+class DEBillScraper(CategorizerCacheMixin, Scraper, LXMLMixin):
     categorizer = Categorizer()
     chamber_codes = {"upper": 1, "lower": 2}
     chamber_codes_rev = {1: "upper", 2: "lower"}
@@ -2,6 +2,7 @@ import datetime as dt
 import lxml.html
 import re
 from openstates.scrape import Scraper, Bill, VoteEvent
+from utils.actions import CategorizerCacheMixin
 from .actions import Categorizer, find_committee
 from .utils import get_short_codes
 from urllib import parse as urlparse
@@ -42,7 +43,7 @@ def split_specific_votes(voters):
     return (v.rstrip(" ;") for v in voters.split(", "))
 
 
-class HIBillScraper(Scraper):
+class HIBillScraper(CategorizerCacheMixin, Scraper):
     categorizer = Categorizer()
     bill_types = ["HB", "HR", "HCR", "SB", "SR", "SCR", "GM"]
     tz = pytz.timezone("US/Hawaii")
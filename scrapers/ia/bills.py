@@ -4,10 +4,11 @@ import lxml.html
 import requests
 import time
 from openstates.scrape import Scraper, Bill
+from utils.actions import CategorizerCacheMixin
 from .actions import Categorizer
 
 
-class IABillScraper(Scraper):
+class IABillScraper(CategorizerCacheMixin, Scraper):
     categorizer = Categorizer()
 
     def scrape(self, session=None, chamber=None, prefiles=None):
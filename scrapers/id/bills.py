@@ -1,5 +1,6 @@
 from openstates.scrape import Scraper
 from openstates.scrape import Bill, VoteEvent
+from utils.actions import CategorizerCacheMixin
 import re
 import datetime
 import dateutil.parser
@@ -61,7 +62,7 @@ def get_bill_type(bill_id):
         return _BILL_TYPES[suffix[1:]]
 
 
-class IDBillScraper(Scraper):
+class IDBillScraper(CategorizerCacheMixin, Scraper):
     categorizer = Categorizer()
 
     # the following are only used for parsing legislation from 2008 and earlier
@@ -1,12 +1,12 @@
 # -*- coding: utf-8 -*-
 import re
-import os
 import datetime
 import pytz
 import scrapelib
 import lxml.html
 from openstates.scrape import Scraper, Bill, VoteEvent
-from openstates.utils import convert_pdf
+from utils import PrefetchMixin
+from utils.pdfcache import cached_convert_pdf
 
 
 central = pytz.timezone("US/Central")
@@ -269,7 +269,7 @@ def chamber_slug(chamber):
     return "S"
 
 
-class IlBillScraper(Scraper):
+class IlBillScraper(PrefetchMixin, Scraper):
     LEGISLATION_URL = "https://ilga.gov/legislation/grplist.asp"
     localize = pytz.timezone("America/Chicago").localize
 
@@ -301,13 +301,15 @@ class IlBillScraper(Scraper):
                 for doc_type in [
                     chamber_slug(chamber) + doc_type for doc_type in DOC_TYPES
                 ]:
-                    for bill_url in self.get_bill_urls(chamber, session_id, doc_type):
+                    bill_urls = self.get_bill_urls(chamber, session_id, doc_type)
+                    for bill_url in self.prefetch(bill_urls):
                         yield from self.scrape_bill(
                             chamber, session_id, doc_type, bill_url
                         )
 
             # special non-chamber cases
-            for bill_url in self.get_bill_urls(chamber, session_id, "AM"):
+            bill_urls = self.get_bill_urls(chamber, session_id, "AM")
+            for bill_url in self.prefetch(bill_urls):
                 yield from self.scrape_bill(
                     chamber, session_id, "AM", bill_url, "appointment"
                 )
@@ -684,12 +686,8 @@ class IlBillScraper(Scraper):
     def fetch_pdf_lines(self, href):
         # download the file
         try:
-            fname, resp = self.urlretrieve(href)
-            pdflines = [
-                line.decode("utf-8") for line in convert_pdf(fname, "text").splitlines()
-            ]
-            os.remove(fname)
-            return pdflines
+            text = cached_convert_pdf(self, href, "text")
+            return [line.decode("utf-8") for line in text.splitlines()]
         except scrapelib.HTTPError as e:
             assert "404" in e.args[0], "File not found: {}".format(e)
             self.warning("404 error for vote; skipping vote")
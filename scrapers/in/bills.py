@@ -1,4 +1,7 @@
 import re
+import json
+import time
+import hashlib
 import datetime
 import lxml
 import os
@@ -8,6 +11,7 @@ import scrapelib
 import pytz
 
 from openstates.scrape import Scraper, Bill, VoteEvent
+from utils.actions import CategorizerCacheMixin
 from openstates.utils import convert_pdf
 
 from .apiclient import ApiClient
@@ -17,9 +21,17 @@ settings = dict(SCRAPELIB_TIMEOUT=600)
 
 PROXY_BASE_URL = "http://in-proxy.openstates.org"
 SCRAPE_WEB_VERSIONS = "INDIANA_SCRAPE_WEB_VERSIONS" in os.environ
+# a fingerprint of every bill scraped is kept here, and unchanged bills are
+# skipped until their last full scrape is this many days old
+IN_DATA_DIR = os.environ.get("IN_DATA_DIR", os.path.join("_cache", "in"))
+FULL_REFRESH_DAYS = float(os.environ.get("IN_FULL_REFRESH_DAYS", 7))
 
 
-class INBillScraper(Scraper):
+def fingerprint(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class INBillScraper(CategorizerCacheMixin, Scraper):
     categorizer = Categorizer()
 
     jurisdiction = "in"
@@ -328,7 +340,8 @@ class INBillScraper(Scraper):
                     )
                     self.info(f"Amendment {doc_id} {document_name} {download_link}")
 
-    def scrape(self, session=None):
+    # pass rescrape=1 to scrape every bill, changed or not
+    def scrape(self, session=None, rescrape=None):
         self._bill_prefix_map = {
             "HB": {"type": "bill", "url_segment": "bills/house"},
             "HR": {"type": "resolution", "url_segment": "resolutions/house/simple"},
@@ -368,8 +381,6 @@ class INBillScraper(Scraper):
             },
         }
 
-        api_base_url = "https://api.iga.in.gov"
-
         # ah, indiana. it's really, really hard to find
         # pdfs in their web interface. Super easy with
         # the api, but a key needs to be passed
@@ -387,6 +398,38 @@ class INBillScraper(Scraper):
         #     {"billName": "SB0001", "displayName": "SB 1", "link": "/2023/bills/sb0001/"}
         # ]
 
+        # the state is only saved once the whole scrape has run, so an
+        # interrupted scrape is redone. It's saved before the bills are
+        # imported though: if the import fails, pass rescrape=1 to scrape
+        # every bill again
+        state_path = os.path.join(IN_DATA_DIR, f"{session}-bills.json")
+        state = {}
+        if os.path.exists(state_path) and not rescrape:
+            with open(state_path) as f:
+                state = json.load(f)
+        yield from self.scrape_bills(client, session, all_pages, state)
+        os.makedirs(IN_DATA_DIR, exist_ok=True)
+        with open(state_path, "w") as f:
+            json.dump(state, f)
+
+        client.log_stats()
+
+    def scrape_bills(self, client, session, all_pages, state):
+        """
+        Scrape the bills in all_pages that changed since they were last
+        scraped, as recorded in state: {bill_id: {fingerprint, scraped}}.
+
+        The listing entries only have billName, displayName and link, so each
+        bill's detail record and actions are always fetched. A bill is
+        unchanged if both are the same as last time (the detail record lists
+        its rollcalls and versions), in which case its rollcall PDFs aren't
+        fetched and it isn't output again. Every bill is scraped in full again
+        once FULL_REFRESH_DAYS have passed.
+        """
+        api_base_url = "https://api.iga.in.gov"
+        refresh_before = time.time() - FULL_REFRESH_DAYS * 86400
+        skipped = 0
+
         for b in all_pages:
             bill_id = b["billName"]
             disp_bill_id = b["displayName"]
@@ -399,6 +442,24 @@ class INBillScraper(Scraper):
                 self.logger.warning("Bill could not be accessed. Skipping.")
                 continue
 
+            try:
+                actions = client.get(
+                    "bill_actions", session=session, bill_id=bill_id.lower()
+                )
+                actions = list(client.unpaginate(actions))
+            except scrapelib.HTTPError:
+                self.logger.warning("Could not find bill actions page")
+                actions = []
+
+            bill_fingerprint = fingerprint({"bill": bill_json, "actions": actions})
+            last = state.get(bill_id, {})
+            if (
+                last.get("scraped", 0) > refresh_before
+                and last.get("fingerprint") == bill_fingerprint
+            ):
+                skipped += 1
+                continue
+
             title = bill_json["description"]
             if title == "NoneNone":
                 title = None
@@ -444,15 +505,6 @@ class INBillScraper(Scraper):
             action_link = bill_json["actions"]["link"]
             api_source = api_base_url + action_link
 
-            try:
-                actions = client.get(
-                    "bill_actions", session=session, bill_id=bill_id.lower()
-                )
-                actions = client.unpaginate(actions)
-            except scrapelib.HTTPError:
-                self.logger.warning("Could not find bill actions page")
-                actions = {"items": []}
-
             for a in actions:
                 action_desc = a["description"]
                 if "governor" in action_desc.lower():
@@ -555,3 +607,9 @@ class INBillScraper(Scraper):
             #     self.scrape_web_versions(session, bill, bill_id)
 
             yield bill
+            state[bill_id] = {
+                "fingerprint": bill_fingerprint,
+                "scraped": time.time(),
+            }
+
+        self.info(f"skipped {skipped} bills unchanged since they were last scraped")
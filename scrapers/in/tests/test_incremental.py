@@ -0,0 +1,85 @@
+import logging
+import unittest
+
+from ..bills import INBillScraper
+
+# a /{session}/bills listing entry, which has no change markers
+LISTING_ENTRY = {
+    "billName": "HB1001",
+    "displayName": "HB 1001",
+    "link": "/2024/bills/hb1001",
+}
+
+
+def bill_json():
+    return {
+        "description": "State budget.",
+        "latestVersion": {"shortDescription": "", "subjects": [], "digest": ""},
+        "originChamber": "house",
+        "authors": [{"firstName": "Jeffrey", "lastName": "Thompson"}],
+        "coauthors": [],
+        "sponsors": [],
+        "cosponsors": [],
+        "actions": {"link": "/2024/bills/hb1001/actions"},
+        "all_rollcalls": [],
+        "versions": [],
+        "year": "2024",
+    }
+
+
+class Client(object):
+    def __init__(self, actions):
+        self.actions = actions
+
+    def get(self, resource_name, **url_format_args):
+        if resource_name == "bill":
+            return bill_json()
+        return {"items": list(self.actions)}
+
+    def unpaginate(self, result):
+        return iter(result["items"])
+
+
+class TestIncrementalScrape(unittest.TestCase):
+    def setUp(self):
+        self.scraper = INBillScraper.__new__(INBillScraper)
+        self.scraper.logger = logging.getLogger("openstates.in.tests")
+        self.scraper.info = self.scraper.logger.info
+        self.scraper._bill_prefix_map = {
+            "HB": {"type": "bill", "url_segment": "bills/house"}
+        }
+        self.actions = [
+            {
+                "description": "First reading: referred to Committee on Ways and Means",
+                "chamber": {"name": "House"},
+                "date": "2024-01-09T00:00:00",
+            }
+        ]
+        self.state = {}
+
+    def scrape(self):
+        client = Client(self.actions)
+        return list(
+            self.scraper.scrape_bills(client, "2024", [LISTING_ENTRY], self.state)
+        )
+
+    def test_unchanged_bill_skipped(self):
+        self.assertEqual(len(self.scrape()), 1)
+        self.assertIn("HB1001", self.state)
+        self.assertEqual(self.scrape(), [])
+
+    def test_new_action_rescraped(self):
+        self.scrape()
+        self.actions.append(
+            {
+                "description": "Second reading: ordered engrossed",
+                "chamber": {"name": "House"},
+                "date": "2024-01-16T00:00:00",
+            }
+        )
+        self.assertEqual(len(self.scrape()), 1)
+
+    def test_stale_bill_rescraped(self):
+        self.scrape()
+        self.state["HB1001"]["scraped"] = 0
+        self.assertEqual(len(self.scrape()), 1)
@@ -8,12 +8,13 @@ from openstates.scrape import Scraper, Bill, VoteEvent
 from openstates.utils import convert_pdf
 from openstates.exceptions import EmptyScrape
 from utils import LXMLMixin
+from utils.actions import CategorizerCacheMixin
 
 # from . import actions
 from .actions import Categorizer
 
 
-class LABillScraper(Scraper, LXMLMixin):
+class LABillScraper(CategorizerCacheMixin, Scraper, LXMLMixin):
     categorizer = Categorizer()
 
     _chambers = {"S": "upper", "H": "lower", "J": "legislature"}
@@ -5,12 +5,13 @@ import json
 from datetime import datetime
 import lxml.html
 from openstates.scrape import Scraper, Bill, VoteEvent
+from utils.actions import CategorizerCacheMixin
 from openstates.utils import convert_pdf
 
 from .actions import Categorizer
 
 
-class MABillScraper(Scraper):
+class MABillScraper(CategorizerCacheMixin, Scraper):
     verify = False
 
     categorizer = Categorizer()
@@ -3,8 +3,8 @@ import datetime
 from collections import defaultdict
 from utils import LXMLMixin
 from utils.votes import check_counts
+from utils.pdfcache import cached_convert_pdf
 from openstates.scrape import Scraper, VoteEvent
-from openstates.utils import convert_pdf
 
 
 class MDVoteScraper(Scraper, LXMLMixin):
@@ -33,8 +33,7 @@ class MDVoteScraper(Scraper, LXMLMixin):
                     seen_urls.add(vote_url)
 
     def scrape_vote(self, url, session):
-        fname, _ = self.urlretrieve(url)
-        text = convert_pdf(fname, type="text").decode()
+        text = cached_convert_pdf(self, url, "text").decode()
         lines = text.splitlines()
 
         chamber = "upper" if "senate" in url else "lower"
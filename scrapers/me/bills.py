@@ -10,13 +10,14 @@ import lxml.html
 import scrapelib
 
 from openstates.scrape import Scraper, Bill, VoteEvent
+from utils.actions import CategorizerCacheMixin
 
 from .actions import Categorizer
 
 BLACKLISTED_BILL_IDS = {"128": ("SP 601", "SP 602"), "129": (), "130": ()}
 
 
-class MEBillScraper(Scraper):
+class MEBillScraper(CategorizerCacheMixin, Scraper):
     categorizer = Categorizer()
     _tz = pytz.timezone("US/Eastern")
 
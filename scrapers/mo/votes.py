@@ -1,12 +1,11 @@
-import os
 import re
 import pytz
 import collections
 import datetime as dt
 
 from utils import LXMLMixin
+from utils.pdfcache import cached_convert_pdf
 
-from openstates.utils import convert_pdf
 from openstates.scrape import Scraper, VoteEvent
 
 motion_re = r"(?i)On motion of .*, .*"
@@ -29,10 +28,7 @@ class MOVoteScraper(Scraper, LXMLMixin):
         return obj
 
     def _get_pdf(self, url):
-        (path, response) = self.urlretrieve(url)
-        data = convert_pdf(path, type="text")
-        os.remove(path)
-        return data
+        return cached_convert_pdf(self, url, "text")
 
     def _scrape_upper_chamber(self, session):
         if int(session[:4]) >= 2016:
@@ -6,6 +6,7 @@ import pytz
 import lxml.html
 
 from openstates.scrape import Scraper, Bill, VoteEvent as Vote
+from utils.actions import CategorizerCacheMixin
 from .actions import Categorizer
 
 from .legacyBills import NHLegacyBillScraper
@@ -23,6 +24,16 @@ bill_type_map = {
     "SSHB": "bill",
 }
 
+DUMP_URL = "https://www.gencourt.state.nh.us/dynamicdatadump/%s"
+DUMPS = (
+    "LSRs.txt",
+    "LsrsOnly.txt",
+    "Docket.txt",
+    "legislators.txt",
+    "LsrSponsors.txt",
+    "RollCallSummary.txt",
+    "RollCallHistory.txt",
+)
 VERSION_URL = "https://www.gencourt.state.nh.us/legislation/%s/%s.html"
 AMENDMENT_URL = "https://www.gencourt.state.nh.us/legislation/amendments/%s.html"
 
@@ -33,7 +44,7 @@ def extract_amendment_id(action):
         return piece[0]
 
 
-class NHBillScraper(Scraper):
+class NHBillScraper(CategorizerCacheMixin, Scraper):
     cachebreaker = dt.datetime.now().strftime("%Y%d%d%H%I%s")
     categorizer = Categorizer()
 
@@ -45,21 +56,22 @@ class NHBillScraper(Scraper):
             self.warning("NH bans scraping between 6am and 9pm. This may fail.")
 
         chambers = [chamber] if chamber else ["upper", "lower"]
+        if int(session) >= 2017:
+            self.load_dumps(session)
         for chamber in chambers:
             yield from self.scrape_chamber(chamber, session)
 
-    def scrape_chamber(self, chamber, session):
-        if int(session) < 2017:
-            legacy = NHLegacyBillScraper(self.metadata, self.datadir)
-            yield from legacy.scrape(chamber, session)
-            # This throws an error because object_count isn't being properly incremented,
-            # even though it saves fine. So fake the output_names
-            self.output_names = ["1"]
-            return
+    def load_dumps(self, session):
+        """
+        Download every data dump back to back, once per run, to keep the time
+        we spend on the NH server short, then index what both chambers need
+        by LSR and bill id.
+        """
+        self.dumps = {}
+        for name in DUMPS:
+            url = DUMP_URL % name + f"?x={self.cachebreaker}"
+            self.dumps[name] = self.get(url).content.decode("utf-8")
 
-        # bill basics
-        self.bills = {}  # LSR->Bill
-        self.bills_by_id = {}  # need a second table to attach votes
         self.versions_by_lsr = {}  # mapping of bill ID to lsr
         self.amendments_by_lsr = {}
 
@@ -67,14 +79,10 @@ class NHBillScraper(Scraper):
         self.scrape_version_ids()
         self.scrape_amendments()
 
+        # LSRs by the body they were introduced in
+        self.lsrs_by_body = defaultdict(list)
         last_line = []
-        for line in (
-            self.get(
-                f"https://www.gencourt.state.nh.us/dynamicdatadump/LSRs.txt?x={self.cachebreaker}"
-            )
-            .content.decode("utf-8")
-            .split("\n")
-        ):
+        for line in self.dumps["LSRs.txt"].split("\n"):
             line = line.split("|")
             if len(line) < 1:
                 continue
@@ -90,6 +98,107 @@ class NHBillScraper(Scraper):
                     self.warning("bad line: %s" % "|".join(line))
                     last_line = line
                     continue
+            if line[0] == session:
+                self.lsrs_by_body[line[3]].append(line)
+
+        # load legislators
+        self.legislators = {}
+        for line in self.dumps["legislators.txt"].split("\n"):
+            if len(line) < 2:
+                continue
+
+            line = line.split("|")
+            employee_num = line[0].replace("\ufeff", "")
+
+            # first, last, middle
+            if len(line) > 2:
+                name = "%s %s %s" % (line[2], line[3], line[1])
+            else:
+                name = "%s %s" % (line[2], line[1])
+
+            self.legislators[employee_num] = {"name": name, "seat": line[5]}
+            # body = line[4]
+
+        self.sponsors_by_lsr = defaultdict(list)
+        for line in self.dumps["LsrSponsors.txt"].split("\n"):
+            if len(line) < 1:
+                continue
+
+            session_yr, lsr, _seq, employee, primary = line.strip().split("|")
+            if session_yr == session:
+                self.sponsors_by_lsr[lsr.zfill(4)].append((employee, primary))
+
+        self.docket_by_lsr = defaultdict(list)
+        for line in self.dumps["Docket.txt"].split("\n"):
+            if len(line) < 1:
+                continue
+            # a few blank/irregular lines, irritating
+            if "|" not in line:
+                continue
+
+            (session_yr, lsr, timestamp, bill_id, body, action, _) = line.split("|")
+            if session_yr == session:
+                self.docket_by_lsr[lsr].append((timestamp, body, action))
+
+        self.roll_calls_by_bill = defaultdict(list)
+        last_line = []
+        for line in self.dumps["RollCallSummary.txt"].splitlines():
+
+            if len(line) < 2:
+                continue
+
+            if line.strip() == "":
+                continue
+
+            line = line.split("|")
+            if len(line) < 14:
+                if len(last_line + line[1:]) == 14:
+                    line = last_line
+                    self.warning("used bad vote line")
+                else:
+                    last_line = line
+                    self.warning("bad vote line %s" % "|".join(line))
+            session_yr = line[0].replace("\xef\xbb\xbf", "")
+            if session_yr == session:
+                self.roll_calls_by_bill[line[4].strip()].append(line)
+
+        self.roll_call_votes_by_bill = defaultdict(list)
+        for line in self.dumps["RollCallHistory.txt"].splitlines():
+            if len(line) < 2:
+                continue
+
+            # 2016|H|2|330795||Yea|
+            # 2012    | H   | 2    | 330795  | 964 |  HB309  | Yea | 1/4/2012 8:27:03 PM
+            try:
+                session_yr, body, v_num, _, employee, bill_id, vote, date = line.split(
+                    "|"
+                )
+            except ValueError:
+                # not enough keys in the split
+                self.warning(f"Skipping {line}, didn't have all needed data for vote")
+                continue
+            if not bill_id:
+                continue
+
+            if session_yr == session:
+                self.roll_call_votes_by_bill[bill_id.strip()].append(
+                    (body, v_num, employee, vote)
+                )
+
+    def scrape_chamber(self, chamber, session):
+        if int(session) < 2017:
+            legacy = NHLegacyBillScraper(self.metadata, self.datadir)
+            yield from legacy.scrape(chamber, session)
+            # This throws an error because object_count isn't being properly incremented,
+            # even though it saves fine. So fake the output_names
+            self.output_names = ["1"]
+            return
+
+        # bill basics
+        self.bills = {}  # LSR->Bill
+        self.bills_by_id = {}  # need a second table to attach votes
+
+        for line in self.lsrs_by_body[body_code[chamber]]:
             session_yr = line[0]
             lsr = line[1]
             title = line[2]
@@ -196,87 +305,34 @@ class NHBillScraper(Scraper):
 
                 self.bills_by_id[bill_id] = self.bills[lsr]
 
-        # load legislators
-        self.legislators = {}
-        for line in (
-            self.get(
-                "https://www.gencourt.state.nh.us/dynamicdatadump/legislators.txt?x={}".format(
-                    self.cachebreaker
-                )
-            )
-            .content.decode("utf-8")
-            .split("\n")
-        ):
-            if len(line) < 2:
-                continue
-
-            line = line.split("|")
-            employee_num = line[0].replace("\ufeff", "")
-
-            # first, last, middle
-            if len(line) > 2:
-                name = "%s %s %s" % (line[2], line[3], line[1])
-            else:
-                name = "%s %s" % (line[2], line[1])
-
-            self.legislators[employee_num] = {"name": name, "seat": line[5]}
-            # body = line[4]
-
         # sponsors
-        for line in (
-            self.get(
-                f"https://www.gencourt.state.nh.us/dynamicdatadump/LsrSponsors.txt?x={self.cachebreaker}"
-            )
-            .content.decode("utf-8")
-            .split("\n")
-        ):
-            if len(line) < 1:
-                continue
-
-            session_yr, lsr, _seq, employee, primary = line.strip().split("|")
-            lsr = lsr.zfill(4)
-            if session_yr == session and lsr in self.bills:
+        for lsr, bill in self.bills.items():
+            for employee, primary in self.sponsors_by_lsr[lsr]:
                 sp_type = "primary" if primary == "1" else "cosponsor"
                 try:
                     # Removes extra spaces in names
                     sponsor_name = self.legislators[employee]["name"].strip()
                     sponsor_name = " ".join(sponsor_name.split())
-                    self.bills[lsr].add_sponsorship(
+                    bill.add_sponsorship(
                         classification=sp_type,
                         name=sponsor_name,
                         entity_type="person",
                         primary=True if sp_type == "primary" else False,
                     )
-                    self.bills[lsr].extras = {
-                        "_code": self.legislators[employee]["seat"]
-                    }
+                    bill.extras = {"_code": self.legislators[employee]["seat"]}
                 except KeyError:
                     self.warning("Error, can't find person %s" % employee)
 
         # actions
-        for line in (
-            self.get(
-                f"https://www.gencourt.state.nh.us/dynamicdatadump/Docket.txt?x={self.cachebreaker}"
-            )
-            .content.decode("utf-8")
-            .split("\n")
-        ):
-            if len(line) < 1:
-                continue
-            # a few blank/irregular lines, irritating
-            if "|" not in line:
-                continue
-
-            (session_yr, lsr, timestamp, bill_id, body, action, _) = line.split("|")
-
-            if session_yr == session and lsr in self.bills:
+        for lsr, bill in self.bills.items():
+            for timestamp, body, action in self.docket_by_lsr[lsr]:
                 actor = "lower" if body == "H" else "upper"
                 time = dt.datetime.strptime(timestamp, "%m/%d/%Y %H:%M:%S %p")
                 action = action.strip()
                 action_attr = self.categorizer.categorize(action)
                 classification = action_attr["classification"]
 
-                self.bills[lsr].add_action(
+                bill.add_action(
                     chamber=actor,
                     description=action,
                     date=time.strftime("%Y-%m-%d"),
@@ -284,7 +340,7 @@ class NHBillScraper(Scraper):
                 )
                 amendment_id = extract_amendment_id(action)
                 if amendment_id:
-                    self.bills[lsr].add_document_link(
+                    bill.add_document_link(
                         note="amendment %s" % amendment_id,
                         url=AMENDMENT_URL % amendment_id,
                         on_duplicate="ignore",
@@ -307,15 +363,7 @@ class NHBillScraper(Scraper):
 
     def scrape_version_ids(self):
 
-        for line in (
-            self.get(
-                "https://www.gencourt.state.nh.us/dynamicdatadump/LsrsOnly.txt?x={}".format(
-                    self.cachebreaker
-                )
-            )
-            .content.decode("utf-8")
-            .split("\n")
-        ):
+        for line in self.dumps["LsrsOnly.txt"].split("\n"):
             if len(line) < 1:
                 continue
             # a few blank/irregular lines, irritating
@@ -329,15 +377,7 @@ class NHBillScraper(Scraper):
             self.versions_by_lsr[lsr] = file_id
 
     def scrape_amendments(self):
-        for line in (
-            self.get(
-                "https://www.gencourt.state.nh.us/dynamicdatadump/Docket.txt?x={}".format(
-                    self.cachebreaker
-                )
-            )
-            .content.decode("utf-8")
-            .split("\n")
-        ):
+        for line in self.dumps["Docket.txt"].split("\n"):
             if len(line) < 1:
                 continue
             # a few blank/irregular lines, irritating
@@ -355,38 +395,20 @@ class NHBillScraper(Scraper):
     def scrape_votes(self, session):
         votes = {}
         other_counts = defaultdict(int)
-        last_line = []
-        vote_url = f"https://www.gencourt.state.nh.us/dynamicdatadump/RollCallSummary.txt?x={self.cachebreaker}"
-        lines = self.get(vote_url).content.decode("utf-8").splitlines()
-
-        for line in lines:
-
-            if len(line) < 2:
-                continue
+        vote_url = DUMP_URL % f"RollCallSummary.txt?x={self.cachebreaker}"
+
+        for bill_id, bill in self.bills_by_id.items():
+            for line in self.roll_calls_by_bill[bill_id]:
+                session_yr = line[0].replace("\xef\xbb\xbf", "")
+                body = line[1]
+                vote_num = line[2]
+                timestamp = line[3]
+                yeas = int(line[5])
+                nays = int(line[6])
+                # present = int(line[7])
+                # absent = int(line[8])
+                motion = line[11].strip() or "[not available]"
 
-            if line.strip() == "":
-                continue
-
-            line = line.split("|")
-            if len(line) < 14:
-                if len(last_line + line[1:]) == 14:
-                    line = last_line
-                    self.warning("used bad vote line")
-                else:
-                    last_line = line
-                    self.warning("bad vote line %s" % "|".join(line))
-            session_yr = line[0].replace("\xef\xbb\xbf", "")
-            body = line[1]
-            vote_num = line[2]
-            timestamp = line[3]
-            bill_id = line[4].strip()
-            yeas = int(line[5])
-            nays = int(line[6])
-            # present = int(line[7])
-            # absent = int(line[8])
-            motion = line[11].strip() or "[not available]"
-
-            if session_yr == session and bill_id in self.bills_by_id:
                 actor = "lower" if body == "H" else "upper"
                 time = dt.datetime.strptime(timestamp, "%m/%d/%Y %I:%M:%S %p")
                 time = pytz.timezone("America/New_York").localize(time).isoformat()
@@ -398,7 +420,7 @@ class NHBillScraper(Scraper):
                     motion_text=motion,
                     result="pass" if passed else "fail",
                     classification="passage",
-                    bill=self.bills_by_id[bill_id],
+                    bill=bill,
                 )
                 vote.set_count("yes", yeas)
                 vote.set_count("no", nays)
@@ -406,30 +428,8 @@ class NHBillScraper(Scraper):
                 vote.dedupe_key = session_yr + body + vote_num  # unique ID for vote
                 votes[body + vote_num] = vote
 
-        for line in (
-            self.get(
-                f"https://www.gencourt.state.nh.us/dynamicdatadump/RollCallHistory.txt?x={self.cachebreaker}"
-            )
-            .content.decode("utf-8")
-            .splitlines()
-        ):
-            if len(line) < 2:
-                continue
-
-            # 2016|H|2|330795||Yea|
-            # 2012    | H   | 2    | 330795  | 964 |  HB309  | Yea | 1/4/2012 8:27:03 PM
-            try:
-                session_yr, body, v_num, _, employee, bill_id, vote, date = line.split(
-                    "|"
-                )
-            except ValueError:
-                # not enough keys in the split
-                self.warning(f"Skipping {line}, didn't have all needed data for vote")
-                continue
-            if not bill_id:
-                continue
-
-            if session_yr == session and bill_id.strip() in self.bills_by_id:
+        for bill_id in self.bills_by_id:
+            for body, v_num, employee, vote in self.roll_call_votes_by_bill[bill_id]:
                 try:
                     leg = " ".join(self.legislators[employee]["name"].split())
                 except KeyError:
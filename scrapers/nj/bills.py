@@ -2,6 +2,8 @@ import io
 import os
 import re
 import csv
+import glob
+import json
 import pytz
 import zipfile
 import collections
@@ -11,10 +13,24 @@ from datetime import datetime
 import scrapelib
 from openstates.scrape import Scraper, Bill, VoteEvent
 
-from .utils import MDBMixin
+from .utils import MDBMixin, NJ_DATA_DIR
 
 TIMEZONE = pytz.timezone("US/Eastern")
 
+# the columns of each type of vote file that read_votes() caches
+VOTE_FILE_COLUMNS = {
+    "chamber": ("Bill", "Full_Name", "Session_Date", "Action", "Legislator_Vote"),
+    "committee": (
+        "Bill_Type",
+        "Bill_Number",
+        "Name",
+        "Agenda_Date",
+        "BillAction",
+        "LegislatorVote",
+        "Committee_House",
+    ),
+}
+
 
 class NJBillScraper(Scraper, MDBMixin):
     _bill_types = {
@@ -258,15 +274,76 @@ class NJBillScraper(Scraper, MDBMixin):
 
         return (act_str, None)
 
-    def scrape(self, session=None):
+    def read_vote_records(self, zippedfile, vfile, vote_file_type):
+        """
+        Return the VOTE_FILE_COLUMNS of each row of a vote file. The raw
+        rows are cached per file and CRC, so only new or changed vote files
+        are decoded again.
+        """
+        crc = zippedfile.getinfo(vfile).CRC
+        cache_dir = os.path.join(NJ_DATA_DIR, "votes")
+        cache_path = os.path.join(cache_dir, f"{vfile}.{crc:08x}.raw.json")
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                return json.load(f)
+
+        columns = VOTE_FILE_COLUMNS[vote_file_type]
+        vote_file = io.TextIOWrapper(zippedfile.open(vfile, "r"), encoding="latin-1")
+        records = [
+            {column: rec[column] for column in columns}
+            for rec in csv.DictReader(vote_file)
+        ]
+
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(cache_dir, f"{glob.escape(vfile)}.*.json")):
+            os.remove(stale)
+        with open(cache_path, "w") as f:
+            json.dump(records, f)
+        return records
+
+    def read_votes(self, zippedfile, vfile, chamber, vote_file_type):
+        """
+        Return (bill_id, legislator, date, action, vote, vote_id) for each
+        row of a vote file.
+        """
+        rows = []
+        for rec in self.read_vote_records(zippedfile, vfile, vote_file_type):
+            if vote_file_type == "chamber":
+                bill_id = rec["Bill"].strip()
+                leg = rec["Full_Name"]
+
+                date = rec["Session_Date"]
+                action = rec["Action"]
+                leg_vote = rec["Legislator_Vote"]
+                vote_parts = (bill_id, chamber, action)
+            else:
+                bill_id = "%s%s" % (rec["Bill_Type"], rec["Bill_Number"])
+                leg = rec["Name"]
+                # drop time portion
+                date = rec["Agenda_Date"].split()[0]
+                # make motion readable
+                action = self._com_vote_motions[rec["BillAction"]]
+                # first char (Y/N) use [0:1] to ignore ''
+                leg_vote = rec["LegislatorVote"][0:1]
+                committee = rec["Committee_House"]
+                vote_parts = (bill_id, chamber, action, committee)
+
+            vote_id = "_".join(vote_parts).replace(" ", "_")
+            rows.append((bill_id, leg, date, action, leg_vote, vote_id))
+        return rows
+
+    def scrape(self, session=None, bill_ids=None):
         year_abr = ((int(session) - 209) * 2) + 2000
+        # e.g. bill_ids=A1,S2 to only scrape those bills
+        if bill_ids:
+            bill_ids = bill_ids.split(",")
         self._init_mdb(year_abr)
         self.initialize_committees(year_abr)
-        yield from self.scrape_bills(session, year_abr)
+        yield from self.scrape_bills(session, year_abr, bill_ids)
 
-    def scrape_bills(self, session, year_abr):
+    def scrape_bills(self, session, year_abr, bill_ids=None):
         # Main Bill information
-        main_bill_csv = self.to_csv("MAINBILL.TXT")
+        main_bill_csv = self.table_rows("MAINBILL.TXT", bill_ids)
 
         # keep a dictionary of bills (mapping bill_id to Bill obj)
         bill_dict = {}
@@ -303,7 +380,7 @@ class NJBillScraper(Scraper, MDBMixin):
             bill_dict[bill_id] = bill
 
         # Sponsors
-        bill_sponsors_csv = self.to_csv("BILLSPON.TXT")
+        bill_sponsors_csv = self.table_rows("BILLSPON.TXT", bill_ids)
 
         for rec in bill_sponsors_csv:
             bill_type = rec["BillType"].strip()
@@ -327,7 +404,7 @@ class NJBillScraper(Scraper, MDBMixin):
             )
 
         # Documents
-        bill_document_csv = self.to_csv("BILLWP.TXT")
+        bill_document_csv = self.table_rows("BILLWP.TXT", bill_ids)
 
         for rec in bill_document_csv:
             bill_type = rec["BillType"].strip()
@@ -394,17 +471,13 @@ class NJBillScraper(Scraper, MDBMixin):
         for filename in vote_info_list:
             s_vote_url = f"https://pub.njleg.state.nj.us/votes/{filename}.zip"
             try:
-                s_vote_zip, resp = self.urlretrieve(s_vote_url)
+                s_vote_zip = self.download(s_vote_url)
             except scrapelib.HTTPError:
                 self.warning("could not find %s" % s_vote_url)
                 continue
             zippedfile = zipfile.ZipFile(s_vote_zip)
             for vfile in ["%s.txt" % (filename), "%sEnd.txt" % (filename)]:
-                try:
-                    vote_file = io.TextIOWrapper(
-                        zippedfile.open(vfile, "r"), encoding="latin-1"
-                    )
-                except KeyError:
+                if vfile not in zippedfile.namelist():
                     #
                     # Right, so, 2011 we have an "End" file with more
                     # vote data than was in the original dump.
@@ -412,7 +485,6 @@ class NJBillScraper(Scraper, MDBMixin):
                     self.warning("No such file: %s" % (vfile))
                     continue
 
-                vdict_file = csv.DictReader(vote_file)
                 if filename.startswith("A") or filename.startswith("CA"):
                     chamber = "lower"
                 else:
@@ -423,29 +495,13 @@ class NJBillScraper(Scraper, MDBMixin):
                 else:
                     vote_file_type = "chamber"
 
-                for rec in vdict_file:
-                    if vote_file_type == "chamber":
-                        bill_id = rec["Bill"].strip()
-                        leg = rec["Full_Name"]
-
-                        date = rec["Session_Date"]
-                        action = rec["Action"]
-                        leg_vote = rec["Legislator_Vote"]
-                        vote_parts = (bill_id, chamber, action)
-                    else:
-                        bill_id = "%s%s" % (rec["Bill_Type"], rec["Bill_Number"])
-                        leg = rec["Name"]
-                        # drop time portion
-                        date = rec["Agenda_Date"].split()[0]
-                        # make motion readable
-                        action = self._com_vote_motions[rec["BillAction"]]
-                        # first char (Y/N) use [0:1] to ignore ''
-                        leg_vote = rec["LegislatorVote"][0:1]
-                        committee = rec["Committee_House"]
-                        vote_parts = (bill_id, chamber, action, committee)
+                for bill_id, leg, date, action, leg_vote, vote_id in self.read_votes(
+                    zippedfile, vfile, chamber, vote_file_type
+                ):
+                    if bill_ids and bill_id not in bill_dict:
+                        continue
 
                     date = datetime.strptime(date, "%m/%d/%Y")
-                    vote_id = "_".join(vote_parts).replace(" ", "_")
 
                     if vote_id not in votes:
                         votes[vote_id] = VoteEvent(
@@ -464,8 +520,7 @@ class NJBillScraper(Scraper, MDBMixin):
                     else:
                         votes[vote_id].vote("other", leg)
 
-            # remove temp file
-            os.remove(s_vote_zip)
+            zippedfile.close()
 
             # Counts yes/no/other votes and saves overall vote
             for vote in votes.values():
@@ -493,7 +548,7 @@ class NJBillScraper(Scraper, MDBMixin):
                 yield vote
 
         # Actions
-        bill_action_csv = self.to_csv("BILLHIST.TXT")
+        bill_action_csv = self.table_rows("BILLHIST.TXT", bill_ids)
         actor_map = {"A": "lower", "G": "executive", "S": "upper"}
 
         for rec in bill_action_csv:
@@ -525,7 +580,7 @@ class NJBillScraper(Scraper, MDBMixin):
             bill.add_source(source_url)
 
         # Subjects
-        subject_csv = self.to_csv("BILLSUBJ.TXT")
+        subject_csv = self.table_rows("BILLSUBJ.TXT", bill_ids)
         for rec in subject_csv:
             bill_id = rec["BillType"].strip() + str(int(rec["BillNumber"]))
             if bill_id not in bill_dict:
@@ -1,7 +1,15 @@
 import io
+import os
 import re
 import csv
+import json
+import mmap
+import shutil
 import zipfile
+import collections
+
+# the legislature's database dumps and our indexes of them are kept here
+NJ_DATA_DIR = os.environ.get("NJ_DATA_DIR", os.path.join("_cache", "nj"))
 
 
 def clean_committee_name(comm_name):
@@ -22,14 +30,145 @@ def chamber_name(chamber):
 
 
 class MDBMixin(object):
+    """
+    Reads the tables of the DB{year}_TEXT.zip dump.
+
+    The archive is kept in NJ_DATA_DIR between runs and only downloaded
+    again when it changed. to_csv() decodes a table's rows lazily from the
+    zip, while bill_rows() looks up a single bill's rows: the first time a
+    table is used that way it is extracted next to the archive and indexed by
+    bill id, and both are reused for as long as the table's CRC in the
+    archive stays the same.
+    """
+
     def _init_mdb(self, year):
         url = (
             f"https://pub.njleg.state.nj.us/leg-databases/{year}data/DB{year}_TEXT.zip"
         )
-        fname, resp = self.urlretrieve(url)
+        fname = self.download(url)
         self.zipfile = zipfile.ZipFile(fname)
+        self._mdb_dir = os.path.splitext(fname)[0]
+        self._mdb_tables = {}
+
+    def download(self, url):
+        """
+        Return the path of a copy of url in NJ_DATA_DIR, only downloading it
+        again if the server says it changed since (by ETag/Last-Modified).
+        """
+        os.makedirs(NJ_DATA_DIR, exist_ok=True)
+        path = os.path.join(NJ_DATA_DIR, url.rsplit("/", 1)[-1])
+        headers_path = path + ".headers.json"
+
+        headers = {}
+        if os.path.exists(path) and os.path.exists(headers_path):
+            with open(headers_path) as f:
+                cached = json.load(f)
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        resp = self.get(url, headers=headers)
+        if resp.status_code == 304:
+            self.info(f"{url} not modified, using {path}")
+            return path
+
+        with open(path + ".part", "wb") as f:
+            f.write(resp.content)
+        os.replace(path + ".part", path)
+        with open(headers_path, "w") as f:
+            json.dump(
+                {
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                },
+                f,
+            )
+        return path
 
     def to_csv(self, table):
-        buf = io.StringIO(self.zipfile.read(table).decode("cp1252"))
-        csvfile = csv.DictReader(buf)
+        # newline="" leaves line breaks inside quoted fields to the csv module
+        stream = io.TextIOWrapper(
+            self.zipfile.open(table), encoding="cp1252", newline=""
+        )
+        csvfile = csv.DictReader(stream)
         return csvfile
+
+    def _table_index(self, table):
+        if table in self._mdb_tables:
+            return self._mdb_tables[table]
+
+        crc = self.zipfile.getinfo(table).CRC
+        path = os.path.join(self._mdb_dir, table)
+        index_path = path + ".idx.json"
+        index = None
+        if os.path.exists(path) and os.path.exists(index_path):
+            with open(index_path) as f:
+                index = json.load(f)
+            if index["crc"] != crc:
+                index = None
+
+        if index is None:
+            self.info(f"extracting and indexing {table}")
+            os.makedirs(self._mdb_dir, exist_ok=True)
+            with self.zipfile.open(table) as src, open(path, "wb") as dest:
+                shutil.copyfileobj(src, dest)
+            index = {"crc": crc, **_index_table(path)}
+            with open(index_path, "w") as f:
+                json.dump(index, f)
+
+        if os.path.getsize(path):
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # empty files can't be mapped, and have no rows to read anyway
+            data = None
+        self._mdb_tables[table] = (index, data)
+        return index, data
+
+    def table_rows(self, table, bill_ids=None):
+        """Rows of table, only those of bill_ids if given."""
+        if bill_ids is None:
+            return self.to_csv(table)
+        return [row for bill_id in bill_ids for row in self.bill_rows(table, bill_id)]
+
+    def bill_rows(self, table, bill_id):
+        """Return the rows of table for bill_id, e.g. A123, as dicts."""
+        index, data = self._table_index(table)
+        rows = []
+        for offset in index["rows"].get(bill_id, []):
+            data.seek(offset)
+            lines = iter(data.readline, b"")
+            reader = csv.reader(line.decode("cp1252") for line in lines)
+            rows.append(dict(zip(index["header"], next(reader))))
+        return rows
+
+
+def _index_table(path):
+    """Map each bill id in a table to the byte offsets of its rows."""
+    rows = collections.defaultdict(list)
+    with open(path, "rb") as f:
+        start = None
+
+        def lines():
+            nonlocal start
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    return
+                if start is None:
+                    start = offset
+                yield line.decode("cp1252")
+
+        reader = csv.reader(lines())
+        header = next(reader, None)
+        if header is None:
+            return {"header": [], "rows": {}}
+        start = None
+        bill_type = header.index("BillType")
+        bill_number = header.index("BillNumber")
+        for row in reader:
+            rows[row[bill_type].strip() + str(int(row[bill_number]))].append(start)
+            start = None
+    return {"header": header, "rows": rows}
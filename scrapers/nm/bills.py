@@ -1,7 +1,11 @@
+import io
 import os
 import re
 import csv
+import glob
+import sqlite3
 import zipfile
+import tempfile
 import subprocess
 from datetime import datetime
 
@@ -25,6 +29,58 @@ def session_slug(session):
     )
 
 
+# tables used by the bill scrape, and the columns they're looked up by
+MDB_TABLES = {
+    "tblSponsors": [],
+    "TblSubjects": [],
+    "Legislation": ["BillID"],
+    "TblLocations": [],
+    "Actions": ["BillID"],
+    "tblActions": ["ActionCode"],
+}
+
+# the LegInfo databases, converted to SQLite, are kept here between runs
+NM_DATA_DIR = os.environ.get("NM_DATA_DIR", os.path.join("_cache", "nm"))
+
+
+def export_mdb(mdbfile, path):
+    """Copy MDB_TABLES from an Access database into a new SQLite file,
+    exporting each table with mdbtools once."""
+    tmp = path + ".tmp"
+    # left behind by a failed export
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    db = sqlite3.connect(tmp)
+    try:
+        for table, indexes in MDB_TABLES.items():
+            proc = subprocess.Popen(
+                ["mdb-export", mdbfile, table], stdout=subprocess.PIPE, close_fds=True
+            )
+            reader = csv.reader(io.TextIOWrapper(proc.stdout, encoding="utf8"))
+            header = next(reader)
+            columns = ", ".join('"{}"'.format(column) for column in header)
+            db.execute('CREATE TABLE "{}" ({})'.format(table, columns))
+            db.executemany(
+                'INSERT INTO "{}" VALUES ({})'.format(
+                    table, ", ".join("?" * len(header))
+                ),
+                reader,
+            )
+            if proc.wait():
+                raise OSError("mdb-export {} {} failed".format(mdbfile, table))
+            for column in indexes:
+                db.execute(
+                    'CREATE INDEX "{0}_{1}" ON "{0}" ("{1}")'.format(table, column)
+                )
+        db.commit()
+    except BaseException:
+        db.close()
+        os.remove(tmp)
+        raise
+    db.close()
+    os.replace(tmp, path)
+
+
 class NMBillScraper(Scraper):
     def _init_mdb(self, session):
         ftp_base = "ftp://www.nmlegis.gov/other/"
@@ -39,45 +95,62 @@ class NMBillScraper(Scraper):
         matches = re.findall(fname_re, listing)
         matches = sorted(
             [
-                (datetime.strptime(date, "%m-%d-%y  %H:%M%p"), filename)
+                (datetime.strptime(date, "%m-%d-%y  %I:%M%p"), filename)
                 for date, filename in matches
             ]
         )
         if not matches:
             raise ValueError("{} contains no matching files.".format(ftp_base))
 
-        remote_file = ftp_base + matches[-1][1]
+        modified, zipname = matches[-1]
+        remote_file = ftp_base + zipname
+
+        # the tables are exported once per version of the zip
+        path = os.path.join(
+            NM_DATA_DIR, "{}-{:%Y%m%d%H%M}.sqlite".format(fname, modified)
+        )
+        if not os.path.exists(path):
+            self.export_mdb(remote_file, fname, path)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
 
+    def export_mdb(self, remote_file, fname, path):
+        os.makedirs(NM_DATA_DIR, exist_ok=True)
         # all of the data is in this Access DB, download & retrieve it
         # for specials, zip file is 21S2 but included mbd is 21s2
         mdbfile = "{}.accdb".format(fname)
+        zipname, resp = self.urlretrieve(remote_file)
+        with tempfile.TemporaryDirectory() as tmp:
+            with zipfile.ZipFile(zipname) as zf:
+                zf.extract(mdbfile, tmp)
+            os.remove(zipname)
+            try:
+                export_mdb(os.path.join(tmp, mdbfile), path)
+            except OSError:
+                self.warning("Failed to read mdb file. Have you installed 'mdbtools' ?")
+                raise
+
+        # older versions of the same database aren't needed anymore
+        for old in glob.glob(os.path.join(NM_DATA_DIR, fname + "-*.sqlite")):
+            if old != path:
+                os.remove(old)
 
-        # if a new mdbfile or it has changed
-        if getattr(self, "mdbfile", None) != mdbfile:
-            self.mdbfile = mdbfile
-            fname, resp = self.urlretrieve(remote_file)
-            zf = zipfile.ZipFile(fname)
-            zf.extract(self.mdbfile)
-            os.remove(fname)
+    def query(self, sql, *params):
+        return [dict(row) for row in self.db.execute(sql, params)]
 
     def access_to_csv(self, table):
-        """using mdbtools, read access tables as CSV"""
-        commands = ["mdb-export", self.mdbfile, table]
-        try:
-            pipe = subprocess.Popen(
-                commands, stdout=subprocess.PIPE, close_fds=True
-            ).stdout
-            csvfile = csv.DictReader([line.decode("utf8") for line in pipe.readlines()])
-            return csvfile
-        except OSError:
-            self.warning("Failed to read mdb file. Have you installed " "'mdbtools' ?")
-            raise
+        """read the rows of an access table"""
+        return self.query('SELECT * FROM "{}"'.format(table))
 
     def scrape(self, chamber=None, session=None):
         chambers = [chamber] if chamber else ["upper", "lower"]
 
-        for chamber in chambers:
-            yield from self.scrape_chamber(chamber, session)
+        self._init_mdb(session)
+        try:
+            for chamber in chambers:
+                yield from self.scrape_chamber(chamber, session)
+        finally:
+            self.db.close()
 
     def scrape_chamber(self, chamber, session):
         chamber_letter = "S" if chamber == "upper" else "H"
@@ -93,8 +166,6 @@ class NMBillScraper(Scraper):
         # used for faking sources
         session_year = session[2:]
 
-        self._init_mdb(session)
-
         """
         read in sponsor & subject mappings
         McSorley resigned so they removed him from the API
@@ -117,11 +188,9 @@ class NMBillScraper(Scraper):
 
         # get all bills into this dict, fill in action/docs before saving
         bills = {}
-        for data in [
-            row
-            for row in self.access_to_csv("Legislation")
-            if row["BillID"].startswith(chamber_letter)
-        ]:
+        for data in self.query(
+            "SELECT * FROM Legislation WHERE BillID GLOB ?", chamber_letter + "*"
+        ):
             # use their BillID for the key but build our own for storage
             bill_key = data["BillID"].replace(" ", "")
 
@@ -423,11 +492,9 @@ class NMBillScraper(Scraper):
         # these actions need a committee name spliced in
         actions_with_committee = ("SENT", "7650", "7654")
 
-        for action in [
-            row
-            for row in self.access_to_csv("Actions")
-            if row["BillID"].startswith(chamber_letter)
-        ]:
+        for action in self.query(
+            "SELECT * FROM Actions WHERE BillID GLOB ?", chamber_letter + "*"
+        ):
             bill_key = action["BillID"].replace(" ", "")
 
             if bill_key not in bills:
@@ -455,12 +522,13 @@ class NMBillScraper(Scraper):
                 self.warning(
                     "unknown action code {} on {}".format(action_code, bill_key)
                 )
-                for row in self.access_to_csv("tblActions"):
-                    if action_code == row["ActionCode"]:
-                        self.warning(row)
-                        self.warning(
-                            "look up at http://www.nmlegis.gov/Legislation/Action_Abbreviations"
-                        )
+                for row in self.query(
+                    "SELECT * FROM tblActions WHERE ActionCode = ?", action_code
+                ):
+                    self.warning(row)
+                    self.warning(
+                        "look up at http://www.nmlegis.gov/Legislation/Action_Abbreviations"
+                    )
                 raise
 
             # if there's room in this action for a location name, map locations
@@ -1,18 +1,25 @@
+import os
 import re
+import json
 import datetime
 import lxml.html
 import pytz
-from collections import defaultdict
 
 from openstates.scrape import Scraper, Bill, VoteEvent
+from utils.actions import CategorizerCacheMixin
 
 from .apiclient import OpenLegislationAPIClient
 from .actions import Categorizer
 
 eastern = pytz.timezone("US/Eastern")
 
+# full records of updated bills are fetched this many at a time
+API_WORKERS = int(os.environ.get("NY_API_WORKERS", 4))
+# the end of the last complete window scrape is kept here
+NY_DATA_DIR = os.environ.get("NY_DATA_DIR", os.path.join("_cache", "ny"))
 
-class NYBillScraper(Scraper):
+
+class NYBillScraper(CategorizerCacheMixin, Scraper):
     categorizer = Categorizer()
 
     def _parse_bill_number(self, bill_id):
@@ -176,81 +183,86 @@ class NYBillScraper(Scraper):
 
         return vote
 
-    def _generate_bills(self, session, window=None):
+    def _window_state_path(self, session):
+        return os.path.join(NY_DATA_DIR, "{}-updates.json".format(session))
+
+    def _generate_bills(self, session, window=None, rescrape=None):
         self.logger.info("Generating bills.")
-        bills = defaultdict(list)
 
         delimiter = "-"
         (start_year, delimiter, end_year) = session.partition(delimiter)
-        page = 0
         # 1000 is the current maximum returned record limit for all Open
         # Legislature API calls that use the parameter.
         limit = 1000
         # Flag whether to retrieve full bill data.
         full = True
-        while True:
-            # Updating the offset before the page matters here.
-            offset = limit * page + 1
-            page += 1
-
-            # Response should be a dict of the JSON data returned from
-            # the Open Legislation API.
-            if window:
-                to_datetime = datetime.datetime.now()
-                from_datetime = datetime.datetime.now() - self.parse_relative_time(
-                    window
-                )
-
-                # note for debugging:
-                # set detail=True to see what changed on the bill
-                response = self.api_client.get(
-                    "updated_bills",
-                    from_datetime=from_datetime.replace(microsecond=0).isoformat(),
-                    to_datetime=to_datetime.replace(microsecond=0).isoformat(),
-                    detail=False,
-                    summary=True,
-                    limit=limit,
-                    offset=offset,
-                    type="updated",
-                )
 
-                self.info(
-                    "{} bills updated since {}".format(
-                        response["total"],
-                        from_datetime.replace(microsecond=0).isoformat(),
+        # Response should be a dict of the JSON data returned from
+        # the Open Legislation API. The client fetches the following pages
+        # while this one's bills are scraped.
+        if window:
+            to_datetime = datetime.datetime.now()
+            from_datetime = datetime.datetime.now() - self.parse_relative_time(window)
+
+            # pick up exactly where the last complete window scrape ended
+            state_path = self._window_state_path(session)
+            if os.path.exists(state_path) and not rescrape:
+                with open(state_path) as f:
+                    from_datetime = datetime.datetime.fromisoformat(
+                        json.load(f)["to_datetime"]
                     )
+            self.window_end = to_datetime
+
+            # note for debugging:
+            # set detail=True to see what changed on the bill
+            url = self.api_client.build_url(
+                "updated_bills",
+                from_datetime=from_datetime.replace(microsecond=0).isoformat(),
+                to_datetime=to_datetime.replace(microsecond=0).isoformat(),
+                detail=False,
+                summary=True,
+                limit=limit,
+                offset=1,
+                type="updated",
+            )
+            response = self.api_client.get_relurl(url, "updated_bills")
+
+            self.info(
+                "{} bills updated since {}".format(
+                    response["total"],
+                    from_datetime.replace(microsecond=0).isoformat(),
                 )
-            else:
-                response = self.api_client.get(
-                    "bills",
-                    session_year=start_year,
-                    limit=limit,
-                    offset=offset,
-                    full=full,
+            )
+            bills = self._hydrate_bills(self.api_client.unpaginate(response, url))
+        else:
+            bills = self.api_client.paginate(
+                "bills",
+                session_year=start_year,
+                limit=limit,
+                offset=1,
+                full=full,
+            )
+
+        yield from bills
+
+    def _hydrate_bills(self, updates):
+        # https://legislation.nysenate.gov/api/3/bills/2017/S8570
+        # unfortunately the updated bills since N api doesn't offer
+        # the full bill info, so get them individually, a few at a time, and
+        # only once for bills updated more than once in the window
+        def bill_args():
+            seen = set()
+            for update in updates:
+                key = (update["item"]["session"], update["item"]["printNo"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield dict(
+                    session_year=key[0], bill_id=key[1], summary=False, detail=True
                 )
 
-            if (
-                response["responseType"] == "empty list"
-                or response["offsetStart"] > response["offsetEnd"]
-            ):
-                break
-            else:
-                bills = response["result"]["items"]
-
-            for bill in bills:
-                if window:
-                    # https://legislation.nysenate.gov/api/3/bills/2017/S8570
-                    # unfortunately the updated bills since N api doesn't offer
-                    # the full bill info, so get them individually
-                    resp = self.api_client.get(
-                        "bill",
-                        session_year=bill["item"]["session"],
-                        bill_id=bill["item"]["printNo"],
-                        summary=False,
-                        detail=True,
-                    )
-                    bill = resp["result"]
-                yield bill
+        for resp in self.api_client.get_many("bill", bill_args(), API_WORKERS):
+            yield resp["result"]
 
     def _scrape_bill(self, session, bill_data):
         details = self._parse_bill_details(bill_data)
@@ -573,14 +585,24 @@ class NYBillScraper(Scraper):
     # NEW_YORK_API_KEY=key os-update ny bills --scrape bill_no=S155
     # or
     # NEW_YORK_API_KEY=key os-update ny bills --scrape window=5d1h
-    def scrape(self, session=None, bill_no=None, window=None):
+    # after the first window scrape, later ones start where the last one
+    # ended, pass rescrape=1 to use the given window instead. The end of a
+    # window is saved once its scrape completes, before the bills are
+    # imported, so pass rescrape=1 to redo a window whose import failed
+    def scrape(self, session=None, bill_no=None, window=None, rescrape=None):
         self.api_client = OpenLegislationAPIClient(self)
         self.term_start_year = session.split("-")[0]
 
-        for bill in self._generate_bills(session, window):
+        for bill in self._generate_bills(session, window, rescrape):
             if bill_no:
                 if bill["basePrintNo"] == bill_no.upper():
                     yield from self._scrape_bill(session, bill)
                     return
             else:
                 yield from self._scrape_bill(session, bill)
+        self.api_client.log_stats()
+
+        if window:
+            os.makedirs(NY_DATA_DIR, exist_ok=True)
+            with open(self._window_state_path(session), "w") as f:
+                json.dump({"to_datetime": self.window_end.isoformat()}, f)
@@ -1,14 +1,17 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from openstates.scrape import Scraper, Bill, VoteEvent
 import scrapelib
 import pytz
 import re
 import dateutil.parser
 
+from utils import PrefetchMixin
+
 BAD_BILLS = [("134", "SB 92")]
 
 
-class OHBillScraper(Scraper):
+class OHBillScraper(PrefetchMixin, Scraper):
     _tz = pytz.timezone("US/Eastern")
 
     # Vote Motion Dictionary was created by comparing vote codes to
@@ -122,24 +125,33 @@ class OHBillScraper(Scraper):
             first_page += "/solarapi/v1/general_assembly_{session}/".format(
                 session=session
             )
-            legislators = self.get_legislator_ids(first_page)
-            all_amendments = self.get_other_data_source(
-                first_page, base_url, "amendments"
+            # these lists don't depend on each other, so load them together
+            with ThreadPoolExecutor(max(self.prefetch_workers, 1)) as pool:
+                legislators = pool.submit(self.get_legislator_ids, first_page)
+                all_amendments, all_fiscals, all_synopsis, all_analysis = [
+                    pool.submit(self.get_other_data_source, first_page, base_url, name)
+                    for name in ("amendments", "fiscals", "synopsiss", "analysiss")
+                ]
+                bills = pool.submit(self.get_total_bills, session)
+            legislators = legislators.result()
+            all_amendments = all_amendments.result()
+            all_fiscals = all_fiscals.result()
+            all_synopsis = all_synopsis.result()
+            all_analysis = all_analysis.result()
+            bills = bills.result()
+
+            # fetch the next few bills from the API while this one is scraped
+            bills = self.prefetch(
+                bills,
+                url=lambda bill: self.get_bill_api_url(
+                    session, self.get_bill_id(bill["name"])
+                ),
+                verify=False,
             )
-            all_fiscals = self.get_other_data_source(first_page, base_url, "fiscals")
-            all_synopsis = self.get_other_data_source(first_page, base_url, "synopsiss")
-            all_analysis = self.get_other_data_source(first_page, base_url, "analysiss")
-
-            bills = self.get_total_bills(session)
             for bill in bills:
                 bill_name = bill["name"]
                 bill_number = bill["number"]
-
-                # S.R.No.1 -> SR1
-                bill_id = bill_name.replace("No.", "").strip()
-                bill_id = bill_id.replace(".", "").replace(" ", "").strip()
-                # put one space back in between type and number
-                bill_id = re.sub(r"([a-zA-Z]+)(\d+)", r"\1 \2", bill_id)
+                bill_id = self.get_bill_id(bill_name)
 
                 chamber = "lower" if "H" in bill_id else "upper"
                 classification = "bill" if "B" in bill_id else "resolution"
@@ -166,14 +178,7 @@ class OHBillScraper(Scraper):
                     continue
 
                 # get bill from API
-                bill_api_url = (
-                    "https://search-prod.lis.state.oh.us/solarapi/v1/"
-                    "general_assembly_{}/{}/{}/".format(
-                        session,
-                        "bills" if "B" in bill_id else "resolutions",
-                        bill_id.lower().replace(" ", ""),
-                    )
-                )
+                bill_api_url = self.get_bill_api_url(session, bill_id)
                 data = self.get(bill_api_url, verify=False).json()
                 if len(data["items"]) == 0:
                     self.logger.warning(
@@ -202,6 +207,17 @@ class OHBillScraper(Scraper):
                 bill_version = data["items"][0]
                 bill.add_source(bill_api_url)
 
+                # the bill's actions, votes, vetoes and disapprovals don't
+                # depend on each other, so start fetching them all now
+                self.prefetch_urls(
+                    (
+                        base_url + bill_version[kind][0]["link"],
+                        {"verify": False} if kind == "action" else {},
+                    )
+                    for kind in ("action", "votes", "cmtevotes", "veto", "disapprove")
+                    if bill_version.get(kind)
+                )
+
                 # subjects
                 for subj in bill_version["subjectindexes"]:
                     try:
@@ -366,14 +382,39 @@ class OHBillScraper(Scraper):
 
                 yield bill
 
+    def get_bill_id(self, bill_name):
+        # S.R.No.1 -> SR1
+        bill_id = bill_name.replace("No.", "").strip()
+        bill_id = bill_id.replace(".", "").replace(" ", "").strip()
+        # put one space back in between type and number
+        return re.sub(r"([a-zA-Z]+)(\d+)", r"\1 \2", bill_id)
+
+    def get_bill_api_url(self, session, bill_id):
+        return (
+            "https://search-prod.lis.state.oh.us/solarapi/v1/"
+            "general_assembly_{}/{}/{}/".format(
+                session,
+                "bills" if "B" in bill_id else "resolutions",
+                bill_id.lower().replace(" ", ""),
+            )
+        )
+
     def pages(self, base_url, first_page):
-        page = self.get(first_page)
-        page = page.json()
-        yield page
-        while "nextLink" in page:
-            page = self.get(base_url + page["nextLink"])
-            page = page.json()
-            yield page
+        # the next page is fetched and decoded in the background while the
+        # caller works through the current one
+        def get_page(url):
+            return self.get(url).json()
+
+        with ThreadPoolExecutor(1) as pool:
+            page = get_page(first_page)
+            while True:
+                next_page = None
+                if "nextLink" in page:
+                    next_page = pool.submit(get_page, base_url + page["nextLink"])
+                yield page
+                if next_page is None:
+                    return
+                page = next_page.result()
 
     def get_total_bills(self, session):
         # The /resolutions endpoint has included duplicate bills in its output, so use a set to filter duplicates
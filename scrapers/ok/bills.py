@@ -9,10 +9,12 @@ import scrapelib
 from urllib import parse
 
 from openstates.scrape import Scraper, Bill, VoteEvent as Vote
+from utils import PrefetchMixin
+from utils.actions import CategorizerCacheMixin
 from .actions import Categorizer
 
 
-class OKBillScraper(Scraper):
+class OKBillScraper(CategorizerCacheMixin, PrefetchMixin, Scraper):
     bill_types = ["B", "JR", "CR", "R"]
     subject_map = collections.defaultdict(list)
 
@@ -83,7 +85,7 @@ class OKBillScraper(Scraper):
         page = html.fromstring(page)
         page.make_links_absolute(url)
 
-        bill_nums = []
+        bill_links = []
         for link in page.xpath("//a[contains(@href, 'BillInfo')]"):
             bill_id = link.text.strip()
             bill_num = int(re.findall(r"\d+", bill_id)[0])
@@ -93,8 +95,10 @@ class OKBillScraper(Scraper):
             if only_bills is not None and bill_id not in only_bills:
                 self.warning("skipping bill we are not interested in %s" % bill_id)
                 continue
-            bill_nums.append(bill_num)
-            yield from self.scrape_bill(chamber, session, bill_id, link.attrib["href"])
+            bill_links.append((bill_id, link.attrib["href"]))
+
+        for bill_id, url in self.prefetch(bill_links, url=lambda link: link[1]):
+            yield from self.scrape_bill(chamber, session, bill_id, url)
 
     def scrape_bill(self, chamber, session, bill_id, url):
         try:
@@ -1,7 +1,7 @@
-import requests
+from utils.apiclient import JsonApiClient
 
 
-class OregonLegislatorODataClient(object):
+class OregonLegislatorODataClient(JsonApiClient):
     """
     Client for interfacing with Oregon Legislator OData API.
     https://www.oregonlegislature.gov/citizen_engagement/Pages/data.aspx
@@ -24,18 +24,13 @@ class OregonLegislatorODataClient(object):
         "?$expand=MeasureHistoryActions/MeasureVotes,CommitteeAgendaItems/CommitteeVotes",
     )
 
-    def _build_url(self, resource_name, **endpoint_format_args):
+    def build_url(self, resource_name, **endpoint_format_args):
         endpoint = self.resources[resource_name]
         endpoint = endpoint.format(**endpoint_format_args)
 
         url = self.root + endpoint
         return url
 
-    def __init__(self, scraper):
-        if not scraper:
-            scraper = requests.Session()
-        self.scraper = scraper
-
     def all_sessions(self):
         return self.get("sessions")
 
@@ -51,44 +46,28 @@ class OregonLegislatorODataClient(object):
         requests_kwargs=None,
         **url_format_args
     ):
-        num_bad_packets_allowed = 10
-        url = self._build_url(resource_name, **url_format_args)
+        url = self.build_url(resource_name, **url_format_args)
+        requests_kwargs = dict(requests_kwargs or {}, verify=True)
 
-        if page:
-            url = "{url}&$top={page}&$skip={skip}".format(url=url, page=page, skip=skip)
+        if not page:
+            return self.request(
+                url, resource_name, requests_args, requests_kwargs
+            ).json()["value"]
 
-        requests_args = requests_args or ()
-        requests_kwargs = requests_kwargs or {}
-        requests_kwargs.update(verify=True)
-        headers = requests_kwargs.get("headers", {})
-        headers["Accept"] = "application/json"
-        requests_kwargs["headers"] = headers
+        url = "{url}&$top={page}&$skip={skip}".format(url=url, page=page, skip=skip)
+        result = self.request(url, resource_name, requests_args, requests_kwargs)
+        return list(self.unpaginate(result.json(), url))
 
-        response = None
+    def page_items(self, result):
+        return result["value"]
 
-        tries = 0
-        while response is None and tries < num_bad_packets_allowed:
-            try:
-                response = self.scraper.get(url, *requests_args, **requests_kwargs)
-            except requests.exceptions.RequestException as e:
-                err, string = e.args
-                print("warn: retry")
-                tries += 1
-                if tries >= num_bad_packets_allowed:
-                    print(err, string)
-                    raise RuntimeError("Received too many bad packets from API.")
+    def next_page(self, result, url):
+        # $top and $skip are always the last parameters, see get()
+        url, paging = url.rsplit("&$top=", 1)
+        page, skip = map(int, paging.split("&$skip="))
+        return "{url}&$top={page}&$skip={skip}".format(
+            url=url, page=page, skip=skip + page
+        )
 
-        response = response.json()["value"]
-        if page and len(response) > 0:
-            skip += page
-            response.extend(
-                self.get(
-                    resource_name,
-                    page,
-                    skip,
-                    requests_args,
-                    requests_kwargs,
-                    **url_format_args
-                )
-            )
-        return response
+    def get_relurl(self, url, endpoint="next page"):
+        return self.request(url, endpoint, requests_kwargs={"verify": True}).json()
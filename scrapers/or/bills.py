@@ -44,6 +44,7 @@ class ORBillScraper(Scraper):
     def scrape(self, session=None):
         self.api_client = OregonLegislatorODataClient(self)
         yield from self.scrape_bills(session)
+        self.api_client.log_stats()
 
     def scrape_bills(self, session):
         session_key = SESSION_KEYS[session]
@@ -6,6 +6,7 @@ from openstates.scrape import Scraper, Bill, VoteEvent
 from .actions import Categorizer
 
 from utils import url_xpath
+from utils.actions import CategorizerCacheMixin
 
 subjects = None
 bill_subjects = None
@@ -81,7 +82,7 @@ BILL_STRING_FLAGS = {
 BILL_TITLE_RE = re.compile(r"ENTITLED,\s+([^(]+)(\(.+\))?")
 
 
-class RIBillScraper(Scraper):
+class RIBillScraper(CategorizerCacheMixin, Scraper):
     # when scraping votes we only get 'S101' so we can't tie them to their parent bill
     # so we keep a dict of (chamber, number) -> bill_id from the bill scrape to be used in the
     # vote scrape
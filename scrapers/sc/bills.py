@@ -1,13 +1,12 @@
 import scrapelib
 
 import datetime
-import os
 import re
 from collections import defaultdict
 from functools import wraps
 
 from openstates.scrape import Scraper, Bill, VoteEvent
-from openstates.utils import convert_pdf
+from utils.pdfcache import cached_convert_pdf
 import lxml.html
 import urllib
 
@@ -299,9 +298,7 @@ class SCBillScraper(Scraper):
         :param vote:  related voteEvent object
         :param vurl:  pdf source url
         """
-        (path, resp) = self.urlretrieve(vurl)
-        pdflines = convert_pdf(path, "text")
-        os.remove(path)
+        pdflines = cached_convert_pdf(self, vurl, "text")
 
         current_vfunc = None
         option = None
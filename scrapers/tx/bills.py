@@ -1,17 +1,27 @@
-import datetime
-import ftplib
+import os
 import re
-import time
+import json
+import datetime
+import collections
+from concurrent.futures import ThreadPoolExecutor
 from urllib import parse as urlparse
 import xml.etree.cElementTree as etree
 
 from openstates.scrape import Scraper, Bill
 from openstates.scrape.base import ScrapeError
 from utils import LXMLMixin
+from utils.ftp import FTPPool
+from utils.actions import CategorizerCacheMixin
 from .actions import Categorizer
 
 
-class TXBillScraper(Scraper, LXMLMixin):
+# bill history files are downloaded over this many FTP sessions at once
+FTP_WORKERS = int(os.environ.get("TX_FTP_WORKERS", 4))
+# the size and modify time of every history file scraped is kept here
+TX_DATA_DIR = os.environ.get("TX_DATA_DIR", os.path.join("_cache", "tx"))
+
+
+class TXBillScraper(CategorizerCacheMixin, Scraper, LXMLMixin):
     _FTP_ROOT = "ftp.legis.state.tx.us"
     CHAMBERS = {"H": "lower", "S": "upper"}
     NAME_SLUGS = {
@@ -27,39 +37,8 @@ class TXBillScraper(Scraper, LXMLMixin):
 
     categorizer = Categorizer()
 
-    def _get_ftp_files(self, dir_):
-        """Recursively traverse an FTP directory, returning all files"""
-        for i in range(3):
-            try:
-                ftp = ftplib.FTP(self._FTP_ROOT)
-                break
-            except (EOFError, ftplib.error_temp):
-                time.sleep(2**i)
-        else:
-            raise Exception
-
-        ftp.login()
-        ftp.cwd("/" + dir_)
-        self.info("Searching an FTP folder for files ({})".format(dir_))
-
-        lines = []
-        ftp.retrlines("LIST", lines.append)
-        for line in lines:
-            (_date, _time, is_dir, _file_size, name) = re.search(
-                r"""(?x)
-                    ^(\d{2}-\d{2}-\d{2})\s+  # Date in mm-dd-yy
-                    (\d{2}:\d{2}[AP]M)\s+  # Time in hh:mmAM/PM
-                    (<DIR>)?\s+  # Directories will have an indicating flag
-                    (\d+)?\s+  # Files will have their size in bytes
-                    (.+?)\s*$  # Directory or file name is the remaining text
-                    """,
-                line,
-            ).groups()
-            if is_dir:
-                for item in self._get_ftp_files("/".join([dir_, name])):
-                    yield item
-            else:
-                yield "/".join(["ftp://" + self._FTP_ROOT, dir_, name])
+    def _ftp_url(self, path):
+        return "ftp://" + self._FTP_ROOT + path
 
     @staticmethod
     def _get_bill_id_from_file_path(file_path):
@@ -72,30 +51,90 @@ class TXBillScraper(Scraper, LXMLMixin):
             identifier += "R"
         return " ".join([identifier, number])
 
-    def scrape(self, session=None, chamber=None):
+    def scrape(self, session=None, chamber=None, rescrape=None):
         chambers = [chamber] if chamber else ["upper", "lower"]
 
         session_code = self._format_session(session)
 
-        self.witnesses = []
-        witness_files = self._get_ftp_files(
-            "bills/{}/witlistbill/html".format(session_code)
-        )
-        for item in witness_files:
-            bill_id = self._get_bill_id_from_file_path(item)
-            self.witnesses.append((bill_id, item))
-
-        history_files = self._get_ftp_files("bills/{}/billhistory".format(session_code))
-        for bill_url in history_files:
-            if "house" in bill_url:
-                if "lower" in chambers:
-                    yield from self.scrape_bill(session, bill_url)
-            elif "senate" in bill_url:
-                if "upper" in chambers:
-                    yield from self.scrape_bill(session, bill_url)
-
-    def scrape_bill(self, session, history_url):
-        history_xml = self.get(history_url).text
+        pool = FTPPool(self._FTP_ROOT, size=FTP_WORKERS)
+        try:
+            self.witnesses = []
+            witness_files = pool.walk("/bills/{}/witlistbill/html".format(session_code))
+            for path, _ in witness_files:
+                bill_id = self._get_bill_id_from_file_path(path)
+                self.witnesses.append((bill_id, self._ftp_url(path)))
+            bill_witnesses = collections.defaultdict(list)
+            for bill_id, url in self.witnesses:
+                bill_witnesses[bill_id].append(url)
+
+            # skip bills whose history and witness lists are the same as the
+            # last time they were scraped, unless rescrape is passed. The
+            # state is only saved once the whole scrape has run, but before
+            # the bills are imported: pass rescrape=1 after a failed import
+            state_path = os.path.join(TX_DATA_DIR, "{}-ftp.json".format(session_code))
+            state = {}
+            if os.path.exists(state_path) and not rescrape:
+                with open(state_path) as f:
+                    state = json.load(f)
+
+            changed = []
+            history_files = pool.walk("/bills/{}/billhistory".format(session_code))
+            for path, facts in history_files:
+                if "house" in path:
+                    if "lower" not in chambers:
+                        continue
+                elif "senate" in path:
+                    if "upper" not in chambers:
+                        continue
+                else:
+                    continue
+                try:
+                    bill_id = self._get_bill_id_from_file_path(path)
+                except AttributeError:
+                    bill_id = None
+                version = [
+                    facts.get("size"),
+                    facts.get("modify"),
+                    sorted(bill_witnesses[bill_id]),
+                ]
+                if state.get(path) != version:
+                    changed.append((path, version))
+            self.info(
+                "{} bill histories changed since the last run".format(len(changed))
+            )
+
+            for path, version, data in self._read_histories(pool, changed):
+                try:
+                    history_xml = data.decode("utf-8")
+                except UnicodeDecodeError:
+                    history_xml = data.decode("cp1252")
+                yield from self.scrape_bill(session, self._ftp_url(path), history_xml)
+                state[path] = version
+            os.makedirs(TX_DATA_DIR, exist_ok=True)
+            with open(state_path, "w") as f:
+                json.dump(state, f)
+        finally:
+            pool.close()
+
+    def _read_histories(self, pool, changed):
+        """Yield (path, version, data) in order, reading at most FTP_WORKERS
+        files ahead of the bill being scraped."""
+        pending = collections.deque()
+        with ThreadPoolExecutor(FTP_WORKERS) as executor:
+            try:
+                for path, version in changed:
+                    pending.append((path, version, executor.submit(pool.read, path)))
+                    if len(pending) >= FTP_WORKERS:
+                        path, version, future = pending.popleft()
+                        yield path, version, future.result()
+                while pending:
+                    path, version, future = pending.popleft()
+                    yield path, version, future.result()
+            finally:
+                for _, _, future in pending:
+                    future.cancel()
+
+    def scrape_bill(self, session, history_url, history_xml):
         root = etree.fromstring(history_xml)
 
         bill_title = root.findtext("caption")
@@ -213,7 +252,11 @@ class TXBillScraper(Scraper, LXMLMixin):
         for author in root.findtext("authors").split(" | "):
             if re.search(r"\S+", author.strip()) is not None:
                 bill.add_sponsorship(
-                    author, classification="primary", entity_type="person", primary=True, chamber=chamber,
+                    author,
+                    classification="primary",
+                    entity_type="person",
+                    primary=True,
+                    chamber=chamber,
                 )
         for coauthor in root.findtext("coauthors").split(" | "):
             if re.search(r"\S+", coauthor.strip()) is not None:
@@ -1,3 +1,6 @@
+import io
+import os
+import json
 import datetime
 import lxml
 import pytz
@@ -6,6 +9,10 @@ import scrapelib
 import xml.etree.ElementTree as ET
 
 from openstates.scrape import Bill, Scraper, VoteEvent, Event
+from utils import PrefetchMixin
+
+# the sitemap <lastmod> of every BILLSTATUS file scraped is kept here
+USA_DATA_DIR = os.environ.get("USA_DATA_DIR", os.path.join("_cache", "usa"))
 
 
 # NOTE: This is a US federal bill scraper designed to output bills in the
@@ -15,7 +22,7 @@ from openstates.scrape import Bill, Scraper, VoteEvent, Event
 # https://github.com/unitedstates/congress which offers more backdata.
 
 
-class USBillScraper(Scraper):
+class USBillScraper(PrefetchMixin, Scraper):
     # https://www.govinfo.gov/rss/billstatus-batch.xml
     # https://github.com/usgpo/bill-status/blob/master/BILLSTATUS-XML_User_User-Guide.md
 
@@ -90,12 +97,29 @@ class USBillScraper(Scraper):
         "SCONRES": "resolution",
     }
 
+    # the handler for each section of <bill>, see parse_bill
+    section_handlers = {
+        "amendments": "scrape_amendments",
+        "cboCostEstimates": "scrape_cbo",
+        "committeeReports": "scrape_committee_reports",
+        "cosponsors": "scrape_cosponsors",
+        "laws": "scrape_laws",
+        "relatedBills": "scrape_related_bills",
+        "sponsors": "scrape_sponsors",
+        "subjects": "scrape_subjects",
+        "summaries": "scrape_summaries",
+        "titles": "scrape_titles",
+        "textVersions": "scrape_versions",
+    }
+
     # to scrape everything UPDATED after a given date/time, start="2020-01-01 22:01:01"
-    def scrape(self, chamber=None, session=None, start=None):
+    # otherwise only bills whose sitemap lastmod moved since the last run are
+    # scraped, pass rescrape to scrape every bill again. The lastmods are only
+    # saved once the whole scrape has run, but before the bills are imported:
+    # pass rescrape=1 after a failed import
+    def scrape(self, chamber=None, session=None, start=None, rescrape=None):
         if start:
             start = datetime.datetime.strptime(start, "%Y-%m-%d %H:%I:%S")
-        else:
-            start = datetime.datetime(1980, 1, 1, 0, 0, 1)
 
         sitemap_url = (
             "https://www.govinfo.gov/sitemap/bulkdata/BILLSTATUS/sitemapindex.xml"
@@ -106,7 +130,15 @@ class USBillScraper(Scraper):
         # if you want to test a bill:
         # yield from self.parse_bill('https://www.govinfo.gov/bulkdata/BILLSTATUS/118/s/BILLSTATUS-118s4869.xml')
 
-        for link in root.findall("us:sitemap/us:loc", self.ns):
+        # the lastmod of each sitemap and bill as of when it was last scraped
+        state_path = os.path.join(USA_DATA_DIR, f"{session}-billstatus.json")
+        self.lastmod = {"sitemaps": {}, "bills": {}}
+        if os.path.exists(state_path) and not rescrape:
+            with open(state_path) as f:
+                self.lastmod = json.load(f)
+
+        for sitemap in root.findall("us:sitemap", self.ns):
+            link = sitemap.find("us:loc", self.ns)
             # split by /, then check that "116s" matches the chamber
             if chamber:
                 link_parts = link.text.split("/")
@@ -115,71 +147,111 @@ class USBillScraper(Scraper):
                     continue
 
             if session in link.text:
+                # a sitemap's lastmod is the high-water mark of its bills,
+                # skip it entirely if it hasn't moved since the last run
+                lastmod = self.get_xpath(sitemap, "us:lastmod")
+                if (
+                    not start
+                    and lastmod
+                    and self.lastmod["sitemaps"].get(link.text) == lastmod
+                ):
+                    self.info(f"{link.text} unchanged since {lastmod}")
+                    continue
                 yield from self.parse_bill_list(link.text, start)
+                # only a complete, incremental pass over a sitemap has seen
+                # every bill up to its lastmod
+                if not start and not rescrape:
+                    self.lastmod["sitemaps"][link.text] = lastmod
+        os.makedirs(USA_DATA_DIR, exist_ok=True)
+        with open(state_path, "w") as f:
+            json.dump(self.lastmod, f)
 
     def parse_bill_list(self, url, start):
         sitemap = self.get(url).content
         root = ET.fromstring(sitemap)
+        scraped = self.lastmod["bills"]
+        changed = []
         for row in root.findall("us:url", self.ns):
-            date = datetime.datetime.fromisoformat(
-                self.get_xpath(row, "us:lastmod")[:-1]
-            )
+            lastmod = self.get_xpath(row, "us:lastmod")
+            bill_url = self.get_xpath(row, "us:loc")
+            if start:
+                date = datetime.datetime.fromisoformat(lastmod[:-1])
+                if date <= start:
+                    continue
+            elif lastmod <= scraped.get(bill_url, ""):
+                continue
+            changed.append((bill_url, lastmod))
+        self.info(f"{len(changed)} bills in {url} changed since the last run")
 
-            if date > start:
-                bill_url = self.get_xpath(row, "us:loc")
-                self.debug(
-                    f"{datetime.datetime.strftime(date, '%c')} > {datetime.datetime.strftime(start, '%c')}, scraping {bill_url}"
-                )
-                yield from self.parse_bill(bill_url)
+        # download the next few bills while the current one is parsed
+        for bill_url, lastmod in self.prefetch(changed, url=lambda row: row[0]):
+            self.debug(f"{bill_url} updated {lastmod}, scraping")
+            yield from self.parse_bill(bill_url)
+            scraped[bill_url] = lastmod
 
     def parse_bill(self, url):
         xml = self.get(url).content
-        xml = ET.fromstring(xml)
-
-        bill_num = self.get_xpath(xml, "bill/billNumber")
-        if not bill_num:
-            bill_num = self.get_xpath(xml, "bill/number")
 
-        bill_type = self.get_xpath(xml, "bill/billType")
-        if not bill_type:
-            bill_type = self.get_xpath(xml, "bill/type")
-
-        bill_id = f"{bill_type} {bill_num}"
+        # walk the document once, handing each section of <bill> (actions,
+        # cosponsors, ...) to its handler as soon as it has been parsed and
+        # freeing it afterwards. sections that come before the bill's number,
+        # type, chamber and congress are known wait for them, and <titles>
+        # waits for <title>.
+        fields = {}
+        bill = None
+        waiting = []
+        depth = 0
+        for event, elem in ET.iterparse(io.BytesIO(xml), events=("start", "end")):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 2:
+                continue
 
-        chamber_name = self.get_xpath(xml, "bill/originChamber")
-        chamber = self.chambers[chamber_name]
+            if len(elem):
+                waiting.append(elem)
+            else:
+                fields[elem.tag] = elem.text
+                if bill is not None and elem.tag == "title":
+                    bill.title = elem.text
+
+            if bill is None:
+                bill_num = fields.get("billNumber") or fields.get("number")
+                bill_type = fields.get("billType") or fields.get("type")
+                chamber_name = fields.get("originChamber")
+                session = fields.get("congress")
+                if not (bill_num and bill_type and chamber_name and session):
+                    continue
 
-        title = self.get_xpath(xml, "bill/title")
+                bill_id = f"{bill_type} {bill_num}"
+                chamber = self.chambers[chamber_name]
+                classification = self.classifications[bill_type]
+                xml_url = f"https://www.govinfo.gov/bulkdata/BILLSTATUS/{session}/{bill_type.lower()}/BILLSTATUS-{session}{bill_type.lower()}{bill_num}.xml"
+
+                # <title> usually comes later on, and is filled in then
+                bill = Bill(
+                    bill_id,
+                    legislative_session=session,
+                    chamber=chamber,
+                    title=fields.get("title"),
+                    classification=classification,
+                )
+                bill.extras["sponsor_bioguides"] = []
+                bill.extras["cosponsor_bioguides"] = []
 
-        classification = self.classifications[bill_type]
+            for section in list(waiting):
+                if section.tag == "titles" and "title" not in fields:
+                    continue
+                yield from self.scrape_section(bill, section, xml_url)
+                section.clear()
+                waiting.remove(section)
 
-        session = self.get_xpath(xml, "bill/congress")
+        for section in waiting:
+            yield from self.scrape_section(bill, section, xml_url)
 
-        bill = Bill(
-            bill_id,
-            legislative_session=session,
-            chamber=chamber,
-            title=title,
-            classification=classification,
-        )
+        self.scrape_rules_amendments(bill, session, chamber, bill_id)
 
-        self.scrape_actions(bill, xml)
-        self.scrape_amendments(bill, xml, session, chamber, bill_id)
-        self.scrape_cbo(bill, xml)
-        self.scrape_committee_reports(bill, xml)
-        self.scrape_cosponsors(bill, xml)
-        self.scrape_laws(bill, xml)
-        self.scrape_related_bills(bill, xml)
-        self.scrape_sponsors(bill, xml)
-        self.scrape_subjects(bill, xml)
-        self.scrape_summaries(bill, xml)
-        self.scrape_titles(bill, xml)
-        self.scrape_versions(bill, xml)
-
-        for vote in self.scrape_votes(bill, xml):
-            yield vote
-
-        xml_url = f"https://www.govinfo.gov/bulkdata/BILLSTATUS/{session}/{bill_type.lower()}/BILLSTATUS-{session}{bill_type.lower()}{bill_num}.xml"
         bill.add_source(xml_url)
         # need to get Congress.gov URL for source & additional versions
         # https://www.congress.gov/bill/116th-congress/house-bill/1
@@ -192,11 +264,17 @@ class USBillScraper(Scraper):
         # use cg_url to get additional version for public law
         # disabled 9/2021 - congress.gov was giving 503s
         # self.scrape_public_law_version(bill, cg_url)
-        for event in self.scrape_hearing_by(bill, xml, xml_url):
-            yield event
 
         yield bill
 
+    def scrape_section(self, bill, section, xml_url):
+        if section.tag == "actions":
+            self.scrape_actions(bill, section)
+            yield from self.scrape_votes(bill, section)
+            yield from self.scrape_hearing_by(bill, section, xml_url)
+        elif section.tag in self.section_handlers:
+            getattr(self, self.section_handlers[section.tag])(bill, section)
+
     def build_sponsor_name(self, row):
         first_name = self.get_xpath(row, "firstName")
         middle_name = self.get_xpath(row, "middleName")
@@ -292,7 +370,7 @@ class USBillScraper(Scraper):
 
         # list for deduping
         actions = []
-        for row in xml.findall("bill/actions/item"):
+        for row in xml.findall("item"):
             action_text = self.get_xpath(row, "text")
             if action_text not in actions:
                 source = self.get_xpath(row, "sourceSystem/name")
@@ -355,7 +433,7 @@ class USBillScraper(Scraper):
     def scrape_hearing_by(self, bill, xml, url):
         actions = []
 
-        for row in xml.findall("bill/actions/item"):
+        for row in xml.findall("item"):
             action_text = (
                 self.get_xpath(row, "text") if self.get_xpath(row, "text") else ""
             )
@@ -390,13 +468,13 @@ class USBillScraper(Scraper):
 
             yield event
 
-    def scrape_amendments(self, bill, xml, session, chamber, bill_id):
+    def scrape_amendments(self, bill, xml):
         slugs = {
             "HAMDT": "house-amendment",
             "SAMDT": "senate-amendment",
         }
 
-        for row in xml.findall("bill/amendments/amendment"):
+        for row in xml.findall("amendment"):
             session = self.get_xpath(row, "congress")
             num = self.get_xpath(row, "number")
 
@@ -411,6 +489,7 @@ class USBillScraper(Scraper):
                 media_type="text/html",
             )
 
+    def scrape_rules_amendments(self, bill, session, chamber, bill_id):
         # ex: https://rules.house.gov/bill/116/hr-3884
         if chamber == "lower":
             rules_url = (
@@ -441,7 +520,7 @@ class USBillScraper(Scraper):
 
     # CBO cost estimates
     def scrape_cbo(self, bill, xml):
-        for row in xml.findall("bill/cboCostEstimates/item"):
+        for row in xml.findall("item"):
             bill.add_document_link(
                 note=f"CBO: {self.get_xpath(row, 'title')}",
                 url=self.get_xpath(row, "url"),
@@ -452,7 +531,7 @@ class USBillScraper(Scraper):
     def scrape_committee_reports(self, bill, xml):
         regex = r"(?P<chamber>[H|S|J])\.\s+Rept\.\s+(?P<session>\d+)-(?P<num>\d+)"
 
-        for row in xml.findall("bill/committeeReports/committeeReport"):
+        for row in xml.findall("committeeReport"):
             report = self.get_xpath(row, "citation")
             match = re.search(regex, report)
 
@@ -462,7 +541,7 @@ class USBillScraper(Scraper):
 
     def scrape_cosponsors(self, bill, xml):
         all_sponsors = []
-        for row in xml.findall("bill/cosponsors/item"):
+        for row in xml.findall("item"):
             if not self.get_xpath(row, "sponsorshipWithdrawnDate"):
                 bill.add_sponsorship(
                     self.build_sponsor_name(row),
@@ -477,7 +556,7 @@ class USBillScraper(Scraper):
         # ex. public law, https://www.govinfo.gov/bulkdata/BILLSTATUS/117/s/BILLSTATUS-117s325.xml
         # ex. private law, https://www.govinfo.gov/bulkdata/BILLSTATUS/115/hr/BILLSTATUS-115hr4641.xml
 
-        for row in xml.findall("bill/laws/item"):
+        for row in xml.findall("item"):
             law_type = self.get_xpath(row, "type")
             law_ref = self.get_xpath(row, "number")
 
@@ -491,7 +570,7 @@ class USBillScraper(Scraper):
             )
 
     def scrape_related_bills(self, bill, xml):
-        for row in xml.findall("bill/relatedBills/item"):
+        for row in xml.findall("item"):
             identifier = (
                 f"{self.get_xpath(row, 'type')} {self.get_xpath(row, 'number')}"
             )
@@ -504,7 +583,7 @@ class USBillScraper(Scraper):
 
     def scrape_sponsors(self, bill, xml):
         all_sponsors = []
-        for row in xml.findall("bill/sponsors/item"):
+        for row in xml.findall("item"):
             if not row.findall("sponsorshipWithdrawnDate"):
                 bill.add_sponsorship(
                     self.build_sponsor_name(row),
@@ -516,12 +595,12 @@ class USBillScraper(Scraper):
         bill.extras["sponsor_bioguides"] = all_sponsors
 
     def scrape_subjects(self, bill, xml):
-        for row in xml.findall("bill/subjects/billSubjects/legislativeSubjects/item"):
+        for row in xml.findall("billSubjects/legislativeSubjects/item"):
             bill.add_subject(self.get_xpath(row, "name"))
 
     def scrape_summaries(self, bill, xml):
         seen_abstracts = set()
-        for row in xml.findall("bill/summaries/billSummaries/item"):
+        for row in xml.findall("billSummaries/item"):
             abstract = self.get_xpath(row, "text")
 
             if abstract not in seen_abstracts:
@@ -536,7 +615,7 @@ class USBillScraper(Scraper):
         # add current title to prevent dupes
         all_titles.add(bill.title)
 
-        for alt_title in xml.findall("bill/titles/item"):
+        for alt_title in xml.findall("item"):
             all_titles.add(self.get_xpath(alt_title, "title"))
 
         all_titles.remove(bill.title)
@@ -545,7 +624,7 @@ class USBillScraper(Scraper):
             bill.add_title(title)
 
     def scrape_versions(self, bill, xml):
-        for row in xml.findall("bill/textVersions/item"):
+        for row in xml.findall("item"):
             version_title = self.get_xpath(row, "type")
             try:
                 version_date = self.get_xpath(row, "date")[:10]
@@ -597,7 +676,7 @@ class USBillScraper(Scraper):
 
     def scrape_votes(self, bill, xml):
         vote_urls = []
-        for row in xml.findall("bill/actions/item/recordedVotes/recordedVote"):
+        for row in xml.findall("item/recordedVotes/recordedVote"):
             url = self.get_xpath(row, "url")
             chamber = self.get_xpath(row, "chamber")
             if url not in vote_urls:
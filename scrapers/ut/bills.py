@@ -3,7 +3,8 @@ import datetime
 
 from openstates.scrape import Scraper, Bill, VoteEvent as Vote
 from .actions import Categorizer
-from utils import LXMLMixin
+from utils import LXMLMixin, PrefetchMixin
+from utils.actions import CategorizerCacheMixin
 
 import lxml.html
 import scrapelib
@@ -23,7 +24,7 @@ SUB_BLACKLIST = [
 SPECIAL_SLUGS = {"2021S1H": "2021Y1", "2021S1S": "2021X1"}
 
 
-class UTBillScraper(Scraper, LXMLMixin):
+class UTBillScraper(CategorizerCacheMixin, PrefetchMixin, Scraper, LXMLMixin):
     categorizer = Categorizer()
 
     def scrape(self, session=None, chamber=None):
@@ -73,7 +74,7 @@ class UTBillScraper(Scraper, LXMLMixin):
             bill_index = self.lxmlize(session_url + "&bills=" + bill_index)
             bills = bill_index.xpath('//a[contains(@href, "/bills/static/")]')
 
-            for bill in bills:
+            for bill in self.prefetch(bills, url=lambda bill: bill.xpath("@href")[0]):
                 yield from self.scrape_bill(
                     chamber=chamber,
                     session=session,
@@ -2,6 +2,7 @@ import re
 
 from .lxmlize import LXMLMixin  # noqa
 from .lxmlize import url_xpath  # noqa
+from .prefetch import PrefetchMixin  # noqa
 import hashlib
 import uuid
 
@@ -1,8 +1,16 @@
 import re
+import logging
+import threading
+from types import MappingProxyType
 from typing import Iterable
-from collections import namedtuple, defaultdict
+from collections import namedtuple, defaultdict, OrderedDict
 from six import string_types
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # python < 3.11
+    import sre_parse
+
 
 class Rule(namedtuple("Rule", "regexes types stop attrs")):
     """If any of ``regexes`` matches the action text, the resulting
@@ -60,6 +68,115 @@ class Rule(namedtuple("Rule", "regexes types stop attrs")):
             return None
 
 
+def match_rules(rules, text):
+    """Yield (rule, attrs) for each of ``rules`` that matches ``text``,
+    in order, stopping after the first matching rule with ``stop`` set.
+    """
+    for rule in rules:
+        attrs = rule.match(text)
+
+        # matched if attrs is not None - empty attr dict means a match
+        if attrs is not None:
+            yield rule, attrs
+
+            # break if there was a match and rule says so, otherwise
+            # continue testing against other rules
+            if rule.stop:
+                break
+
+
+def required_literal(regex):
+    """Return the longest run of literal characters that every match of
+    ``regex`` must contain, and whether it is matched case insensitively,
+    or (None, False) if there isn't a usable one.
+    """
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return None, False
+    ignorecase = bool(parsed.state.flags & re.IGNORECASE)
+
+    runs = []
+
+    def walk(items):
+        run = []
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                run.append(chr(av))
+                continue
+            runs.append("".join(run))
+            run = []
+            # the body of a group without local flags is always matched
+            if op is sre_parse.SUBPATTERN and not av[1] and not av[2]:
+                walk(av[3])
+        runs.append("".join(run))
+
+    walk(parsed)
+    literal = max(runs, key=len)
+    if len(literal) < 2:
+        return None, False
+    if ignorecase:
+        # case folding is only predictable for ascii
+        if not literal.isascii():
+            return None, False
+        literal = literal.lower()
+    return literal, ignorecase
+
+
+class CompiledRules(object):
+    """A categorizer's rules prepared for fast matching.
+
+    Every regex is paired with a literal substring that any match of it
+    must contain, so most regexes are ruled out with a plain substring
+    test instead of a regex search. A single combined alternation can't
+    be used, since the re module only reports one of the alternatives
+    that match while every matching rule contributes to the result.
+    ``matches`` yields exactly what ``match_rules`` does.
+    """
+
+    def __init__(self, rules):
+        self.rules = [
+            (rule, [(regex,) + required_literal(regex) for regex in rule.regexes])
+            for rule in rules
+        ]
+
+    def matches(self, text):
+        lowered = text.lower() if text.isascii() else None
+
+        for rule, regexes in self.rules:
+            attrs = {}
+            matched = False
+
+            for regex, literal, ignorecase in regexes:
+                if literal is not None:
+                    if ignorecase:
+                        if lowered is not None and literal not in lowered:
+                            continue
+                    elif literal not in text:
+                        continue
+                m = regex.search(text)
+                if m:
+                    matched = True
+                    attrs.update(m.groupdict())
+
+            if matched:
+                yield rule, attrs
+                if rule.stop:
+                    break
+
+
+def freeze(attrs):
+    """Return an immutable view of a categorize() result."""
+    return MappingProxyType(
+        {k: tuple(v) if isinstance(v, list) else v for k, v in attrs.items()}
+    )
+
+
+def thaw(attrs):
+    """Return a mutable copy of a frozen categorize() result."""
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in attrs.items()}
+
+
 class BaseCategorizer(object):
     """A class that exposes a main categorizer function
     and before and after hooks, in case categorization requires specific
@@ -70,35 +187,90 @@ class BaseCategorizer(object):
 
     rules = []
 
+    # match text against CompiledRules built from ``rules`` instead of
+    # searching every regex; the results are identical
+    compiled = False
+
+    # number of distinct action texts whose results are kept; 0 disables
+    cache_size = 4096
+
     def __init__(self):
         pass
 
+    @classmethod
+    def compiled_rules(cls):
+        # built once per class, not inherited from a parent's rules
+        if "_compiled_rules" not in cls.__dict__:
+            cls._compiled_rules = CompiledRules(cls.rules)
+        return cls._compiled_rules
+
     def categorize(self, text):
+        return thaw(self.categorize_frozen(text))
+
+    def categorize_frozen(self, text):
+        """Categorize ``text``, returning an immutable result that's shared
+        with every other caller categorizing the same text. Results are
+        cached by the pre-categorized text in a bounded LRU cache.
+        """
         # run pre-categorization hook on text
         text = self.pre_categorize(text)
-
+        if not self.cache_size:
+            return freeze(self._categorize(text))
+
+        if "_cache" not in self.__dict__:
+            self._cache = OrderedDict()
+            self._cache_lock = threading.Lock()
+            self.cache_hits = self.cache_misses = 0
+
+        with self._cache_lock:
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                self.cache_hits += 1
+                return self._cache[text]
+
+        result = freeze(self._categorize(text))
+        with self._cache_lock:
+            self.cache_misses += 1
+            self._cache[text] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def log_cache_info(self):
+        """Log the cache's hits and misses since the last call."""
+        if "_cache" not in self.__dict__:
+            return
+        with self._cache_lock:
+            hits, misses = self.cache_hits, self.cache_misses
+            self.cache_hits = self.cache_misses = 0
+        if hits + misses:
+            logging.getLogger("openstates").info(
+                "%s cache: %d hits, %d misses (%.0f%% of %d actions)",
+                type(self).__name__,
+                hits,
+                misses,
+                100.0 * hits / (hits + misses),
+                hits + misses,
+            )
+
+    def _categorize(self, text):
         types = set()
         return_val = defaultdict(set)
 
-        for rule in self.rules:
-
-            attrs = rule.match(text)
-
-            # matched if attrs is not None - empty attr dict means a match
-            if attrs is not None:
-                # add types, rule attrs and matched attrs
-                types |= rule.types
+        if self.compiled:
+            matches = self.compiled_rules().matches(text)
+        else:
+            matches = match_rules(self.rules, text)
 
-                # Also add its specified attrs.
-                for k, v in attrs.items():
-                    return_val[k].add(v)
+        for rule, attrs in matches:
+            # add types, rule attrs and matched attrs
+            types |= rule.types
 
-                return_val.update(**rule.attrs)
+            # Also add its specified attrs.
+            for k, v in attrs.items():
+                return_val[k].add(v)
 
-                # break if there was a match and rule says so, otherwise
-                # continue testing against other rules
-                if rule.stop:
-                    break
+            return_val.update(**rule.attrs)
 
         # set type
         return_val["classification"] = list(types)
@@ -145,3 +317,19 @@ class BaseCategorizer(object):
     def post_categorize(self, return_val):
         """A post-categorization hook. Takes & returns attrs dict."""
         return return_val
+
+
+class CategorizerCacheMixin(object):
+    """Scraper mixin that logs the cache info of the scraper's categorizers
+    once each scrape has finished. Must come before ``Scraper`` in the base
+    classes.
+    """
+
+    def do_scrape(self, *args, **kwargs):
+        try:
+            return super().do_scrape(*args, **kwargs)
+        finally:
+            for name in dir(type(self)):
+                categorizer = getattr(type(self), name, None)
+                if isinstance(categorizer, BaseCategorizer):
+                    categorizer.log_cache_info()
@@ -0,0 +1,290 @@
+"""
+Base class for the JSON APIs some legislatures publish (IN, NY, OR).
+
+JsonApiClient fetches through the scraper it is given. On top of that it adds:
+
+* A token bucket that spaces out requests. It slows down when the API says
+  to, through a 429's Retry-After header or the RateLimit-Remaining and
+  RateLimit-Reset headers (or their X- prefixed forms).
+* A connection pool sized for the background requests.
+* unpaginate(), which fetches the next page of a listing in the background
+  while the current one is being used.
+* get_many(), which keeps a few requests for a list of records in flight.
+* Per-endpoint request, latency and byte counters, written to the log by
+  log_stats().
+
+Subclasses set ``root`` and ``resources``. Depending on the API they also
+override ``headers()``, ``build_url()``, ``page_items()`` and
+``next_page()``.
+"""
+import time
+import logging
+import threading
+import collections
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+class BadApiResponse(Exception):
+    """Raised if the service returns a status code of 400 or higher,
+    other than 429, to a scraper that doesn't raise for error statuses
+    itself. Makes the response object available as exc.resp
+    """
+
+    def __init__(self, resp, *args):
+        super(BadApiResponse, self).__init__(self, *args)
+        self.resp = resp
+
+
+class RateLimiter(object):
+    """
+    A token bucket allowing ``rate`` requests a second, in bursts of up to
+    ``burst``. With no rate it only waits out pauses the API asked for.
+
+    Rate limit headers set the rate, up to the configured one, until the
+    API's current window resets; after that the configured rate applies
+    again.
+    """
+
+    def __init__(self, rate=None, burst=1):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        # when the rate set by pause() or update() expires
+        self.window_ends = None
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.window_ends is not None and now >= self.window_ends:
+                self.rate = self.base_rate
+                self.window_ends = None
+            wait = max(self.paused_until - now, 0.0)
+            if self.rate:
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                self.tokens -= 1
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens / self.rate)
+        if wait:
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stop handing out tokens for ``seconds``, then go at half the rate
+        for as long again."""
+        with self.lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            if self.rate:
+                self.rate /= 2
+                self.window_ends = max(
+                    self.window_ends or 0.0, self.paused_until + seconds
+                )
+
+    def update(self, remaining, reset):
+        """Spread the ``remaining`` requests the API allows over the ``reset``
+        seconds until its window starts again. ``reset`` may also be the
+        epoch time the window starts again."""
+        if reset > 1e9:
+            reset -= time.time()
+        if reset <= 0:
+            return
+        with self.lock:
+            rate = max(remaining, 1) / reset
+            if self.base_rate is not None:
+                rate = min(rate, self.base_rate)
+            self.rate = rate
+            self.window_ends = time.monotonic() + reset
+
+
+def _header(headers, *names):
+    for name in names:
+        if name in headers:
+            try:
+                return float(headers[name])
+            except ValueError:
+                return None
+
+
+class JsonApiClient(object):
+    root = None
+    resources = {}
+
+    # requests a second, None to only slow down when the API asks to
+    rate = None
+    burst = 1
+    max_retries = 3
+    # workers fetching the next pages of listings in the background
+    prefetch_workers = 1
+    # requests get_many() keeps in flight at once
+    concurrency = 4
+
+    def __init__(self, scraper):
+        if not scraper:
+            scraper = requests.Session()
+        self.scraper = scraper
+        self.logger = getattr(scraper, "logger", logging.getLogger("openstates"))
+        self.limiter = RateLimiter(self.rate, self.burst)
+        self._executor = None
+        self._stats = collections.defaultdict(lambda: [0, 0.0, 0])
+        self._stats_lock = threading.Lock()
+
+        # keep enough connections to the API open for the prefetching threads
+        if hasattr(scraper, "mount") and self.root:
+            scraper.mount(
+                self.root,
+                requests.adapters.HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=max(self.prefetch_workers, self.concurrency) + 1,
+                ),
+            )
+
+    def headers(self):
+        return {"Accept": "application/json"}
+
+    def build_url(self, resource_name, **url_format_args):
+        url = self.resources[resource_name].format(**url_format_args)
+        return urljoin(self.root, url)
+
+    def request(self, url, endpoint, requests_args=None, requests_kwargs=None):
+        """GET url, waiting for the rate limit and retrying 429s, and return
+        the response. Other error statuses raise the scraper's own
+        HTTPError (scrapelib's), or BadApiResponse if it didn't raise."""
+        requests_args = requests_args or ()
+        requests_kwargs = dict(requests_kwargs or {})
+        requests_kwargs["headers"] = {
+            **self.headers(),
+            **requests_kwargs.get("headers", {}),
+        }
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            start = time.monotonic()
+            error = None
+            try:
+                resp = self.scraper.get(url, *requests_args, **requests_kwargs)
+            except requests.HTTPError as e:
+                # scrapelib raises for error statuses
+                if e.response is None:
+                    raise
+                error = e
+                resp = e.response
+            self.record(endpoint, time.monotonic() - start, len(resp.content))
+
+            remaining = _header(
+                resp.headers, "RateLimit-Remaining", "X-RateLimit-Remaining"
+            )
+            reset = _header(resp.headers, "RateLimit-Reset", "X-RateLimit-Reset")
+            if remaining is not None and reset is not None:
+                self.limiter.update(remaining, reset)
+
+            if resp.status_code == 429 and attempt < self.max_retries:
+                seconds = _header(resp.headers, "Retry-After") or 2**attempt
+                self.logger.info(
+                    "Got a 429: Sleeping %s seconds per retry-after header." % seconds
+                )
+                self.limiter.pause(seconds)
+                continue
+            if error is not None:
+                # callers handle scrapelib.HTTPError, e.g. to skip a 404
+                raise error
+            if resp.status_code >= 400:
+                msg_args = (resp, resp.text, resp.headers)
+                msg = "Bad api response: %r %r %r" % msg_args
+                raise BadApiResponse(resp, msg)
+            return resp
+
+    def get(
+        self, resource_name, requests_args=None, requests_kwargs=None, **url_format_args
+    ):
+        """Resource is a self.resources dict key."""
+        url = self.build_url(resource_name, **url_format_args)
+        self.logger.info("Api GET: %r" % url)
+        return self.request(url, resource_name, requests_args, requests_kwargs).json()
+
+    def get_many(self, resource_name, url_format_args, workers=None):
+        """
+        Yield get(resource_name, **args) for each of url_format_args, in
+        order, with up to ``workers`` of the requests in flight at once.
+        """
+        workers = workers or self.concurrency
+        pending = collections.deque()
+        with ThreadPoolExecutor(workers, thread_name_prefix="apiclient") as pool:
+            try:
+                for args in url_format_args:
+                    pending.append(pool.submit(self.get, resource_name, **args))
+                    if len(pending) >= workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def get_relurl(self, url, endpoint="next page"):
+        url = urljoin(self.root, url)
+        self.logger.info("Api GET: %r" % url)
+        return self.request(url, endpoint).json()
+
+    def page_items(self, result):
+        return result["items"]
+
+    def next_page(self, result, url):
+        """Return the URL of the page after result (fetched from url), or None."""
+        return result.get("nextLink")
+
+    def unpaginate(self, result, url=None):
+        """
+        Yield the items of result and of each page after it, fetching the next
+        page in the background while the current one is consumed.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.prefetch_workers, thread_name_prefix="apiclient"
+            )
+        while result is not None:
+            items = self.page_items(result)
+            if not items:
+                return
+            url = self.next_page(result, url)
+            future = url and self._executor.submit(self.get_relurl, url)
+            try:
+                yield from items
+            except GeneratorExit:
+                if future:
+                    future.cancel()
+                raise
+            result = future.result() if future else None
+
+    def paginate(self, resource_name, **url_format_args):
+        """Yield the items of every page of a listing."""
+        url = self.build_url(resource_name, **url_format_args)
+        self.logger.info("Api GET: %r" % url)
+        return self.unpaginate(self.request(url, resource_name).json(), url)
+
+    def record(self, endpoint, seconds, size):
+        with self._stats_lock:
+            stats = self._stats[endpoint]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] += size
+
+    def stats(self):
+        """Return {endpoint: (requests, seconds, bytes)}."""
+        with self._stats_lock:
+            return {endpoint: tuple(stats) for endpoint, stats in self._stats.items()}
+
+    def log_stats(self):
+        for endpoint, (count, seconds, size) in sorted(self.stats().items()):
+            self.logger.info(
+                "%s: %d requests, %.1fs (%.2fs avg), %.1f MB"
+                % (endpoint, count, seconds, seconds / count, size / 1e6)
+            )
@@ -0,0 +1,128 @@
+import re
+import time
+import queue
+import ftplib
+import threading
+import contextlib
+
+# a DOS style LIST line, as served by IIS, e.g.
+# 01-13-23  10:15AM       <DIR>          billhistory
+# 01-13-23  10:15AM                 2048 HB00001.xml
+DOS_LIST_RE = re.compile(
+    r"""(?x)
+        ^(\d{2}-\d{2}-\d{2})\s+  # Date in mm-dd-yy
+        (\d{2}:\d{2}[AP]M)\s+  # Time in hh:mmAM/PM
+        (<DIR>)?\s+  # Directories will have an indicating flag
+        (\d+)?\s+  # Files will have their size in bytes
+        (.+?)\s*$  # Directory or file name is the remaining text
+    """
+)
+
+
+def parse_dos_list(line):
+    """Parse a DOS style LIST line into (name, facts) like MLSD returns."""
+    date, time_, is_dir, size, name = DOS_LIST_RE.search(line).groups()
+    facts = {"type": "dir" if is_dir else "file", "modify": date + " " + time_}
+    if size:
+        facts["size"] = size
+    return name, facts
+
+
+class FTPPool(object):
+    """
+    A small pool of logged in FTP sessions to one host, safe to share between
+    threads. Directory listings use MLSD when the server supports it and fall
+    back to parsing LIST output with ``parse_list``.
+    """
+
+    def __init__(
+        self, host, size=4, ftp_class=ftplib.FTP, parse_list=parse_dos_list, **login
+    ):
+        self.host = host
+        self.ftp_class = ftp_class
+        self.parse_list = parse_list
+        self.login = login
+        self.mlsd = None
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        for i in range(3):
+            try:
+                ftp = self.ftp_class(self.host)
+                break
+            except (EOFError, ftplib.error_temp):
+                time.sleep(2**i)
+        else:
+            raise ftplib.error_temp("could not connect to {}".format(self.host))
+        ftp.login(**self.login)
+        if self.mlsd is None:
+            try:
+                self.mlsd = "MLST" in ftp.sendcmd("FEAT")
+            except ftplib.error_perm:
+                self.mlsd = False
+        return ftp
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrow a session, dropping it instead if it failed while in use."""
+        with self._slots:
+            try:
+                ftp = self._idle.get_nowait()
+            except queue.Empty:
+                ftp = self._connect()
+            usable = False
+            try:
+                yield ftp
+                usable = True
+            except (ftplib.error_perm, ftplib.error_reply):
+                # the command failed, not the session
+                usable = True
+                raise
+            finally:
+                if usable:
+                    self._idle.put(ftp)
+                else:
+                    ftp.close()
+
+    def listdir(self, path):
+        """Return the (name, facts) of every entry in a directory."""
+        with self.connection() as ftp:
+            if self.mlsd:
+                return [
+                    (name, facts)
+                    for name, facts in ftp.mlsd(path, ["type", "size", "modify"])
+                    if facts.get("type") in ("dir", "file")
+                ]
+            lines = []
+            ftp.retrlines("LIST " + path, lines.append)
+        return [self.parse_list(line) for line in lines]
+
+    def walk(self, path):
+        """Yield the (path, facts) of every file under path, recursively."""
+        for name, facts in self.listdir(path):
+            if facts["type"] == "dir":
+                yield from self.walk(path + "/" + name)
+            else:
+                yield path + "/" + name, facts
+
+    def read(self, path, retries=2):
+        """Return the contents of a file, reconnecting if the session drops."""
+        for attempt in range(retries + 1):
+            data = []
+            try:
+                with self.connection() as ftp:
+                    ftp.retrbinary("RETR " + path, data.append)
+            except (EOFError, OSError, ftplib.error_temp):
+                if attempt == retries:
+                    raise
+            else:
+                return b"".join(data)
+
+    def close(self):
+        while not self._idle.empty():
+            ftp = self._idle.get_nowait()
+            try:
+                ftp.quit()
+            except ftplib.all_errors:
+                ftp.close()
@@ -0,0 +1,202 @@
+"""
+In-process PDF text extraction with PyMuPDF.
+
+convert_pdf_data() takes the bytes of a PDF, e.g. ``self.get(url).content``,
+and is a drop-in replacement for ``openstates.utils.convert_pdf`` without the
+temp file and the pdftotext/pdftohtml subprocess. It accepts the same ``type``
+values and, like convert_pdf, returns utf-8 encoded bytes:
+
+ - "text": layout preserving text, like ``pdftotext -layout``
+ - "text-nolayout": text in reading order, like ``pdftotext``
+ - "xml": ``pdftohtml -xml`` style <page>/<text> elements
+ - "html": ``pdftohtml`` style html with one <br/> terminated line per row
+
+Pages are separated by form feeds in the text modes, as pdftotext does.
+"""
+import html
+import statistics
+from io import BytesIO
+
+import pymupdf
+
+# bump whenever a change here changes the output, so conversions cached by
+# utils.pdfcache are redone
+VERSION = 2
+
+# pdftohtml scales page coordinates by this much by default
+XML_ZOOM = 1.5
+
+
+def _rows(chunks):
+    """Group (x0, y0, x1, y1, text) chunks of a page into rows of
+    (middle, height, chunks) ordered from the top of the page down, each
+    row's chunks as (x0, x1, text) ordered left to right."""
+    rows = []
+    for x0, y0, x1, y1, word, *_ in sorted(
+        chunks, key=lambda w: ((w[1] + w[3]) / 2, w[0])
+    ):
+        middle = (y0 + y1) / 2
+        if rows and abs(rows[-1][0] - middle) <= (y1 - y0) / 2:
+            rows[-1][2].append((x0, x1, word))
+        else:
+            rows.append([middle, y1 - y0, [(x0, x1, word)]])
+    for row in rows:
+        row[2].sort()
+    return rows
+
+
+def _phrases(rows):
+    """Join the words on each row that are only a space apart into phrases,
+    which are laid out as a unit, as pdftotext does."""
+    median = statistics.median(
+        (x1 - x0) / len(word) for _, _, row in rows for x0, x1, word in row
+    )
+    for row in rows:
+        phrases = []
+        for x0, x1, word in row[2]:
+            if phrases and x0 - phrases[-1][1] < median:
+                phrases[-1] = (phrases[-1][0], x1, phrases[-1][2] + " " + word)
+            else:
+                phrases.append((x0, x1, word))
+        row[2] = phrases
+    return rows
+
+
+def _char_width(rows):
+    """The width of a character cell on the page: the median character width,
+    narrowed until each word fits before the next word on its row, so words
+    can be placed by their x position alone."""
+    median = statistics.median(
+        (x1 - x0) / len(word) for _, _, row in rows for x0, x1, word in row
+    )
+    width = median
+    for _, _, row in rows:
+        for (x0, _, word), (next_x0, _, _) in zip(row, row[1:]):
+            fit = (next_x0 - x0) / (len(word) + 1)
+            # words drawn (nearly) on top of each other can't be kept apart,
+            # don't shrink the whole page for them
+            if median / 2 <= fit < width:
+                width = fit
+    return width or 1
+
+
+def _layout_text(page):
+    rows = _rows(page.get_text("words"))
+    if not rows:
+        return ""
+    rows = _phrases(rows)
+
+    char_width = _char_width(rows)
+    left = min(x0 for _, _, row in rows for x0, _, _ in row)
+    line_height = statistics.median(height for _, height, _ in rows) or 1
+
+    lines = []
+    previous = None
+    for middle, _, row in rows:
+        # keep large vertical gaps as blank lines, as pdftotext does
+        if previous is not None:
+            blank = int(round((middle - previous) / line_height / 1.5)) - 1
+            lines.extend([""] * min(max(blank, 0), 2))
+        previous = middle
+
+        line = ""
+        for x0, _, word in row:
+            column = int(round((x0 - left) / char_width))
+            # only overlapping words are pushed right
+            if line and column <= len(line):
+                column = len(line) + 1
+            line = line.ljust(column) + word
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def _xml_page(page, number, fonts):
+    out = [
+        '<page number="%d" position="absolute" top="0" left="0" '
+        'height="%d" width="%d">'
+        % (
+            number,
+            round(page.rect.height * XML_ZOOM),
+            round(page.rect.width * XML_ZOOM),
+        )
+    ]
+    for block in page.get_text("dict", sort=True)["blocks"]:
+        for line in block.get("lines", []):
+            for span in line["spans"]:
+                if not span["text"].strip():
+                    continue
+                font = (round(span["size"]), span["font"], "#%06x" % span["color"])
+                if font not in fonts:
+                    fonts[font] = len(fonts)
+                    out.append(
+                        '\t<fontspec id="%d" size="%d" family="%s" color="%s"/>'
+                        % ((fonts[font],) + font)
+                    )
+                x0, y0, x1, y1 = span["bbox"]
+                out.append(
+                    '<text top="%d" left="%d" width="%d" height="%d" font="%d">%s</text>'
+                    % (
+                        round(y0 * XML_ZOOM),
+                        round(x0 * XML_ZOOM),
+                        round((x1 - x0) * XML_ZOOM),
+                        round((y1 - y0) * XML_ZOOM),
+                        fonts[font],
+                        html.escape(span["text"], quote=False),
+                    )
+                )
+    out.append("</page>")
+    return "\n".join(out)
+
+
+def _xml(doc):
+    fonts = {}
+    pages = [_xml_page(page, n, fonts) for n, page in enumerate(doc, start=1)]
+    return "\n".join(
+        [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<!DOCTYPE pdf2xml SYSTEM "pdf2xml.dtd">',
+            '<pdf2xml producer="pymupdf">',
+            *pages,
+            "</pdf2xml>",
+            "",
+        ]
+    )
+
+
+def _html(doc):
+    out = ["<!DOCTYPE html><html>", "<head>", "<title></title>", "</head>", "<body>"]
+    for number, page in enumerate(doc, start=1):
+        out.append("<a name=%d></a>" % number)
+        lines = [
+            (*line["bbox"], "".join(span["text"] for span in line["spans"]))
+            for block in page.get_text("dict", sort=True)["blocks"]
+            for line in block.get("lines", [])
+        ]
+        for _, _, row in _rows(lines):
+            # separate chunks on the same row with nbsp, like pdftohtml
+            out.append(
+                "&#160;".join(html.escape(word, quote=False) for _, _, word in row)
+                + "<br/>"
+            )
+        out.append("<hr/>")
+    out.extend(["</body>", "</html>", ""])
+    return "\n".join(out)
+
+
+def convert_pdf_data(data, type="xml"):
+    """Convert the bytes of a PDF into text, see the module docstring."""
+    doc = pymupdf.open("pdf", BytesIO(data))
+    try:
+        if type == "text":
+            text = "".join(_layout_text(page) + "\f" for page in doc)
+        elif type == "text-nolayout":
+            text = "".join(page.get_text(sort=True) + "\f" for page in doc)
+        elif type == "xml":
+            text = _xml(doc)
+        elif type == "html":
+            text = _html(doc)
+        else:
+            raise ValueError("unknown conversion type %r" % type)
+    finally:
+        doc.close()
+    return text.encode("utf-8")
@@ -0,0 +1,287 @@
+"""
+On-disk cache of text extracted from PDFs that don't change once published,
+like roll call vote sheets.
+
+Each URL remembers the ETag/Last-Modified it was last served with and the
+sha256 of its content. Later fetches are conditional, so an unchanged PDF is
+neither downloaded nor converted again when the server answers 304, and a
+PDF that is downloaded again but hashes the same isn't converted again
+either. Extracted text is stored once per content hash, conversion type and
+converter (engine and version, so upgrading either redoes the conversions),
+and the least recently used texts are evicted once the cache grows past its
+size limit.
+
+Conversion defaults to poppler, like openstates.utils.convert_pdf, since the
+vote parsers using the cache depend on its column layout. engine="pymupdf"
+converts in process with utils.pdf instead.
+
+The cache lives in PDF_CACHE_DIR (default _cache/pdf) and is capped at
+PDF_CACHE_MAX_MB megabytes (default 500). To inspect or prune it:
+
+    PYTHONPATH=scrapers poetry run python -m utils.pdfcache stats
+    PYTHONPATH=scrapers poetry run python -m utils.pdfcache list
+    PYTHONPATH=scrapers poetry run python -m utils.pdfcache prune --max-mb 100
+    PYTHONPATH=scrapers poetry run python -m utils.pdfcache clear
+"""
+import os
+import re
+import time
+import hashlib
+import logging
+import sqlite3
+import argparse
+import datetime
+import tempfile
+import functools
+import subprocess
+
+import pymupdf
+from openstates.utils import convert_pdf
+
+from . import pdf
+
+PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR", os.path.join("_cache", "pdf"))
+PDF_CACHE_MAX_MB = int(os.environ.get("PDF_CACHE_MAX_MB", 500))
+
+logger = logging.getLogger("openstates.pdfcache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT NOT NULL,
+    type TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (url, type)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT NOT NULL,
+    type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (digest, type)
+);
+"""
+
+
+@functools.lru_cache()
+def poppler_version():
+    try:
+        result = subprocess.run(
+            ["pdftotext", "-v"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+    except OSError:
+        return "unknown"
+    match = re.search(rb"version ([\w.]+)", result.stdout)
+    return match.group(1).decode() if match else "unknown"
+
+
+def poppler_convert(data, type):
+    """convert_pdf on a temp file holding data."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+        f.write(data)
+        f.flush()
+        return convert_pdf(f.name, type)
+
+
+# engine: (convert(data, type), version())
+ENGINES = {
+    "poppler": (poppler_convert, poppler_version),
+    "pymupdf": (
+        pdf.convert_pdf_data,
+        lambda: "%s-%d" % (pymupdf.VersionBind, pdf.VERSION),
+    ),
+}
+
+
+class PdfCache(object):
+    def __init__(self, path=PDF_CACHE_DIR, max_bytes=PDF_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+        self.db = sqlite3.connect(
+            os.path.join(path, "index.sqlite"), check_same_thread=False
+        )
+        self.db.executescript(SCHEMA)
+
+    def _blob_path(self, digest, type):
+        return os.path.join(self.path, digest[:2], "%s.%s" % (digest, type))
+
+    def _read_blob(self, digest, type):
+        try:
+            with open(self._blob_path(digest, type), "rb") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        with self.db:
+            self.db.execute(
+                "UPDATE blobs SET accessed = ? WHERE digest = ? AND type = ?",
+                (time.time(), digest, type),
+            )
+        return text
+
+    def _write_blob(self, digest, type, text):
+        path = self._blob_path(digest, type)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(text)
+        os.replace(path + ".tmp", path)
+        with self.db:
+            self.db.execute(
+                "REPLACE INTO blobs VALUES (?, ?, ?, ?)",
+                (digest, type, len(text), time.time()),
+            )
+
+    def convert(self, scraper, url, type="text", engine="poppler", **kwargs):
+        """
+        Return the text of the PDF at ``url`` as convert_pdf would, fetching
+        it with ``scraper.get(url, **kwargs)`` only if it changed.
+        """
+        convert, version = ENGINES[engine]
+        # entries are keyed on the converter too
+        key = "%s.%s-%s" % (type, engine, version())
+
+        entry = self.db.execute(
+            "SELECT etag, last_modified, digest FROM urls WHERE url = ? AND type = ?",
+            (url, key),
+        ).fetchone()
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            etag, last_modified, digest = entry
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        response = scraper.get(url, headers=headers, **kwargs)
+        if entry and response.status_code == 304:
+            text = self._read_blob(digest, key)
+            if text is not None:
+                logger.debug("not modified: %s" % url)
+                return text
+            # evicted since, fetch it again unconditionally
+            headers.pop("If-None-Match", None)
+            headers.pop("If-Modified-Since", None)
+            response = scraper.get(url, headers=headers, **kwargs)
+
+        digest = hashlib.sha256(response.content).hexdigest()
+        text = self._read_blob(digest, key)
+        if text is None:
+            text = convert(response.content, type)
+            self._write_blob(digest, key, text)
+            self.prune()
+
+        with self.db:
+            self.db.execute(
+                "REPLACE INTO urls VALUES (?, ?, ?, ?, ?)",
+                (
+                    url,
+                    key,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    digest,
+                ),
+            )
+        return text
+
+    def stats(self):
+        urls = self.db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        blobs, size = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()
+        return {"urls": urls, "texts": blobs, "bytes": size}
+
+    def entries(self):
+        """Yield (url, type, size, last accessed) most recently used first."""
+        yield from self.db.execute(
+            """
+            SELECT urls.url, urls.type, blobs.size, blobs.accessed
+            FROM urls JOIN blobs USING (digest, type)
+            ORDER BY blobs.accessed DESC
+            """
+        )
+
+    def prune(self, max_bytes=None, older_than=None):
+        """
+        Evict the least recently used texts until the cache is under
+        ``max_bytes``, and any not used since ``older_than`` (a timestamp).
+        Returns the number of texts evicted.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        size = self.stats()["bytes"]
+        evicted = []
+        for digest, type, blob_size, accessed in self.db.execute(
+            "SELECT digest, type, size, accessed FROM blobs ORDER BY accessed"
+        ).fetchall():
+            if size <= max_bytes and (older_than is None or accessed >= older_than):
+                break
+            evicted.append((digest, type))
+            size -= blob_size
+
+        with self.db:
+            for digest, type in evicted:
+                try:
+                    os.remove(self._blob_path(digest, type))
+                except FileNotFoundError:
+                    pass
+                self.db.execute(
+                    "DELETE FROM blobs WHERE digest = ? AND type = ?", (digest, type)
+                )
+                self.db.execute(
+                    "DELETE FROM urls WHERE digest = ? AND type = ?", (digest, type)
+                )
+        return len(evicted)
+
+
+_cache = None
+
+
+def cached_convert_pdf(scraper, url, type="text", engine="poppler", **kwargs):
+    """Fetch and convert a PDF through the shared PdfCache."""
+    global _cache
+    if _cache is None:
+        _cache = PdfCache()
+    return _cache.convert(scraper, url, type, engine, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="inspect or prune the PDF cache")
+    parser.add_argument("--dir", default=PDF_CACHE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats")
+    list_parser = commands.add_parser("list")
+    list_parser.add_argument("--limit", type=int, default=50)
+    prune_parser = commands.add_parser("prune")
+    prune_parser.add_argument("--max-mb", type=int, default=PDF_CACHE_MAX_MB)
+    prune_parser.add_argument(
+        "--older-than", type=int, metavar="DAYS", help="also evict texts unused for"
+    )
+    commands.add_parser("clear")
+    args = parser.parse_args()
+
+    cache = PdfCache(args.dir)
+    if args.command == "stats":
+        stats = cache.stats()
+        print(
+            "%d urls, %d texts, %.1f MB in %s"
+            % (stats["urls"], stats["texts"], stats["bytes"] / 1e6, args.dir)
+        )
+    elif args.command == "list":
+        for n, (url, type, size, accessed) in enumerate(cache.entries()):
+            if n == args.limit:
+                break
+            accessed = datetime.datetime.fromtimestamp(accessed)
+            print("%s %8d %-13s %s" % (accessed.strftime("%F %T"), size, type, url))
+    elif args.command == "prune":
+        older_than = None
+        if args.older_than is not None:
+            older_than = time.time() - args.older_than * 86400
+        evicted = cache.prune(args.max_mb * 1024 * 1024, older_than)
+        print("evicted %d texts" % evicted)
+    elif args.command == "clear":
+        print("evicted %d texts" % cache.prune(0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+import collections
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+PREFETCH_WORKERS = int(os.environ.get("PREFETCH_WORKERS", 4))
+PREFETCH_PER_HOST = int(os.environ.get("PREFETCH_PER_HOST", 4))
+
+
+class PrefetchMixin(object):
+    """Mixin for fetching upcoming detail pages while the current one is parsed.
+
+    Scrapers spend most of their time waiting on the network, one detail page
+    at a time. Wrapping the loop over detail URLs in ``self.prefetch()`` keeps
+    the next few pages downloading on a small thread pool, and the existing
+    ``self.get(url)`` (or ``self.lxmlize(url)``) call for each of them is
+    answered from the prefetched response::
+
+        class XXBillScraper(PrefetchMixin, Scraper):
+            def scrape(self, session=None):
+                for url in self.prefetch(self.get_bill_urls(session)):
+                    yield from self.scrape_bill(session, url)
+
+    Requests that don't depend on each other, like the actions and votes of
+    one bill, can be started together with ``self.prefetch_urls(urls)``.
+
+    Items are yielded in their original order. Requests are spaced out to
+    respect ``SCRAPELIB_RPM`` across all threads, and no more than
+    PREFETCH_PER_HOST of them go to one host at once. The mixin must come
+    before ``Scraper`` in the base classes, and PREFETCH_WORKERS=0 turns it
+    off.
+    """
+
+    prefetch_workers = PREFETCH_WORKERS
+    prefetch_per_host = PREFETCH_PER_HOST
+
+    _slot_lock = threading.Lock()
+    _next_slot = 0.0
+    _prefetched = None
+    _host_slots = None
+    _url_pool = None
+    _url_batch = ()
+
+    def _wait_for_slot(self):
+        rpm = getattr(self, "requests_per_minute", 0)
+        if not rpm:
+            return
+        with self._slot_lock:
+            now = time.time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 60.0 / rpm
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self._slot_lock:
+            if self._host_slots is None:
+                self._host_slots = {}
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(
+                    self.prefetch_per_host
+                )
+            return self._host_slots[host]
+
+    def request(self, method, url, *args, **kwargs):
+        with self._host_slot(url):
+            self._wait_for_slot()
+            return super().request(method, url, *args, **kwargs)
+
+    def get(self, url, **kwargs):
+        if self._prefetched and url in self._prefetched:
+            fetch_kwargs, future = self._prefetched[url]
+            if fetch_kwargs == kwargs:
+                del self._prefetched[url]
+                return future.result()
+        return super().get(url, **kwargs)
+
+    def prefetch(self, items, url=None, workers=None, **kwargs):
+        """Yield each of items in order, while fetching ``url(item)`` (the
+        item itself by default) with ``self.get(..., **kwargs)`` for up to
+        ``workers`` items ahead.
+
+        A matching ``self.get()`` made while handling an item returns its
+        prefetched response, or raises the error fetching it raised.
+        """
+        url = url or (lambda item: item)
+        workers = self.prefetch_workers if workers is None else workers
+        if workers <= 0:
+            yield from items
+            return
+
+        if self._prefetched is None:
+            self._prefetched = {}
+        fetch = super().get
+        pending = collections.deque()
+        items = iter(items)
+
+        pool = ThreadPoolExecutor(workers, thread_name_prefix="prefetch")
+        try:
+            while True:
+                for item in items:
+                    item_url = url(item)
+                    pending.append(
+                        (item, item_url, pool.submit(fetch, item_url, **kwargs))
+                    )
+                    if len(pending) > workers:
+                        break
+                if not pending:
+                    break
+
+                item, item_url, future = pending.popleft()
+                self._prefetched[item_url] = (kwargs, future)
+                try:
+                    yield item
+                finally:
+                    self._prefetched.pop(item_url, None)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def prefetch_urls(self, urls, **kwargs):
+        """Start fetching each of urls with ``self.get(url, **kwargs)`` in the
+        background, so a matching ``self.get()`` later returns its response.
+        An item of urls can also be a ``(url, kwargs)`` pair.
+
+        Responses of an earlier call that were never asked for are dropped.
+        """
+        if self.prefetch_workers <= 0:
+            return
+        if self._prefetched is None:
+            self._prefetched = {}
+        if self._url_pool is None:
+            self._url_pool = ThreadPoolExecutor(
+                self.prefetch_workers, thread_name_prefix="prefetch"
+            )
+        for url in self._url_batch:
+            self._prefetched.pop(url, None)
+
+        self._url_batch = []
+        for url in urls:
+            url, fetch_kwargs = url if isinstance(url, tuple) else (url, kwargs)
+            if url not in self._prefetched:
+                future = self._url_pool.submit(super().get, url, **fetch_kwargs)
+                self._prefetched[url] = (fetch_kwargs, future)
+                self._url_batch.append(url)
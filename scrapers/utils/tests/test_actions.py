@@ -0,0 +1,168 @@
+import os
+import re
+import glob
+import unittest
+import importlib.util
+
+from utils.actions import (
+    Rule,
+    BaseCategorizer,
+    CategorizerCacheMixin,
+    CompiledRules,
+    match_rules,
+    required_literal,
+)
+
+here = os.path.dirname(__file__)
+scrapers = os.path.dirname(os.path.dirname(here))
+
+
+def load_corpus(name):
+    path = os.path.join(here, "fixtures", "actions", name + ".txt")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def load_categorizers():
+    """Yield (state, categorizer class) for every BaseCategorizer in
+    scrapers/*/actions.py."""
+    for path in sorted(glob.glob(os.path.join(scrapers, "*", "actions.py"))):
+        state = os.path.basename(os.path.dirname(path))
+        spec = importlib.util.spec_from_file_location(state + "_actions", path)
+        module = importlib.util.module_from_spec(spec)
+        # a categorizer that doesn't import fails the test instead of
+        # silently going untested
+        spec.loader.exec_module(module)
+        for obj in vars(module).values():
+            if (
+                isinstance(obj, type)
+                and issubclass(obj, BaseCategorizer)
+                and obj is not BaseCategorizer
+            ):
+                yield state, obj
+
+
+def normalize(result):
+    return {
+        k: sorted(map(str, v)) if isinstance(v, list) else v for k, v in result.items()
+    }
+
+
+class TestRequiredLiteral(unittest.TestCase):
+    def literal(self, pattern, flags=0):
+        return required_literal(re.compile(pattern, flags))
+
+    def test_longest_run(self):
+        self.assertEqual(self.literal(r"^Read\s+third time"), ("third time", False))
+
+    def test_group_body(self):
+        self.assertEqual(self.literal(r"(?P<x>Referred) to"), ("Referred", False))
+
+    def test_ignorecase(self):
+        self.assertEqual(self.literal(r"(?i)Vetoed by"), ("vetoed by", True))
+
+    def test_none(self):
+        self.assertEqual(self.literal(r"Read|Adopted"), (None, False))
+        self.assertEqual(self.literal(r"(?i:read)x"), (None, False))
+        self.assertEqual(self.literal(r"a?b"), (None, False))
+
+
+class TestCompiledEquivalence(unittest.TestCase):
+    """Both engines must produce identical results over the recorded
+    action corpora, for every categorizer in the repo."""
+
+    def assertEquivalent(self, categorizer, texts):
+        categorizer.cache_size = 0
+        compiled = CompiledRules(categorizer.rules)
+        for text in texts:
+            with self.subTest(categorizer=type(categorizer).__name__, text=text):
+                expected = list(match_rules(categorizer.rules, text))
+                self.assertEqual(list(compiled.matches(text)), expected)
+
+                categorizer.compiled = False
+                expected = categorizer.categorize(text)
+                categorizer.compiled = True
+                self.assertEqual(
+                    normalize(categorizer.categorize(text)), normalize(expected)
+                )
+
+    def test_synthetic_rules(self):
+        class Categorizer(BaseCategorizer):
+            rules = (
+                Rule(r"Read first time", "reading-1"),
+                Rule(r"(?i)referred to (?P<committees>.+)", "referral-committee"),
+                Rule(r"Passed", "passage", stop=True),
+                Rule(r"Passed House", "passage", actor="lower"),
+                Rule([r"Ayes (?P<yes>\d+)", r"Noes (?P<no>\d+)"]),
+            )
+
+        self.assertEquivalent(
+            Categorizer(),
+            [
+                "Read first time",
+                "Read  first   time",
+                "REFERRED TO Com. on Rules",
+                "Referred to Cmte. on Ŝtate Affairs",
+                "Passed House. Ayes 40 Noes 3",
+                "Noes 2",
+                "",
+            ],
+        )
+
+    def test_repo_categorizers(self):
+        common = load_corpus("common")
+        for state, cls in load_categorizers():
+            self.assertEquivalent(cls(), load_corpus(state) + common)
+
+
+class TestCategorizeCache(unittest.TestCase):
+    class Categorizer(BaseCategorizer):
+        cache_size = 2
+        rules = (Rule(r"Referred to (?P<committees>.+)", "referral-committee"),)
+
+        def pre_categorize(self, text):
+            return text.strip()
+
+    def test_hits_and_misses(self):
+        categorizer = self.Categorizer()
+        categorizer.categorize("Referred to Rules")
+        categorizer.categorize("  Referred to Rules ")
+        categorizer.categorize("Read first time")
+        self.assertEqual((categorizer.cache_hits, categorizer.cache_misses), (1, 2))
+
+    def test_results_are_copies(self):
+        categorizer = self.Categorizer()
+        attrs = categorizer.categorize("Referred to Rules")
+        attrs["committees"].append("Finance")
+        attrs["actor"] = "lower"
+        self.assertEqual(
+            categorizer.categorize("Referred to Rules"),
+            {"committees": ["Rules"], "classification": ["referral-committee"]},
+        )
+        frozen = categorizer.categorize_frozen("Referred to Rules")
+        with self.assertRaises(TypeError):
+            frozen["actor"] = "lower"
+
+    def test_eviction(self):
+        categorizer = self.Categorizer()
+        for text in ("a", "b", "c", "a"):
+            categorizer.categorize(text)
+        self.assertEqual(list(categorizer._cache), ["c", "a"])
+        self.assertEqual(categorizer.cache_misses, 4)
+
+    def test_logged_after_scrape(self):
+        class Scraper(object):
+            def do_scrape(self, **kwargs):
+                self.categorizer.categorize("Read first time")
+                return {}
+
+        class XXBillScraper(CategorizerCacheMixin, Scraper):
+            categorizer = self.Categorizer()
+
+        with self.assertLogs("openstates", "INFO") as logs:
+            XXBillScraper().do_scrape(session="2025")
+        self.assertIn("Categorizer cache: 0 hits, 1 misses", logs.output[0])
+        # the next scrape reports its own hits and misses
+        self.assertEqual(XXBillScraper.categorizer.cache_misses, 0)
@@ -0,0 +1,65 @@
+import unittest
+
+import requests
+
+from utils.apiclient import JsonApiClient, BadApiResponse
+
+try:
+    import scrapelib
+except ImportError:
+    scrapelib = None
+
+
+def response(status, content=b"{}", headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.url = "https://api.example.com/bills/hb1"
+    resp._content = content
+    resp.headers.update(headers or {})
+    return resp
+
+
+class Scraper(object):
+    """Serves responses in turn, raising error_class for error statuses
+    like scrapelib does if it's given."""
+
+    def __init__(self, *responses, error_class=None):
+        self.responses = list(responses)
+        self.error_class = error_class
+
+    def get(self, url, *args, **kwargs):
+        resp = self.responses.pop(0)
+        if self.error_class and resp.status_code >= 400:
+            raise self.error_class(resp)
+        return resp
+
+
+class Client(JsonApiClient):
+    root = "https://api.example.com/"
+    resources = {"bill": "bills/{bill_id}"}
+
+
+class TestRequest(unittest.TestCase):
+    def test_scraper_error_reraised(self):
+        error = requests.HTTPError(response=response(404))
+        scraper = Scraper(response(404), error_class=lambda resp: error)
+        with self.assertRaises(requests.HTTPError) as raised:
+            Client(scraper).get("bill", bill_id="hb1")
+        self.assertIs(raised.exception, error)
+
+    @unittest.skipUnless(scrapelib, "scrapelib not installed")
+    def test_404_reaches_scrapelib_handlers(self):
+        scraper = Scraper(response(404), error_class=scrapelib.HTTPError)
+        with self.assertRaises(scrapelib.HTTPError):
+            Client(scraper).get("bill", bill_id="hb1")
+
+    def test_bad_api_response_without_scrapelib(self):
+        with self.assertRaises(BadApiResponse):
+            Client(Scraper(response(404))).get("bill", bill_id="hb1")
+
+    def test_429_retried(self):
+        scraper = Scraper(
+            response(429, headers={"Retry-After": "0"}),
+            response(200, b'{"ok": true}'),
+        )
+        self.assertEqual(Client(scraper).get("bill", bill_id="hb1"), {"ok": True})
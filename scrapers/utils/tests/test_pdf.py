@@ -0,0 +1,79 @@
+import os
+import re
+import shutil
+import unittest
+import subprocess
+
+import pymupdf
+
+from utils.pdf import convert_pdf_data
+
+here = os.path.dirname(__file__)
+scrapers = os.path.dirname(os.path.dirname(here))
+# roll calls with a column of X marks per vote type
+VOTE_PDFS = [
+    os.path.join(scrapers, "nm", "tests", "testData", name)
+    for name in ("2017_vote_house.pdf", "2017_vote_senate.pdf")
+]
+
+MARK = re.compile(r"(?<!\S)X(?!\S)")
+
+
+def mark_rows(text):
+    """Return {name: [column of each X mark]} for the rows of a roll call."""
+    rows = {}
+    for line in text.splitlines():
+        columns = [m.start() for m in MARK.finditer(line)]
+        if columns:
+            rows[re.split(r"\s{2,}", line.strip())[0]] = columns
+    return rows
+
+
+class TestLayoutText(unittest.TestCase):
+    def convert(self, path):
+        with open(path, "rb") as f:
+            return convert_pdf_data(f.read(), "text").decode("utf-8")
+
+    def assertSameColumns(self, expected, got):
+        """Every column of expected must map to a single column of got."""
+        self.assertEqual(sorted(expected), sorted(got))
+        columns = {}
+        for name, expected_columns in expected.items():
+            with self.subTest(name=name):
+                self.assertEqual(len(got[name]), len(expected_columns))
+                for want, have in zip(expected_columns, got[name]):
+                    self.assertEqual(columns.setdefault(want, have), have)
+        self.assertEqual(len(set(columns.values())), len(columns))
+
+    def test_marks_line_up(self):
+        for path in VOTE_PDFS:
+            with pymupdf.open(path) as doc:
+                mark_x = {
+                    round(x0)
+                    for page in doc
+                    for x0, _, _, _, word, *_ in page.get_text("words")
+                    if word == "X"
+                }
+            got = mark_rows(self.convert(path))
+            with self.subTest(path=os.path.basename(path)):
+                columns = {c for row in got.values() for c in row}
+                self.assertEqual(len(columns), len(mark_x))
+
+    def test_names_keep_single_spaces(self):
+        text = self.convert(VOTE_PDFS[0])
+        self.assertRegex(text, r"\n\s*Armstrong, Gail {2,}X")
+        self.assertRegex(text, r" Roybal Caballero {2,}X")
+        self.assertRegex(text, r" Trujillo, Christine {1,}X")
+
+    @unittest.skipUnless(shutil.which("pdftotext"), "poppler-utils not installed")
+    def test_matches_pdftotext(self):
+        for path in VOTE_PDFS:
+            expected = subprocess.run(
+                ["pdftotext", "-layout", path, "-"],
+                stdout=subprocess.PIPE,
+                check=True,
+            ).stdout.decode("utf-8")
+            with self.subTest(path=os.path.basename(path)):
+                self.assertSameColumns(
+                    mark_rows(expected), mark_rows(self.convert(path))
+                )
@@ -1,11 +1,13 @@
 import csv
+import os
 import re
 import pytz
 import datetime
 from paramiko.client import SSHClient, AutoAddPolicy
 import paramiko
 from openstates.scrape import Scraper, Bill, VoteEvent
-from collections import defaultdict
+from utils.actions import CategorizerCacheMixin
+from collections import defaultdict, namedtuple
 import time
 
 from .common import SESSION_SITE_IDS, COMBINED_SESSIONS
@@ -13,17 +15,46 @@ from .actions import Categorizer
 
 tz = pytz.timezone("America/New_York")
 
-
-class VaCSVBillScraper(Scraper):
-
-    _members = defaultdict(list)
-    _sponsors = defaultdict(list)
-    _amendments = defaultdict(list)
-    _fiscal_notes = defaultdict(list)
-    _history = defaultdict(list)
-    _votes = defaultdict(list)
-    _bills = defaultdict(list)
-    _summaries = defaultdict(list)
+# local copies of the LIS CSVs are kept here between runs
+VA_MIRROR_DIR = os.environ.get("VA_MIRROR_DIR", os.path.join("_cache", "va"))
+
+
+# rows of the LIS CSVs, kept as tuples to hold whole sessions in memory
+Member = namedtuple("Member", ["chamber", "member_id", "name"])
+Sponsor = namedtuple(
+    "Sponsor", ["member_name", "member_id", "bill_number", "patron_type"]
+)
+Amendment = namedtuple("Amendment", ["bill_number", "txt_docid"])
+FiscalNote = namedtuple("FiscalNote", ["refid"])
+History = namedtuple(
+    "History",
+    ["bill_id", "history_date", "history_description", "history_refid"],
+)
+MemberVote = namedtuple("MemberVote", ["member_id", "vote_result"])
+TextDoc = namedtuple("TextDoc", ["doc_abbr", "doc_date"])
+BillRow = namedtuple(
+    "BillRow",
+    [
+        "bill_id",
+        "patron_name",
+        "bill_description",
+        "passed",
+        "failed",
+        "carried_over",
+        "approved",
+        "vetoed",
+        "introduction_date",
+        "text_docs",
+    ],
+)
+Summary = namedtuple(
+    "Summary", ["bill_id", "summary_doc_id", "summary_type", "summary_text"]
+)
+
+VOTE_RESULTS = {"Y": "yes", "N": "no", "X": "not voting", "A": "abstain"}
+
+
+class VaCSVBillScraper(CategorizerCacheMixin, Scraper):
 
     _session_id: int
     categorizer = Categorizer()
@@ -72,81 +103,86 @@ class VaCSVBillScraper(Scraper):
             self.sftp.chdir(f"/CSV{session_id}/csv{session_id}")
 
     def get_file(self, filename):
-        # old sftp thing rn
-        return self.sftp.open(filename).read().decode(errors="ignore")
+        """
+        Return the path to a local copy of filename from the session's SFTP
+        directory, only downloading it if its size or mtime changed since
+        the copy was made.
+        """
+        remote = self.sftp.stat(filename)
+        mirror = os.path.join(VA_MIRROR_DIR, self.sftp.getcwd().strip("/"))
+        os.makedirs(mirror, exist_ok=True)
+        path = os.path.join(mirror, filename)
+
+        if os.path.exists(path):
+            local = os.stat(path)
+            version = (remote.st_size, int(remote.st_mtime))
+            if (local.st_size, int(local.st_mtime)) == version:
+                self.info(f"{filename} unchanged, using {path}")
+                return path
+
+        self.info(f"downloading {filename} to {path}")
+        self.sftp.get(filename, path + ".part")
+        os.utime(path + ".part", (remote.st_atime, remote.st_mtime))
+        os.replace(path + ".part", path)
+        return path
         # keeping old filenames in case we ever need to go back to sftp
         # filename = filename.lower().capitalize()
         # url = f"https://lis.virginia.gov/SiteInformation/csv/{self._session_id}/{filename}"
         # return self.get(url).text
 
+    def read_file(self, filename):
+        """Yield the lines of filename, read from the local copy."""
+        with open(
+            self.get_file(filename), encoding="utf-8", errors="ignore", newline=""
+        ) as f:
+            yield from f
+
     # Load members of legislative
     def load_members(self):
-        resp = self.get_file("Members.csv")
-
-        reader = csv.reader(resp.splitlines(), delimiter=",")
+        reader = csv.reader(self.read_file("Members.csv"), delimiter=",")
         # ['MBR_HOU', 'MBR_MBRNO', 'MBR_NAME']
         for row in reader:
-            self._members[row[1]].append(
-                {"chamber": row[0], "member_id": row[1], "name": row[2].strip()}
-            )
+            self._members.setdefault(row[1], Member(row[0], row[1], row[2].strip()))
         self.info("Total Members Loaded: " + str(len(self._members)))
         return True
 
     def load_sponsors(self):
-        resp = self.get_file("Sponsors.csv")
-
-        reader = csv.reader(resp.splitlines(), delimiter=",")
+        reader = csv.reader(self.read_file("Sponsors.csv"), delimiter=",")
         # ['MEMBER_NAME', 'MEMBER_ID', 'BILL_NUMBER', 'PATRON_TYPE']
         for row in reader:
             self._sponsors[row[2]].append(
-                {
-                    "member_name": row[0].strip(),
-                    "member_id": row[1],
-                    "bill_number": row[2],
-                    "patron_type": row[3],
-                }
+                Sponsor(row[0].strip(), row[1], row[2], row[3])
             )
         self.info("Total Sponsors Loaded: " + str(len(self._sponsors)))
 
     def load_amendments(self):
-        resp = self.get_file("Amendments.csv")
-        reader = csv.reader(resp.splitlines(), delimiter=",")
+        reader = csv.reader(self.read_file("Amendments.csv"), delimiter=",")
 
         # ['BILL_NUMBER', 'TXT_DOCID']
         for row in reader:
             self._amendments[row[0].strip()].append(
-                {"bill_number": row[0].strip(), "txt_docid": row[1].strip()}
+                Amendment(row[0].strip(), row[1].strip())
             )
         self.info("Total Amendments Loaded: " + str(len(self._amendments)))
 
     def load_fiscal_notes(self):
-        resp = self.get_file("FiscalImpactStatements.csv")
-        reader = csv.reader(resp.splitlines(), delimiter=",")
+        reader = csv.reader(self.read_file("FiscalImpactStatements.csv"), delimiter=",")
 
         # ['BILL_NUMBER', 'HST_REFID']
         for row in reader:
-            self._fiscal_notes[row[0].strip()].append({"refid": row[1].strip()})
+            self._fiscal_notes[row[0].strip()].append(FiscalNote(row[1].strip()))
         self.info("Total Fiscal Notes Loaded: " + str(len(self._fiscal_notes)))
 
     def load_history(self):
-        resp = self.get_file("HISTORY.CSV")
-        reader = csv.reader(resp.splitlines(), delimiter=",")
+        reader = csv.reader(self.read_file("HISTORY.CSV"), delimiter=",")
         # ['Bill_id', 'History_date', 'History_description', 'History_refid']
         for row in reader:
-            self._history[row[0]].append(
-                {
-                    "bill_id": row[0],
-                    "history_date": row[1],
-                    "history_description": row[2],
-                    "history_refid": row[3],
-                }
-            )
+            self._history[row[0]].append(History(row[0], row[1], row[2], row[3]))
         self.info("Total Actions Loaded: " + str(len(self._history)))
 
     def load_votes(self):
-        resp = self.get_file("VOTE.CSV")
-        for line in resp.splitlines():
-            line = line.split(",")
+        for line in self.read_file("VOTE.CSV"):
+            line = line.rstrip("\r\n").split(",")
             # First part of the line is always the history_refid number.
             #   It has extra quotes around it
             # Next number is the member_id number found in _members
@@ -154,52 +190,39 @@ class VaCSVBillScraper(Scraper):
             history_refid = line[0].replace('"', "")
             # Checks if votes are present
             if len(line) > 1:
+                votes = self._votes[history_refid]
                 # Not every line has the same number of votes.
                 for v in range(1, len(line), 2):
-                    if (
-                        line[v] != '"H0000"'
-                        and len(self._members[line[v].replace('"', "")]) > 0
-                    ):
-                        member = self._members[line[v].replace('"', "")][0]["name"]
+                    member = self._members.get(line[v].replace('"', ""))
+                    if line[v] != '"H0000"' and member:
                         vote_result = line[v + 1].replace('"', "")
-                        if vote_result == "Y":
-                            vote_result = "yes"
-                        elif vote_result == "N":
-                            vote_result = "no"
-                        elif vote_result == "X":
-                            vote_result = "not voting"
-                        elif vote_result == "A":
-                            vote_result = "abstain"
-                        self._votes[history_refid].append(
-                            {"member_id": member, "vote_result": vote_result}
+                        votes.append(
+                            MemberVote(
+                                member.name, VOTE_RESULTS.get(vote_result, vote_result)
+                            )
                         )
         self.info("Total Votes Loaded: " + str(len(self._votes)))
 
     def load_bills(self):
-        resp = self.get_file("BILLS.CSV")
-        reader = csv.DictReader(resp.splitlines(), delimiter=",")
+        reader = csv.DictReader(self.read_file("BILLS.CSV"), delimiter=",")
         for row in reader:
-            text_doc_data = [
-                {"doc_abbr": row["Full_text_doc1"], "doc_date": row["Full_text_date1"]},
-                {"doc_abbr": row["Full_text_doc2"], "doc_date": row["Full_text_date2"]},
-                {"doc_abbr": row["Full_text_doc3"], "doc_date": row["Full_text_date3"]},
-                {"doc_abbr": row["Full_text_doc4"], "doc_date": row["Full_text_date4"]},
-                {"doc_abbr": row["Full_text_doc5"], "doc_date": row["Full_text_date5"]},
-                {"doc_abbr": row["Full_text_doc6"], "doc_date": row["Full_text_date6"]},
-            ]
+            text_docs = tuple(
+                TextDoc(row[f"Full_text_doc{n}"], row[f"Full_text_date{n}"])
+                for n in range(1, 7)
+            )
             self._bills[row["Bill_id"]].append(
-                {
-                    "bill_id": row["Bill_id"],
-                    "patron_name": row["Patron_name"],
-                    "bill_description": row["Bill_description"],
-                    "passed": row["Passed"],
-                    "failed": row["Failed"],
-                    "carried_over": row["Carried_over"],
-                    "approved": row["Approved"],
-                    "vetoed": row["Vetoed"],
-                    "introduction_date": row["Introduction_date"],
-                    "text_docs": text_doc_data,
-                }
+                BillRow(
+                    row["Bill_id"],
+                    row["Patron_name"],
+                    row["Bill_description"],
+                    row["Passed"],
+                    row["Failed"],
+                    row["Carried_over"],
+                    row["Approved"],
+                    row["Vetoed"],
+                    row["Introduction_date"],
+                    text_docs,
+                )
             )
         self.info("Total Bills Loaded: " + str(len(self._bills)))
 
@@ -209,33 +232,32 @@ class VaCSVBillScraper(Scraper):
         return re.sub(clean, "", text)
 
     def load_summaries(self):
-        resp = self.get_file("Summaries.csv")
-        reader = csv.reader(resp.splitlines(), delimiter=",")
+        reader = csv.reader(self.read_file("Summaries.csv"), delimiter=",")
         # ["SUM_BILNO", "SUMMARY_DOCID", "SUMMARY_TYPE", "SUMMARY_TEXT"]
         for row in reader:
             if row[0] == "SUM_BILNO":
                 continue
 
             self._summaries[row[0]].append(
-                {
-                    "bill_id": row[0],
-                    "summary_doc_id": row[1],
-                    "summary_type": row[2],
-                    "summary_text": self.remove_html_tags(row[3]),
-                }
+                Summary(row[0], row[1], row[2], self.remove_html_tags(row[3]))
             )
         self.info("Total Sponsors Loaded: " + str(len(self._summaries)))
 
+    def reset_tables(self):
+        """Start each session with empty per-bill indexes."""
+        self._members = {}
+        self._sponsors = defaultdict(list)
+        self._amendments = defaultdict(list)
+        self._fiscal_notes = defaultdict(list)
+        self._history = defaultdict(list)
+        self._votes = defaultdict(list)
+        self._bills = defaultdict(list)
+        self._summaries = defaultdict(list)
+
     def scrape(self, session=None):
         if not session:
             session = self.jurisdiction.legislative_sessions[-1]["identifier"]
             self.info(f"no session specified, using {session}")
-        chamber_types = {
-            "H": "lower",
-            "S": "upper",
-            "G": "executive",
-            "C": "legislature",
-        }
 
         # pull the current session's details to tell if it's a special
         session_details = next(
@@ -250,6 +272,20 @@ class VaCSVBillScraper(Scraper):
 
         session_id = SESSION_SITE_IDS[session]
         self._init_sftp(session_id)
+        self.reset_tables()
+        try:
+            yield from self.scrape_session(session, session_id, is_special)
+        finally:
+            self.reset_tables()
+            self.sftp.close()
+
+    def scrape_session(self, session, session_id, is_special):
+        chamber_types = {
+            "H": "lower",
+            "S": "upper",
+            "G": "executive",
+            "C": "legislature",
+        }
         bill_url_base = "https://lis.virginia.gov/cgi-bin/"
 
         if not is_special:
@@ -267,7 +303,7 @@ class VaCSVBillScraper(Scraper):
         for bill in self._bills:
             bill = self._bills[bill][0]
 
-            bill_id = bill["bill_id"]
+            bill_id = bill.bill_id
             chamber = chamber_types[bill_id[0]]
             bill_type = {"B": "bill", "J": "joint resolution", "R": "resolution"}[
                 bill_id[1]
@@ -275,7 +311,7 @@ class VaCSVBillScraper(Scraper):
             b = Bill(
                 bill_id,
                 session,
-                bill["bill_description"],
+                bill.bill_description,
                 chamber=chamber,
                 classification=bill_type,
             )
@@ -294,49 +330,49 @@ class VaCSVBillScraper(Scraper):
 
             # Sponsors
             if long_bill_id not in self._sponsors:
-                if "patron_name" in bill and bill["patron_name"].strip() != "":
+                if bill.patron_name.strip() != "":
                     b.add_sponsorship(
-                        bill["patron_name"],
+                        bill.patron_name,
                         classification="primary",
                         entity_type="person",
                         primary=True,
                     )
-            for spon in self._sponsors[long_bill_id]:
-                if spon["member_name"].strip() == "":
+            for spon in self._sponsors.get(long_bill_id, ()):
+                if spon.member_name.strip() == "":
                     continue
 
-                sponsor_type = spon["patron_type"]
+                sponsor_type = spon.patron_type
                 if sponsor_type.endswith("Chief Patron"):
                     sponsor_type = "primary"
                 else:
                     sponsor_type = "cosponsor"
                 b.add_sponsorship(
-                    spon["member_name"],
+                    spon.member_name,
                     classification=sponsor_type,
                     entity_type="person",
                     primary=sponsor_type == "primary",
                 )
 
             # Summary
-            summary_texts = self._summaries[long_bill_id]
+            summary_texts = self._summaries.get(long_bill_id, ())
             for sum_text in summary_texts:
-                b.add_abstract(sum_text["summary_text"], sum_text["summary_type"])
+                b.add_abstract(sum_text.summary_text, sum_text.summary_type)
 
             # Amendment docs
-            amendments = self._amendments[bill_id]
+            amendments = self._amendments.get(bill_id, ())
             for amend in amendments:
                 doc_link = (
-                    bill_url_base + f"legp604.exe?{session_id}+amd+{amend['txt_docid']}"
+                    bill_url_base + f"legp604.exe?{session_id}+amd+{amend.txt_docid}"
                 )
                 b.add_document_link(
-                    "Amendment: " + amend["txt_docid"], doc_link, media_type="text/html"
+                    "Amendment: " + amend.txt_docid, doc_link, media_type="text/html"
                 )
 
             # fiscal notes
-            for fn in self._fiscal_notes[long_bill_id]:
-                doc_link = bill_url_base + f"legp604.exe?{session_id}+oth+{fn['refid']}"
+            for fn in self._fiscal_notes.get(long_bill_id, ()):
+                doc_link = bill_url_base + f"legp604.exe?{session_id}+oth+{fn.refid}"
                 b.add_document_link(
-                    "Fiscal Impact Statement: " + fn["refid"],
+                    "Fiscal Impact Statement: " + fn.refid,
                     doc_link.replace(".PDF", "+PDF"),
                     media_type="application/pdf",
                 )
@@ -344,12 +380,12 @@ class VaCSVBillScraper(Scraper):
             # actions with 8-digit number followed by D are version titles too
             doc_actions = defaultdict(list)
             # History and then votes
-            for hist in self._history[bill_id]:
-                action = hist["history_description"]
-                action_date = hist["history_date"]
+            for hist in self._history.get(bill_id, ()):
+                action = hist.history_description
+                action_date = hist.history_date
                 date = datetime.datetime.strptime(action_date, "%m/%d/%y").date()
                 chamber = chamber_types[action[0]]
-                vote_id = hist["history_refid"]
+                vote_id = hist.history_refid
                 cleaned_action = action[2:]
 
                 if re.findall(r"\d{8}D", cleaned_action):
@@ -369,14 +405,14 @@ class VaCSVBillScraper(Scraper):
                     total_no = 0
                     total_not_voting = 0
                     total_abstain = 0
-                    for v in self._votes[vote_id]:
-                        if v["vote_result"] == "yes":
+                    for v in self._votes.get(vote_id, ()):
+                        if v.vote_result == "yes":
                             total_yes += 1
-                        elif v["vote_result"] == "no":
+                        elif v.vote_result == "no":
                             total_no += 1
-                        elif v["vote_result"] == "not voting":
+                        elif v.vote_result == "not voting":
                             total_not_voting += 1
-                        elif v["vote_result"] == "abstain":
+                        elif v.vote_result == "abstain":
                             total_abstain += 1
                     vote = VoteEvent(
                         identifier=vote_id,
@@ -397,29 +433,29 @@ class VaCSVBillScraper(Scraper):
                         + f"legp604.exe?{session_id}+vot+{vote_id}+{long_bill_id}"
                     )
                     vote.add_source(vote_url)
-                    for v in self._votes[vote_id]:
-                        vote.vote(v["vote_result"], v["member_id"])
+                    for v in self._votes.get(vote_id, ()):
+                        vote.vote(v.vote_result, v.member_id)
                     yield vote
 
             # Versions
-            for version in bill["text_docs"]:
+            for version in bill.text_docs:
                 # Checks if abbr is blank as not every bill has multiple versions
-                if version["doc_abbr"]:
+                if version.doc_abbr:
                     version_url = (
                         bill_url_base
-                        + f"legp604.exe?{session_id}+ful+{version['doc_abbr']}"
+                        + f"legp604.exe?{session_id}+ful+{version.doc_abbr}"
                     )
                     pdf_url = version_url + "+pdf"
 
                     version_date = datetime.datetime.strptime(
-                        version["doc_date"], "%m/%d/%y"
+                        version.doc_date, "%m/%d/%y"
                     ).date()
                     # version text will default to abbreviation provided in CSV
                     # but if there is an unambiguous action from that date with
                     # a version, we'll use that as the document title
-                    version_text = version["doc_abbr"]
-                    if len(doc_actions[version["doc_date"]]) == 1:
-                        version_text = doc_actions[version["doc_date"]][0]
+                    version_text = version.doc_abbr
+                    if len(doc_actions[version.doc_date]) == 1:
+                        version_text = doc_actions[version.doc_date][0]
                     b.add_version_link(
                         version_text,
                         version_url,
@@ -436,4 +472,3 @@ class VaCSVBillScraper(Scraper):
                     )
 
             yield b
-        self.sftp.close()
@@ -9,12 +9,13 @@ from .actions import Categorizer
 from .utils import xpath
 from openstates.scrape import Scraper, Bill, VoteEvent as Vote
 from utils import LXMLMixin
+from utils.actions import CategorizerCacheMixin
 
 import lxml.etree
 import lxml.html
 
 
-class WABillScraper(Scraper, LXMLMixin):
+class WABillScraper(CategorizerCacheMixin, Scraper, LXMLMixin):
     # TODO:
     # - only on passed bills
     # https://wslwebservices.leg.wa.gov/legislationservice.asmx/GetSessionLawChapter
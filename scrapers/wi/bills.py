@@ -6,6 +6,7 @@ from collections import defaultdict
 import lxml.html
 import scrapelib
 from openstates.scrape import Scraper, Bill, VoteEvent
+from utils.actions import CategorizerCacheMixin
 
 from .common import SESSION_TERMS, SESSION_SITE_IDS
 from .actions import Categorizer
@@ -22,7 +23,7 @@ motion_classifiers = {
 TIMEZONE = pytz.timezone("US/Central")
 
 
-class WIBillScraper(Scraper):
+class WIBillScraper(CategorizerCacheMixin, Scraper):
     subjects = defaultdict(list)
     categorizer = Categorizer()
 
@@ -1,4 +1,3 @@
-import os
 import re
 import datetime
 import collections
@@ -6,9 +5,10 @@ from urllib.parse import unquote_plus, parse_qsl, urlparse
 
 import lxml.html
 
-from openstates.utils import convert_pdf
 from openstates.scrape import Scraper, Bill, VoteEvent
 import scrapelib
+from utils.pdfcache import cached_convert_pdf
+from utils.actions import CategorizerCacheMixin
 
 from .actions import Categorizer
 
@@ -32,7 +32,7 @@ class _Url(object):
         return hash(self.parts)
 
 
-class WVBillScraper(Scraper):
+class WVBillScraper(CategorizerCacheMixin, Scraper):
     categorizer = Categorizer()
 
     _special_names = {
@@ -269,13 +269,10 @@ class WVBillScraper(Scraper):
 
     def scrape_house_vote(self, bill, url):
         try:
-            filename, resp = self.urlretrieve(url, timeout=80)
+            text = cached_convert_pdf(self, url, "text", timeout=80)
         except scrapelib.HTTPError:
             self.warning("missing vote file %s" % url)
             return
-        text = convert_pdf(filename, "text")
-
-        os.remove(filename)
 
         lines = text.splitlines()
 
@@ -372,7 +369,7 @@ class WVBillScraper(Scraper):
 
     def scrape_senate_vote(self, bill, url, date):
         try:
-            filename, resp = self.urlretrieve(url)
+            text = cached_convert_pdf(self, url, "text").decode("utf-8")
         except scrapelib.HTTPError:
             self.warning("missing vote file %s" % url)
             return
@@ -389,9 +386,6 @@ class WVBillScraper(Scraper):
         vote.add_source(url)
         vote.dedupe_key = url
 
-        text = convert_pdf(filename, "text").decode("utf-8")
-        os.remove(filename)
-
         if re.search(r"Yea:\s+\d+\s+Nay:\s+\d+\s+Absent:\s+\d+", text):
             yield from self.scrape_senate_vote_3col(bill, vote, text, url, date)
             return
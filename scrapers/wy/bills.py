@@ -7,12 +7,13 @@ from .actions import Categorizer
 import scrapelib
 
 from utils import LXMLMixin
+from utils.actions import CategorizerCacheMixin
 
 
 TIMEZONE = pytz.timezone("US/Mountain")
 
 
-class WYBillScraper(Scraper, LXMLMixin):
+class WYBillScraper(CategorizerCacheMixin, Scraper, LXMLMixin):
     categorizer = Categorizer()
     chamber_abbrev_map = {"H": "lower", "S": "upper"}
     is_special = False
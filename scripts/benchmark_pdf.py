@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Compare utils.pdf.convert_pdf_data with poppler's pdftotext/pdftohtml, as
+used by openstates.utils.convert_pdf, on the fixture PDFs.
+
+    PYTHONPATH=scrapers poetry run python scripts/benchmark_pdf.py [pdf ...]
+
+For every PDF and conversion type this prints the mean time per conversion
+for both engines and how many of poppler's non-blank lines, with runs of
+whitespace collapsed, also appear in the PyMuPDF output.
+"""
+import os
+import re
+import sys
+import glob
+import shutil
+import tempfile
+import subprocess
+import timeit
+
+from utils.pdf import convert_pdf_data
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "scrapers", "nm", "tests", "testData", "*.pdf")
+RUNS = 20
+
+POPPLER = {
+    "text": ["pdftotext", "-layout", "{}", "-"],
+    "text-nolayout": ["pdftotext", "{}", "-"],
+    "xml": ["pdftohtml", "-xml", "-stdout", "{}"],
+    "html": ["pdftohtml", "-stdout", "{}"],
+}
+
+
+def poppler_convert(data, type):
+    """What convert_pdf costs a scraper: write a temp file and shell out."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+        f.write(data)
+        f.flush()
+        command = [arg.format(f.name) for arg in POPPLER[type]]
+        return subprocess.run(command, stdout=subprocess.PIPE, check=True).stdout
+
+
+def lines(text):
+    return [
+        re.sub(r"\s+", " ", line).strip()
+        for line in text.decode("utf-8", "replace").splitlines()
+        if line.strip()
+    ]
+
+
+def main(paths):
+    have_poppler = shutil.which("pdftotext") and shutil.which("pdftohtml")
+    if not have_poppler:
+        print("poppler-utils not installed, only timing PyMuPDF")
+
+    print("%-28s %-14s %10s %10s %8s" % ("file", "type", "pymupdf", "poppler", "lines"))
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        for type in POPPLER:
+            ours = timeit.timeit(lambda: convert_pdf_data(data, type), number=RUNS)
+            theirs, overlap = float("nan"), ""
+            if have_poppler:
+                theirs = timeit.timeit(lambda: poppler_convert(data, type), number=RUNS)
+                if type.startswith("text"):
+                    expected = lines(poppler_convert(data, type))
+                    got = set(lines(convert_pdf_data(data, type)))
+                    found = sum(line in got for line in expected)
+                    overlap = "%d/%d" % (found, len(expected))
+            print(
+                "%-28s %-14s %8.1fms %8.1fms %8s"
+                % (
+                    os.path.basename(path),
+                    type,
+                    ours / RUNS * 1000,
+                    theirs / RUNS * 1000,
+                    overlap,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or sorted(glob.glob(FIXTURES)))